@@ -33,6 +33,7 @@ logger = get_logger()
 
 
 DISABLE_STRICT_AUTH_CHECK = False
+MAX_MULTIPLEXED_REQUESTS_PER_CONNECTION = 32
 
 
 def _filter_binary_fields(data):
@@ -155,7 +156,10 @@ class BackendApp:
                                 cancel_scope.cancel()
 
                         client_ctx.event_bus_ctx.connect(BackendEvent.USER_REVOKED, _on_revoked)
-                        await self._handle_client_loop(transport, client_ctx)
+                        try:
+                            await self._handle_client_loop(transport, client_ctx)
+                        finally:
+                            self.events.unsubscribe(client_ctx)
 
             elif isinstance(client_ctx, InvitedClientContext):
                 await self.invite.claimer_joined(
@@ -302,6 +306,10 @@ class BackendApp:
             pass
 
     async def _handle_client_loop(self, transport, client_ctx):
+        if client_ctx.multiplexing:
+            await self._handle_client_multiplexed_loop(transport, client_ctx)
+            return
+
         # Retrieve the allowed commands according to api version and auth type
         api_cmds = self.apis[client_ctx.handshake_type]
 
@@ -311,42 +319,73 @@ class BackendApp:
             # while processing a command
             raw_req = raw_req or await transport.recv()
             req = unpackb(raw_req)
-            if get_log_level() <= LOG_LEVEL_DEBUG:
-                client_ctx.logger.debug("Request", req=_filter_binary_fields(req))
             try:
-                cmd = req.get("cmd", "<missing>")
-                if not isinstance(cmd, str):
-                    raise KeyError()
+                rep = await self._process_request(api_cmds, client_ctx, req)
 
-                cmd_func = api_cmds[cmd]
+            except CancelledByNewRequest as exc:
+                # Long command handling such as message_get can be cancelled
+                # when the peer send a new request
+                raw_req = exc.new_raw_req
+                continue
 
-            except KeyError:
-                rep = {"status": "unknown_command", "reason": "Unknown command"}
+            raw_rep = packb(rep)
+            await transport.send(raw_rep)
+            raw_req = None
 
-            else:
-                try:
-                    rep = await cmd_func(client_ctx, req)
-
-                except InvalidMessageError as exc:
-                    rep = {
-                        "status": "bad_message",
-                        "errors": exc.errors,
-                        "reason": "Invalid message.",
-                    }
-
-                except ProtocolError as exc:
-                    rep = {"status": "bad_message", "reason": str(exc)}
-
-                except CancelledByNewRequest as exc:
-                    # Long command handling such as message_get can be cancelled
-                    # when the peer send a new request
-                    raw_req = exc.new_raw_req
-                    continue
+    async def _handle_client_multiplexed_loop(self, transport, client_ctx):
+        # Each request is tagged with a `req_id` by the client, this allows to
+        # process the requests concurrently and to send back the replies (tagged
+        # with the same `req_id`) as soon as they are ready.
+        api_cmds = self.apis[client_ctx.handshake_type]
+        in_flight = trio.Semaphore(MAX_MULTIPLEXED_REQUESTS_PER_CONNECTION)
 
-            if get_log_level() <= LOG_LEVEL_DEBUG:
-                client_ctx.logger.debug("Response", rep=_filter_binary_fields(rep))
-            else:
-                client_ctx.logger.info("Request", cmd=cmd, status=rep["status"])
+        async def _process_and_reply(req_id, req):
+            try:
+                rep = await self._process_request(api_cmds, client_ctx, req)
+            finally:
+                in_flight.release()
+            rep["req_id"] = req_id
             raw_rep = packb(rep)
             await transport.send(raw_rep)
-            raw_req = None
+
+        async with trio.open_service_nursery() as nursery:
+            while True:
+                raw_req = await transport.recv()
+                req = unpackb(raw_req)
+                req_id = req.pop("req_id", None) if isinstance(req, dict) else None
+                if not isinstance(req_id, int):
+                    rep = {"status": "bad_message", "reason": "Missing or invalid `req_id` field"}
+                    await transport.send(packb(rep))
+                    continue
+                # Stop reading new requests when too many are already being processed
+                await in_flight.acquire()
+                nursery.start_soon(_process_and_reply, req_id, req)
+
+    async def _process_request(self, api_cmds, client_ctx, req):
+        if get_log_level() <= LOG_LEVEL_DEBUG:
+            client_ctx.logger.debug("Request", req=_filter_binary_fields(req))
+        try:
+            cmd = req.get("cmd", "<missing>")
+            if not isinstance(cmd, str):
+                raise KeyError()
+
+            cmd_func = api_cmds[cmd]
+
+        except KeyError:
+            rep = {"status": "unknown_command", "reason": "Unknown command"}
+
+        else:
+            try:
+                rep = await cmd_func(client_ctx, req)
+
+            except InvalidMessageError as exc:
+                rep = {"status": "bad_message", "errors": exc.errors, "reason": "Invalid message."}
+
+            except ProtocolError as exc:
+                rep = {"status": "bad_message", "reason": str(exc)}
+
+        if get_log_level() <= LOG_LEVEL_DEBUG:
+            client_ctx.logger.debug("Response", rep=_filter_binary_fields(rep))
+        else:
+            client_ctx.logger.info("Request", cmd=cmd, status=rep["status"])
+        return rep
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 from uuid import UUID
+from typing import Optional
 
 from guardata.api.protocol import DeviceID, OrganizationID
 from guardata.api.protocol import block_create_serializer, block_read_serializer
@@ -80,9 +81,17 @@ class BaseBlockComponent:
         return block_create_serializer.rep_dump({"status": "ok"})
 
     async def read(
-        self, organization_id: OrganizationID, author: DeviceID, block_id: UUID
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        block_id: UUID,
+        offset: int = 0,
+        size: Optional[int] = None,
     ) -> bytes:
         """
+        Only the `size` bytes starting at `offset` are returned (up to the
+        end of the block if `size` is None).
+
         Raises:
             BlockNotFoundError
             BlockTimeoutError
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 from uuid import UUID
+from typing import Optional
 
 from guardata.api.protocol import OrganizationID
 from backendService.config import BaseBlockStoreConfig
@@ -15,6 +16,20 @@ class BaseBlockStoreComponent:
         """
         raise NotImplementedError()
 
+    async def read_range(
+        self, organization_id: OrganizationID, id: UUID, offset: int, size: Optional[int]
+    ) -> bytes:
+        """
+        Default implementation fetches the whole block, blockstores able to
+        read a part of an object should override it.
+
+        Raises:
+            BlockNotFoundError
+            BlockTimeoutError
+        """
+        data = await self.read(organization_id, id)
+        return data[offset:] if size is None else data[offset : offset + size]
+
     async def create(self, organization_id: OrganizationID, id: UUID, block: bytes) -> None:
         """
         Raises:
@@ -49,6 +64,7 @@ def blockstore_factory(
                 config.s3_key,
                 config.s3_secret,
                 config.s3_endpoint_url,
+                config.s3_max_concurrency,
             )
         except ImportError as exc:
             raise ValueError("S3 block store is not available") from exc
@@ -14,6 +14,7 @@ from guardata.cli_utils import cli_exception_handler
 from guardata.logging import configure_logging
 from backendService import backend_app_factory
 from backendService.config import (
+    DEFAULT_S3_MAX_CONCURRENCY,
     BackendConfig,
     EmailConfig,
     MockedBlockStoreConfig,
@@ -70,10 +71,15 @@ def _parse_blockstore_param(value):
         parts = _split_with_escaping(value)
         if parts[0].upper() == "S3":
             try:
-                endpoint_url, region, bucket, key, secret = parts[1:]
+                endpoint_url, region, bucket, key, secret, *extra = parts[1:]
+                if len(extra) > 1:
+                    raise ValueError()
+                max_concurrency = int(extra[0]) if extra else DEFAULT_S3_MAX_CONCURRENCY
+                if max_concurrency < 1:
+                    raise ValueError()
             except ValueError:
                 raise click.BadParameter(
-                    "Invalid S3 config, must be `s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>`"
+                    "Invalid S3 config, must be `s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>[:<max_concurrency>]`"
                 )
             # Provide https by default to avoid anoying escaping for most cases
             if (
@@ -88,6 +94,7 @@ def _parse_blockstore_param(value):
                 s3_bucket=bucket,
                 s3_key=key,
                 s3_secret=secret,
+                s3_max_concurrency=max_concurrency,
             )
 
         elif parts[0].upper() == "SWIFT":
@@ -237,6 +244,16 @@ Allowed values:
     envvar="GUARDATA_DB_FIRST_TRIES_SLEEP",
     help="Number of second waited between tries during initial database connection",
 )
+@click.option(
+    "--db-coalesce-notifications",
+    envvar="GUARDATA_DB_COALESCE_NOTIFICATIONS",
+    is_flag=True,
+    help="""Send the events of a transaction as a single PostgreSQL notification.
+
+Older backends cannot read such notifications, only use this flag once all the
+backends sharing the database support it.
+""",
+)
 @click.option(
     "--blockstore",
     "-b",
@@ -248,7 +265,8 @@ Allowed values:
 Allowed values:
 -`MOCKED`: Mocked in memory
 -`POSTGRESQL`: Use the database specified in the `--db` param
--`s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>`: Use S3 storage
+-`s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>[:<max_concurrency>]`: Use S3 storage
+ (`<max_concurrency>` bounds the number of parallel S3 requests, default to 32)
 -`swift:<auth_url>:<tenant>:<container>:<user>:<password>`: Use SWIFT storage
 
 Note endpoint_url/auth_url are considered as https by default (e.g.
@@ -389,6 +407,7 @@ def run_cmd(
     db_max_connections,
     db_first_tries_number,
     db_first_tries_sleep,
+    db_coalesce_notifications,
     blockstore,
     administration_token,
     spontaneous_organization_bootstrap,
@@ -448,6 +467,7 @@ def run_cmd(
             db_max_connections=db_max_connections,
             db_first_tries_number=db_first_tries_number,
             db_first_tries_sleep=db_first_tries_sleep,
+            db_coalesce_notifications=db_coalesce_notifications,
             spontaneous_organization_bootstrap=spontaneous_organization_bootstrap,
             organization_bootstrap_webhook_url=organization_bootstrap_webhook,
             blockstore_config=blockstore,
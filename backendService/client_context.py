@@ -33,6 +33,10 @@ class BaseClientContext:
     def handshake_type(self) -> str:
         return self.handshake.answer_type
 
+    @property
+    def multiplexing(self) -> bool:
+        return self.handshake.multiplexing
+
 
 class AuthenticatedClientContext(BaseClientContext):
     __slots__ = (
@@ -46,6 +50,7 @@ class AuthenticatedClientContext(BaseClientContext):
         "channels",
         "realms",
         "events_subscribed",
+        "events_overflowed",
         "conn_id",
         "logger",
     )
@@ -73,6 +78,7 @@ class AuthenticatedClientContext(BaseClientContext):
         self.channels = trio.open_memory_channel(4096)
         self.realms = set()
         self.events_subscribed = False
+        self.events_overflowed = False
 
         self.conn_id = self.transport.conn_id
         self.logger = self.transport.logger = self.transport.logger.bind(
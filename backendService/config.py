@@ -6,6 +6,9 @@ from typing import List, Optional
 from guardata.client.types import BackendAddr
 
 
+DEFAULT_S3_MAX_CONCURRENCY = 32
+
+
 class BaseBlockStoreConfig:
     pass
 
@@ -40,6 +43,7 @@ class S3BlockStoreConfig(BaseBlockStoreConfig):
     s3_bucket: str
     s3_key: str
     s3_secret: str
+    s3_max_concurrency: int = DEFAULT_S3_MAX_CONCURRENCY
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -94,6 +98,10 @@ class BackendConfig:
 
     debug: bool
 
+    # Notifications carrying several signals cannot be read by the backends
+    # predating them, only enable once all the backends are up to date
+    db_coalesce_notifications: bool = False
+
     @property
     def db_type(self):
         if self.db_url.upper() == "MOCKED":
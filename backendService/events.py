@@ -1,130 +1,209 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 import trio
+from collections import defaultdict
 
-from guardata.api.protocol import events_subscribe_serializer, events_listen_serializer, APIEvent
+from guardata.event_bus import EventBus
+from guardata.api.protocol import (
+    events_subscribe_serializer,
+    events_listen_serializer,
+    events_listen_batch_serializer,
+    APIEvent,
+)
 from backendService.utils import catch_protocol_errors, run_with_breathing_transport, api
 from backendService.realm import BaseRealmComponent
 from backendService.backend_events import BackendEvent
 from functools import partial
 
 
+class OrganizationSubscribers:
+    """
+    Clients subscribed to the events of an organization, indexed by user
+    and by realm so dispatching an event only visits the interested clients.
+    """
+
+    __slots__ = ("clients", "by_user", "by_realm")
+
+    def __init__(self):
+        self.clients = set()
+        self.by_user = defaultdict(set)
+        self.by_realm = defaultdict(set)
+
+    def __bool__(self):
+        return bool(self.clients)
+
+    def add(self, client_ctx):
+        self.clients.add(client_ctx)
+        self.by_user[client_ctx.user_id].add(client_ctx)
+
+    def remove(self, client_ctx):
+        self.clients.discard(client_ctx)
+        _discard_from_index(self.by_user, client_ctx.user_id, client_ctx)
+        for realm_id in client_ctx.realms:
+            _discard_from_index(self.by_realm, realm_id, client_ctx)
+
+    def add_realm(self, client_ctx, realm_id):
+        self.by_realm[realm_id].add(client_ctx)
+
+    def remove_realm(self, client_ctx, realm_id):
+        _discard_from_index(self.by_realm, realm_id, client_ctx)
+
+
+def _discard_from_index(index, key, client_ctx):
+    clients = index.get(key)
+    if clients is None:
+        return
+    clients.discard(client_ctx)
+    if not clients:
+        del index[key]
+
+
+def _coalesce_events(events):
+    # Only keep the last vlobs update of each entry, other events are kept
+    # as-is and the order of the events is preserved
+    last_vlob_updates = {}
+    for index, event_data in enumerate(events):
+        if event_data["event"] == APIEvent.REALM_VLOBS_UPDATED:
+            key = (event_data["realm_id"], event_data["src_id"])
+            previous_index = last_vlob_updates.get(key)
+            if previous_index is not None:
+                events[previous_index] = None
+            last_vlob_updates[key] = index
+    return [event_data for event_data in events if event_data is not None]
+
+
+def _send_event(client_ctx, event_data):
+    try:
+        client_ctx.send_events_channel.send_nowait(event_data)
+    except trio.WouldBlock:
+        client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+        # Let the client know it has to poll the changes
+        client_ctx.events_overflowed = True
+
+
 class EventsComponent:
-    def __init__(self, realm_component: BaseRealmComponent):
+    def __init__(self, realm_component: BaseRealmComponent, event_bus: EventBus):
         self._realm_component = realm_component
+        # Backend events are connected once, then routed to the subscribed
+        # clients through this organization -> user/realm index
+        self._subscribers = {}
 
-    @api("events_subscribe")
-    @catch_protocol_errors
-    async def api_events_subscribe(self, client_ctx, msg):
-        msg = events_subscribe_serializer.req_load(msg)
+        event_bus.connect(BackendEvent.PINGED, self._on_pinged)
+        event_bus.connect(
+            BackendEvent.REALM_VLOBS_UPDATED,
+            partial(self._on_realm_events, APIEvent.REALM_VLOBS_UPDATED),
+        )
+        event_bus.connect(
+            BackendEvent.REALM_MAINTENANCE_STARTED,
+            partial(self._on_realm_events, APIEvent.REALM_MAINTENANCE_STARTED),
+        )
+        event_bus.connect(
+            BackendEvent.REALM_MAINTENANCE_FINISHED,
+            partial(self._on_realm_events, APIEvent.REALM_MAINTENANCE_FINISHED),
+        )
+        event_bus.connect(BackendEvent.MESSAGE_RECEIVED, self._on_message_received)
+        event_bus.connect(BackendEvent.INVITE_STATUS_CHANGED, self._on_invite_status_changed)
+        event_bus.connect(BackendEvent.REALM_ROLES_UPDATED, self._on_roles_updated)
+
+    def _get_user_subscribers(self, organization_id, user_id):
+        subscribers = self._subscribers.get(organization_id)
+        if subscribers is None:
+            return ()
+        return subscribers.by_user.get(user_id, ())
 
-        def _on_roles_updated(event, backend_event, organization_id, author, realm_id, user, role):
-            if organization_id != client_ctx.organization_id or user != client_ctx.user_id:
-                return
+    def _on_roles_updated(self, backend_event, organization_id, author, realm_id, user, role):
+        subscribers = self._subscribers.get(organization_id)
+        if subscribers is None:
+            return
 
+        for client_ctx in subscribers.by_user.get(user, ()):
             if role is None:
                 client_ctx.realms.discard(realm_id)
+                subscribers.remove_realm(client_ctx, realm_id)
             else:
                 client_ctx.realms.add(realm_id)
+                subscribers.add_realm(client_ctx, realm_id)
 
             # Note for this event we don't filter out the ones sent by the client's
             # device, there is two reason for this:
             # 1) A user cannot change it own role, so this case should never occur
             # 2) Returning this event inform the peer we are ready to send it
             #    `realm.vlobs_updated` events on this realm (especially useful during tests)
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    {"event": event, "realm_id": realm_id, "role": role}
-                )
-            except trio.WouldBlock:
-                client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+            _send_event(
+                client_ctx,
+                {"event": APIEvent.REALM_ROLES_UPDATED, "realm_id": realm_id, "role": role},
+            )
 
-        def _on_pinged(event, backend_event, organization_id, author, ping):
-            if organization_id != client_ctx.organization_id or author == client_ctx.device_id:
-                return
+    def _on_pinged(self, backend_event, organization_id, author, ping):
+        subscribers = self._subscribers.get(organization_id)
+        if subscribers is None:
+            return
 
-            try:
-                client_ctx.send_events_channel.send_nowait({"event": event, "ping": ping})
-            except trio.WouldBlock:
-                client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+        for client_ctx in subscribers.clients:
+            if author != client_ctx.device_id:
+                _send_event(client_ctx, {"event": APIEvent.PINGED, "ping": ping})
 
-        def _on_realm_events(event, backend_event, organization_id, author, realm_id, **kwargs):
-            if (
-                organization_id != client_ctx.organization_id
-                or author == client_ctx.device_id
-                or realm_id not in client_ctx.realms
-            ):
-                return
+    def _on_realm_events(self, event, backend_event, organization_id, author, realm_id, **kwargs):
+        subscribers = self._subscribers.get(organization_id)
+        if subscribers is None:
+            return
 
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    {"event": event, "realm_id": realm_id, **kwargs}
-                )
-            except trio.WouldBlock:
-                client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+        for client_ctx in subscribers.by_realm.get(realm_id, ()):
+            if author != client_ctx.device_id:
+                _send_event(client_ctx, {"event": event, "realm_id": realm_id, **kwargs})
 
-        def _on_message_received(event, backend_event, organization_id, author, recipient, index):
-            if organization_id != client_ctx.organization_id or recipient != client_ctx.user_id:
-                return
+    def _on_message_received(self, backend_event, organization_id, author, recipient, index):
+        for client_ctx in self._get_user_subscribers(organization_id, recipient):
+            _send_event(client_ctx, {"event": APIEvent.MESSAGE_RECEIVED, "index": index})
 
-            try:
-                client_ctx.send_events_channel.send_nowait({"event": event, "index": index})
-            except trio.WouldBlock:
-                client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+    def _on_invite_status_changed(self, backend_event, organization_id, greeter, token, status):
+        for client_ctx in self._get_user_subscribers(organization_id, greeter):
+            _send_event(
+                client_ctx,
+                {
+                    "event": APIEvent.INVITE_STATUS_CHANGED,
+                    "token": token,
+                    "invitation_status": status,
+                },
+            )
 
-        def _on_invite_status_changed(
-            event, backend_event, organization_id, greeter, token, status
-        ):
-            if organization_id != client_ctx.organization_id or greeter != client_ctx.user_id:
-                return
+    def unsubscribe(self, client_ctx):
+        if not client_ctx.events_subscribed:
+            return
+        subscribers = self._subscribers.get(client_ctx.organization_id)
+        if subscribers is not None:
+            subscribers.remove(client_ctx)
+            if not subscribers:
+                del self._subscribers[client_ctx.organization_id]
+        client_ctx.events_subscribed = False
 
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    {"event": event, "token": token, "invitation_status": status}
-                )
-            except trio.WouldBlock:
-                client_ctx.logger.warning(f"event queue is full for {client_ctx}")
+    @api("events_subscribe")
+    @catch_protocol_errors
+    async def api_events_subscribe(self, client_ctx, msg):
+        msg = events_subscribe_serializer.req_load(msg)
 
         # Command should be idempotent
         if not client_ctx.events_subscribed:
-
-            # Connect the new callbacks
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.PINGED, partial(_on_pinged, APIEvent.PINGED)
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_VLOBS_UPDATED,
-                partial(_on_realm_events, APIEvent.REALM_VLOBS_UPDATED),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_MAINTENANCE_STARTED,
-                partial(_on_realm_events, APIEvent.REALM_MAINTENANCE_STARTED),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_MAINTENANCE_FINISHED,
-                partial(_on_realm_events, APIEvent.REALM_MAINTENANCE_FINISHED),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.MESSAGE_RECEIVED,
-                partial(_on_message_received, APIEvent.MESSAGE_RECEIVED),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.INVITE_STATUS_CHANGED,
-                partial(_on_invite_status_changed, APIEvent.INVITE_STATUS_CHANGED),
-            )
-
-            # Final event to keep up to date the list of realm we should listen on
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_ROLES_UPDATED,
-                partial(_on_roles_updated, APIEvent.REALM_ROLES_UPDATED),
-            )
+            # Start receiving events right away, the realm index is populated
+            # from the realm roles updated events and the lookup below
+            subscribers = self._subscribers.get(client_ctx.organization_id)
+            if subscribers is None:
+                subscribers = OrganizationSubscribers()
+                self._subscribers[client_ctx.organization_id] = subscribers
+            subscribers.add(client_ctx)
+            client_ctx.events_subscribed = True
 
             # Finally populate the list of realm we should listen on
             realms_for_user = await self._realm_component.get_realms_for_user(
                 client_ctx.organization_id, client_ctx.user_id
             )
-            client_ctx.realms = set(realms_for_user.keys())
-            client_ctx.events_subscribed = True
+            subscribers = self._subscribers.get(client_ctx.organization_id)
+            if subscribers is not None and client_ctx in subscribers.clients:
+                for realm_id in client_ctx.realms:
+                    subscribers.remove_realm(client_ctx, realm_id)
+                client_ctx.realms = set(realms_for_user.keys())
+                for realm_id in client_ctx.realms:
+                    subscribers.add_realm(client_ctx, realm_id)
 
         return events_subscribe_serializer.rep_dump({"status": "ok"})
 
@@ -133,7 +212,11 @@ class EventsComponent:
     async def api_events_listen(self, client_ctx, msg):
         msg = events_listen_serializer.req_load(msg)
 
-        if msg["wait"]:
+        if msg["wait"] and client_ctx.multiplexing:
+            # Transport is already monitored by the multiplexed client loop
+            event_data = await client_ctx.receive_events_channel.receive()
+
+        elif msg["wait"]:
             event_data = await run_with_breathing_transport(
                 client_ctx.transport, client_ctx.receive_events_channel.receive
             )
@@ -148,3 +231,36 @@ class EventsComponent:
                 return {"status": "no_events"}
 
         return events_listen_serializer.rep_dump({"status": "ok", **event_data})
+
+    @api("events_listen_batch")
+    @catch_protocol_errors
+    async def api_events_listen_batch(self, client_ctx, msg):
+        msg = events_listen_batch_serializer.req_load(msg)
+
+        events = []
+        if msg["wait"] and client_ctx.multiplexing:
+            # Transport is already monitored by the multiplexed client loop
+            events.append(await client_ctx.receive_events_channel.receive())
+
+        elif msg["wait"]:
+            event_data = await run_with_breathing_transport(
+                client_ctx.transport, client_ctx.receive_events_channel.receive
+            )
+
+            if not event_data:
+                return {"status": "cancelled", "reason": "Client cancelled the listening"}
+            events.append(event_data)
+
+        # Drain the events already pending
+        while True:
+            try:
+                events.append(client_ctx.receive_events_channel.receive_nowait())
+            except trio.WouldBlock:
+                break
+
+        overflow = client_ctx.events_overflowed
+        client_ctx.events_overflowed = False
+
+        return events_listen_batch_serializer.rep_dump(
+            {"status": "ok", "events": _coalesce_events(events), "overflow": overflow}
+        )
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 from uuid import UUID
+from typing import Optional
 import attr
 
 from guardata.api.protocol import DeviceID, OrganizationID
@@ -60,7 +61,12 @@ class MemoryBlockComponent(BaseBlockComponent):
             raise BlockInMaintenanceError(f"Realm `{realm_id}` is currently under maintenance")
 
     async def read(
-        self, organization_id: OrganizationID, author: DeviceID, block_id: UUID
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        block_id: UUID,
+        offset: int = 0,
+        size: Optional[int] = None,
     ) -> bytes:
         try:
             blockmeta = self._blockmetas[(organization_id, block_id)]
@@ -70,7 +76,9 @@ class MemoryBlockComponent(BaseBlockComponent):
 
         self._check_realm_read_access(organization_id, blockmeta.realm_id, author.user_id)
 
-        return await self._blockstore_component.read(organization_id, block_id)
+        if not offset and size is None:
+            return await self._blockstore_component.read(organization_id, block_id)
+        return await self._blockstore_component.read_range(organization_id, block_id, offset, size)
 
     async def create(
         self,
@@ -43,7 +43,7 @@ async def components_factory(config: BackendConfig, event_bus: EventBus):
     ping = MemoryPingComponent(_send_event)
     block = MemoryBlockComponent()
     blockstore = blockstore_factory(config.blockstore_config)
-    events = EventsComponent(realm)
+    events = EventsComponent(realm, event_bus)
 
     components = {
         "events": events,
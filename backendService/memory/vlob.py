@@ -3,7 +3,7 @@
 import attr
 import pendulum
 from uuid import UUID
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
 from collections import defaultdict
 
 from backendService.backend_events import BackendEvent
@@ -12,6 +12,8 @@ from guardata.api.protocol import RealmRole
 from backendService.realm import BaseRealmComponent, RealmNotFoundError
 from backendService.vlob import (
     BaseVlobComponent,
+    VlobReadResult,
+    VlobError,
     VlobAccessError,
     VlobVersionError,
     VlobTimestampError,
@@ -260,6 +262,24 @@ class MemoryVlobComponent(BaseVlobComponent):
         except IndexError:
             raise VlobVersionError()
 
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        encryption_revision: int,
+        items: List[Tuple[UUID, Optional[int], Optional[pendulum.DateTime]]],
+    ) -> List[Union[VlobReadResult, VlobError]]:
+        results = []
+        for vlob_id, version, timestamp in items:
+            try:
+                result = await self.read(
+                    organization_id, author, encryption_revision, vlob_id, version, timestamp
+                )
+            except VlobError as exc:
+                result = exc
+            results.append(result)
+        return results
+
     async def update(
         self,
         organization_id: OrganizationID,
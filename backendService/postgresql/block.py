@@ -2,6 +2,7 @@
 
 from triopg.exceptions import UniqueViolationError
 from uuid import UUID
+from typing import Optional
 import pendulum
 
 from guardata.api.protocol import DeviceID, OrganizationID
@@ -124,7 +125,12 @@ class PGBlockComponent(BaseBlockComponent):
         self._vlob_component = vlob_component
 
     async def read(
-        self, organization_id: OrganizationID, author: DeviceID, block_id: UUID
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        block_id: UUID,
+        offset: int = 0,
+        size: Optional[int] = None,
     ) -> bytes:
         async with self.dbh.pool.acquire() as conn, conn.transaction():
             realm_id = await conn.fetchval(
@@ -144,7 +150,9 @@ class PGBlockComponent(BaseBlockComponent):
             elif not ret["has_access"]:
                 raise BlockAccessError()
 
-        return await self._blockstore_component.read(organization_id, block_id)
+        if not offset and size is None:
+            return await self._blockstore_component.read(organization_id, block_id)
+        return await self._blockstore_component.read_range(organization_id, block_id, offset, size)
 
     async def create(
         self,
@@ -212,6 +220,18 @@ WHERE
 )
 
 
+_q_get_block_data_range = Q(
+    """
+SELECT
+    substring(data from $offset + 1 for $size)
+FROM block_data
+WHERE
+    organization_id = $organization_id
+    AND block_id = $block_id
+"""
+)
+
+
 _q_insert_block_data = Q(
     """
 INSERT INTO block_data (organization_id, block_id, data)
@@ -234,6 +254,22 @@ class PGBlockStoreComponent(BaseBlockStoreComponent):
 
             return ret[0]
 
+    async def read_range(
+        self, organization_id: OrganizationID, id: UUID, offset: int, size: Optional[int]
+    ) -> bytes:
+        if size is None:
+            return await super().read_range(organization_id, id, offset, size)
+        async with self.dbh.pool.acquire() as conn:
+            ret = await conn.fetchrow(
+                *_q_get_block_data_range(
+                    organization_id=organization_id, block_id=id, offset=offset, size=size
+                )
+            )
+            if not ret:
+                raise BlockNotFoundError()
+
+            return ret[0]
+
     async def create(self, organization_id: OrganizationID, id: UUID, block: bytes) -> None:
         async with self.dbh.pool.acquire() as conn:
             try:
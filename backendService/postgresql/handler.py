@@ -10,6 +10,8 @@ from typing import List, Tuple, Optional
 from triopg import UniqueViolationError, UndefinedTableError, PostgresError
 from uuid import uuid4
 from functools import wraps
+from contextvars import ContextVar
+from async_generator import asynccontextmanager
 from structlog import get_logger
 from base64 import b64decode, b64encode
 import importlib_resources
@@ -204,6 +206,7 @@ class PGHandler:
         first_tries_number: int,
         first_tries_sleep: int,
         event_bus: EventBus,
+        coalesce_notifications: bool = False,
     ):
         self.url = url
         self.min_connections = min_connections
@@ -211,11 +214,15 @@ class PGHandler:
         self.first_tries_number = first_tries_number
         self.first_tries_sleep = first_tries_sleep
         self.event_bus = event_bus
+        self.coalesce_notifications = coalesce_notifications
         self.pool: triopg.TrioPoolProxy
         self.notification_conn: triopg.TrioConnectionProxy
         self._task_status: Optional[TaskStatus] = None
 
     async def init(self, nursery):
+        # Signals are sent from connections of any pool, hence a process wide setting
+        global _coalesce_notifications
+        _coalesce_notifications = self.coalesce_notifications
         self._task_status = await start_task(nursery, self._run_connections)
 
     async def _run_connections(self, task_status=trio.TASK_STATUS_IGNORED):
@@ -244,32 +251,108 @@ class PGHandler:
 
     def _on_notification(self, connection, pid, channel, payload):
         data = unpackb(b64decode(payload.encode("ascii")))
-        data.pop("__id__")  # Simply discard the notification id
-        signal = data.pop("__signal__")
         logger.debug("notif received", pid=pid, channel=channel, payload=payload)
+        signals = data.get("__signals__")
+        if signals is None:
+            # Notification containing a single signal
+            data.pop("__id__")  # Simply discard the notification id
+            signal = data.pop("__signal__")
+            self._dispatch_signal(signal, data)
+        else:
+            for signal, kwargs in signals:
+                self._dispatch_signal(signal, kwargs)
+
+    def _dispatch_signal(self, signal, kwargs):
         # Convert strings to enums
         signal = STR_TO_BACKEND_EVENTS[signal]
         # Kind of a hack, but fine enough for the moment
         if signal == BackendEvent.REALM_ROLES_UPDATED:
-            data["role"] = STR_TO_REALM_ROLE.get(data.pop("role_str"))
+            kwargs["role"] = STR_TO_REALM_ROLE.get(kwargs.pop("role_str"))
         elif signal == BackendEvent.INVITE_STATUS_CHANGED:
-            data["status"] = STR_TO_INVITATION_STATUS.get(data.pop("status_str"))
-        self.event_bus.send(signal, **data)
+            kwargs["status"] = STR_TO_INVITATION_STATUS.get(kwargs.pop("status_str"))
+        self.event_bus.send(signal, **kwargs)
 
     async def teardown(self):
         if self._task_status:
             await self._task_status.cancel_and_join()
 
 
-async def send_signal(conn, signal, **kwargs):
-    # PostgreSQL's NOTIFY only accept string as payload, hence we must
-    # use base64 on our payload...
+# PostgreSQL rejects NOTIFY payloads bigger than 8000 bytes, keep some
+# margin for the base64 encoding
+MAX_NOTIFICATION_RAW_SIZE = 5000
+
+# Notifications carrying several signals cannot be read by older backends
+# (they expect a single `__signal__` field), so during a rolling upgrade each
+# signal must be sent as its own notification
+_coalesce_notifications = False
+
+_signals_batch = ContextVar("signals_batch", default=None)
+
 
+def _build_notification_payloads(signals):
     # Add UUID to ensure the payload is unique given it seems Postgresql can
     # drop duplicated NOTIFY (same channel/payload)
     # see: https://github.com/Scille/parsec-cloud/issues/199
-    raw_data = b64encode(
-        packb({"__id__": uuid4().hex, "__signal__": signal.value, **kwargs})
-    ).decode("ascii")
-    await conn.execute("SELECT pg_notify($1, $2)", "app_notification", raw_data)
+    if len(signals) == 1 or not _coalesce_notifications:
+        raw_datas = [
+            packb({"__id__": uuid4().hex, "__signal__": signal, **kwargs})
+            for signal, kwargs in signals
+        ]
+        # PostgreSQL's NOTIFY only accept string as payload, hence we must
+        # use base64 on our payload...
+        return [b64encode(raw_data).decode("ascii") for raw_data in raw_datas]
+
+    raw_data = packb({"__id__": uuid4().hex, "__signals__": signals})
+    if len(raw_data) > MAX_NOTIFICATION_RAW_SIZE:
+        middle = len(signals) // 2
+        return _build_notification_payloads(signals[:middle]) + _build_notification_payloads(
+            signals[middle:]
+        )
+    return [b64encode(raw_data).decode("ascii")]
+
+
+async def _notify(conn, signals):
+    payloads = _build_notification_payloads(signals)
+    if len(payloads) == 1:
+        await conn.execute("SELECT pg_notify($1, $2)", "app_notification", payloads[0])
+    else:
+        await conn.execute(
+            "SELECT pg_notify($1, payload) FROM unnest($2::TEXT[]) AS payload",
+            "app_notification",
+            payloads,
+        )
+
+
+@asynccontextmanager
+async def batch_signals(conn):
+    """
+    Gather the signals sent on `conn` and send them in a single query when
+    leaving the context. If coalescing is enabled, they are carried by a single
+    notification (or as few as the payload size limit allows).
+    Should be used inside a transaction, given the signals are not sent if an
+    exception is raised.
+    """
+    parent_batch = _signals_batch.get()
+    signals = []
+    token = _signals_batch.set((conn, signals))
+    try:
+        yield
+    finally:
+        _signals_batch.reset(token)
+
+    if parent_batch is not None and parent_batch[0] is conn:
+        # Nested batch (i.e. savepoint), the outermost batch sends the signals
+        parent_batch[1].extend(signals)
+    elif signals:
+        await _notify(conn, signals)
+        logger.debug("notifs sent", count=len(signals))
+
+
+async def send_signal(conn, signal, **kwargs):
+    batch = _signals_batch.get()
+    if batch is not None and batch[0] is conn:
+        batch[1].append((signal.value, kwargs))
+        return
+
+    await _notify(conn, [(signal.value, kwargs)])
     logger.debug("notif sent", signal=signal, kwargs=kwargs)
@@ -0,0 +1,14 @@
+-- Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+
+-------------------------------------------------------
+--  Migration
+-------------------------------------------------------
+
+
+-- Last checkpoint allocated in `realm_vlob_update` for this realm
+ALTER TABLE realm ADD checkpoint INTEGER NOT NULL DEFAULT 0;
+UPDATE realm SET checkpoint = COALESCE(
+    (SELECT MAX(index) FROM realm_vlob_update WHERE realm_vlob_update.realm = realm._id),
+    0
+);
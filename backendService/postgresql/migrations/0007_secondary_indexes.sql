@@ -0,0 +1,38 @@
+-- Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+
+-------------------------------------------------------
+--  Migration
+-------------------------------------------------------
+
+
+-- Vlob lookups by id outside of an encryption revision (realm resolution,
+-- version check on update, versions listing)
+CREATE INDEX vlob_atom_organization_vlob_id_version_idx
+ON vlob_atom (organization, vlob_id, version);
+
+-- Current role of the users of a realm (`DISTINCT ON(user_) ... ORDER BY
+-- user_, certified_on DESC`) and access checks for a given user
+CREATE INDEX realm_user_role_realm_user_certified_on_idx
+ON realm_user_role (realm, user_, certified_on);
+
+-- Current role of a user in each of its realms
+CREATE INDEX realm_user_role_user_realm_certified_on_idx
+ON realm_user_role (user_, realm, certified_on);
+
+-- Messages of a recipient, counted on insertion and listed by `_id`
+CREATE INDEX message_recipient_id_idx
+ON message (recipient, _id);
+
+-- Realm stats
+CREATE INDEX block_realm_idx
+ON block (realm);
+
+-- Users of a human
+CREATE INDEX user_human_idx
+ON user_ (human);
+
+-- Lookups of `realm_vlob_update` by (realm, index), `block` by
+-- (organization, block_id) and `vlob_atom` by (vlob_encryption_revision,
+-- vlob_id, version) are already covered by the indexes of their unique
+-- constraints.
@@ -238,8 +238,13 @@ def query(in_transaction=False):
         def decorator(fn):
             @wraps(fn)
             async def wrapper(conn, *args, **kwargs):
+                # Imported here to avoid a circular import with the handler module
+                from backendService.postgresql.handler import batch_signals
+
                 async with conn.transaction():
-                    return await fn(conn, *args, **kwargs)
+                    # Signals are sent as a single notification on commit
+                    async with batch_signals(conn):
+                        return await fn(conn, *args, **kwargs)
 
             return wrapper
 
@@ -2,16 +2,17 @@
 
 import pendulum
 from uuid import UUID
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
 
 from guardata.api.protocol import DeviceID, OrganizationID
-from backendService.vlob import BaseVlobComponent
-from backendService.postgresql.handler import PGHandler, retry_on_unique_violation
+from backendService.vlob import BaseVlobComponent, VlobReadResult, VlobError
+from backendService.postgresql.handler import PGHandler
 from backendService.postgresql.vlob_queries import (
     query_update,
     query_maintenance_save_reencryption_batch,
     query_maintenance_get_reencryption_batch,
     query_read,
+    query_read_batch,
     query_poll_changes,
     query_list_versions,
     query_create,
@@ -22,7 +23,6 @@ class PGVlobComponent(BaseVlobComponent):
     def __init__(self, dbh: PGHandler):
         self.dbh = dbh
 
-    @retry_on_unique_violation
     async def create(
         self,
         organization_id: OrganizationID,
@@ -59,7 +59,16 @@ class PGVlobComponent(BaseVlobComponent):
                 conn, organization_id, author, encryption_revision, vlob_id, version, timestamp
             )
 
-    @retry_on_unique_violation
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        encryption_revision: int,
+        items: List[Tuple[UUID, Optional[int], Optional[pendulum.DateTime]]],
+    ) -> List[Union[VlobReadResult, VlobError]]:
+        async with self.dbh.pool.acquire() as conn:
+            return await query_read_batch(conn, organization_id, author, encryption_revision, items)
+
     async def update(
         self,
         organization_id: OrganizationID,
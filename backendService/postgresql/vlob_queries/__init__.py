@@ -11,6 +11,7 @@ from backendService.postgresql.vlob_queries.maintenance import (
 )
 from backendService.postgresql.vlob_queries.read import (
     query_read,
+    query_read_batch,
     query_poll_changes,
     query_list_versions,
 )
@@ -21,6 +22,7 @@ __all__ = (
     "query_maintenance_save_reencryption_batch",
     "query_maintenance_get_reencryption_batch",
     "query_read",
+    "query_read_batch",
     "query_poll_changes",
     "query_list_versions",
     "query_create",
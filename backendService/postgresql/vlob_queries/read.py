@@ -2,10 +2,10 @@
 
 import pendulum
 from uuid import UUID
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 
 from guardata.api.protocol import DeviceID, OrganizationID
-from backendService.vlob import VlobVersionError, VlobNotFoundError
+from backendService.vlob import VlobError, VlobReadResult, VlobVersionError, VlobNotFoundError
 from backendService.realm import RealmRole
 from backendService.postgresql.utils import (
     Q,
@@ -90,6 +90,46 @@ WHERE
 )
 
 
+_q_read_batch_data_without_timestamp = Q(
+    f"""
+SELECT DISTINCT ON (vlob_id)
+    vlob_id,
+    version,
+    blob,
+    { q_device(_id="author", select="device_id") } as author,
+    created_on
+FROM vlob_atom
+WHERE
+    vlob_encryption_revision = {
+        q_vlob_encryption_revision_internal_id(
+            organization_id="$organization_id",
+            realm_id="$realm_id",
+            encryption_revision="$encryption_revision",
+        )
+    }
+    AND vlob_id = ANY($vlob_ids::UUID[])
+ORDER BY vlob_id, version DESC
+"""
+)
+
+
+_q_get_realm_ids_from_vlob_ids = Q(
+    f"""
+SELECT DISTINCT ON (vlob_atom.vlob_id)
+    vlob_atom.vlob_id,
+    realm.realm_id
+FROM vlob_atom
+INNER JOIN vlob_encryption_revision
+ON  vlob_atom.vlob_encryption_revision = vlob_encryption_revision._id
+INNER JOIN realm
+ON vlob_encryption_revision.realm = realm._id
+WHERE
+    vlob_atom.organization = { q_organization_internal_id("$organization_id") }
+    AND vlob_atom.vlob_id = ANY($vlob_ids::UUID[])
+"""
+)
+
+
 async def _check_realm_and_read_access(
     conn, organization_id, author, realm_id, encryption_revision
 ):
@@ -110,7 +150,91 @@ async def query_read(
 ) -> Tuple[int, bytes, DeviceID, pendulum.DateTime]:
     realm_id = await _get_realm_id_from_vlob_id(conn, organization_id, vlob_id)
     await _check_realm_and_read_access(conn, organization_id, author, realm_id, encryption_revision)
+    return await _read_data(
+        conn, organization_id, realm_id, encryption_revision, vlob_id, version, timestamp
+    )
+
+
+@query(in_transaction=True)
+async def query_read_batch(
+    conn,
+    organization_id: OrganizationID,
+    author: DeviceID,
+    encryption_revision: int,
+    items: List[Tuple[UUID, Optional[int], Optional[pendulum.DateTime]]],
+) -> List[Union[VlobReadResult, VlobError]]:
+    # Resolve the realms of all the vlobs at once, then check each realm only once
+    rows = await conn.fetch(
+        *_q_get_realm_ids_from_vlob_ids(
+            organization_id=organization_id, vlob_ids=list({item[0] for item in items})
+        )
+    )
+    vlob_realms = {row["vlob_id"]: row["realm_id"] for row in rows}
+    realm_errors: Dict[UUID, Optional[VlobError]] = {}
+    for realm_id in set(vlob_realms.values()):
+        try:
+            await _check_realm_and_read_access(
+                conn, organization_id, author, realm_id, encryption_revision
+            )
+            realm_errors[realm_id] = None
+        except VlobError as exc:
+            realm_errors[realm_id] = exc
+
+    # Reading the last version is the common case, fetch those in one query per realm
+    last_versions: Dict[UUID, list] = {}
+    per_realm_last_versions: Dict[UUID, List[UUID]] = {}
+    for vlob_id, version, timestamp in items:
+        realm_id = vlob_realms.get(vlob_id)
+        if version is None and timestamp is None and realm_id and not realm_errors[realm_id]:
+            per_realm_last_versions.setdefault(realm_id, []).append(vlob_id)
+    for realm_id, vlob_ids in per_realm_last_versions.items():
+        rows = await conn.fetch(
+            *_q_read_batch_data_without_timestamp(
+                organization_id=organization_id,
+                realm_id=realm_id,
+                encryption_revision=encryption_revision,
+                vlob_ids=vlob_ids,
+            )
+        )
+        for row in rows:
+            last_versions[row["vlob_id"]] = list(row)[1:]
+
+    results: List[Union[VlobReadResult, VlobError]] = []
+    for vlob_id, version, timestamp in items:
+        realm_id = vlob_realms.get(vlob_id)
+        if not realm_id:
+            results.append(VlobNotFoundError(f"Vlob `{vlob_id}` doesn't exist"))
+        elif realm_errors[realm_id]:
+            results.append(realm_errors[realm_id])
+        elif vlob_id in last_versions and version is None and timestamp is None:
+            results.append(last_versions[vlob_id])
+        else:
+            try:
+                results.append(
+                    await _read_data(
+                        conn,
+                        organization_id,
+                        realm_id,
+                        encryption_revision,
+                        vlob_id,
+                        version,
+                        timestamp,
+                    )
+                )
+            except VlobError as exc:
+                results.append(exc)
+    return results
 
+
+async def _read_data(
+    conn,
+    organization_id: OrganizationID,
+    realm_id: UUID,
+    encryption_revision: int,
+    vlob_id: UUID,
+    version: Optional[int],
+    timestamp: Optional[pendulum.DateTime],
+) -> Tuple[int, bytes, DeviceID, pendulum.DateTime]:
     if version is None:
         if timestamp is None:
             data = await conn.fetchrow(
@@ -27,19 +27,22 @@ from backendService.postgresql.vlob_queries.utils import (
 from backendService.backend_events import BackendEvent
 
 
+# Incrementing the realm's checkpoint locks its row until the end of the
+# transaction, hence concurrent writers of a realm wait for each other instead
+# of colliding on the `(realm, index)` unique constraint
 q_vlob_updated = Q(
     f"""
+WITH new_checkpoint AS (
+    UPDATE realm
+    SET checkpoint = checkpoint + 1
+    WHERE _id = { q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") }
+    RETURNING _id, checkpoint
+)
 INSERT INTO realm_vlob_update (
 realm, index, vlob_atom
 )
-SELECT
-{ q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") },
-(
-    SELECT COALESCE(MAX(index) + 1, 1)
-    FROM realm_vlob_update
-    WHERE realm = { q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") }
-),
-$vlob_atom_internal_id
+SELECT _id, checkpoint, $vlob_atom_internal_id
+FROM new_checkpoint
 RETURNING index
 """
 )
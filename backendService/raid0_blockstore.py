@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 from uuid import UUID
+from typing import Optional
 
 from guardata.api.protocol import OrganizationID
 from backendService.blockstore import BaseBlockStoreComponent
@@ -17,6 +18,12 @@ class RAID0BlockStoreComponent(BaseBlockStoreComponent):
         blockstore = self._get_blockstore(id)
         return await blockstore.read(organization_id, id)
 
+    async def read_range(
+        self, organization_id: OrganizationID, id: UUID, offset: int, size: Optional[int]
+    ) -> bytes:
+        blockstore = self._get_blockstore(id)
+        return await blockstore.read_range(organization_id, id, offset, size)
+
     async def create(self, organization_id: OrganizationID, id: UUID, block: bytes) -> None:
         blockstore = self._get_blockstore(id)
         await blockstore.create(organization_id, id, block)
@@ -1,21 +1,57 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
+import attr
+import time
 import trio
 import boto3
+from botocore.config import Config as S3Config
 from botocore.exceptions import (
     ClientError as S3ClientError,
     EndpointConnectionError as S3EndpointConnectionError,
 )
 from uuid import UUID
+from typing import Optional
 from functools import partial
+from structlog import get_logger
 
 from guardata.api.protocol import OrganizationID
+from backendService.config import DEFAULT_S3_MAX_CONCURRENCY
 from backendService.blockstore import BaseBlockStoreComponent
 from backendService.block import BlockAlreadyExistsError, BlockNotFoundError, BlockTimeoutError
 
 
+logger = get_logger()
+
+
+@attr.s(slots=True, auto_attribs=True)
+class S3CallStats:
+    count: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def record(self, duration: float, error: bool = False) -> None:
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+
 class S3BlockStoreComponent(BaseBlockStoreComponent):
-    def __init__(self, s3_region, s3_bucket, s3_key, s3_secret, s3_endpoint_url=None):
+    def __init__(
+        self,
+        s3_region,
+        s3_bucket,
+        s3_key,
+        s3_secret,
+        s3_endpoint_url=None,
+        max_concurrency=DEFAULT_S3_MAX_CONCURRENCY,
+    ):
         self._s3 = None
         self._s3_bucket = None
         self._s3 = boto3.client(
@@ -24,39 +60,81 @@ class S3BlockStoreComponent(BaseBlockStoreComponent):
             aws_access_key_id=s3_key,
             aws_secret_access_key=s3_secret,
             endpoint_url=s3_endpoint_url,
+            # One connection per worker thread allowed by the limiter
+            config=S3Config(max_pool_connections=max_concurrency),
         )
         self._s3_bucket = s3_bucket
         self._s3.head_bucket(Bucket=s3_bucket)
+        # All boto3 calls are blocking, hence they are run in worker threads.
+        # The limiter bounds both the number of threads and the number of
+        # concurrent connections opened against the S3 endpoint.
+        self._limiter = trio.CapacityLimiter(max_concurrency)
+        self.read_stats = S3CallStats()
+        self.create_stats = S3CallStats()
+
+    async def _run_in_thread(self, fn, *args, **kwargs):
+        return await trio.to_thread.run_sync(partial(fn, *args, **kwargs), limiter=self._limiter)
+
+    def _get_object_data(self, slug: str, **kwargs) -> bytes:
+        # Fetching the object and consuming its body are both network bound,
+        # so they must be done together in the worker thread
+        obj = self._s3.get_object(Bucket=self._s3_bucket, Key=slug, **kwargs)
+        return obj["Body"].read()
 
     async def read(self, organization_id: OrganizationID, id: UUID) -> bytes:
+        return await self._read(organization_id, id)
+
+    async def read_range(
+        self, organization_id: OrganizationID, id: UUID, offset: int, size: Optional[int]
+    ) -> bytes:
+        if size == 0:
+            return b""
+        stop = "" if size is None else offset + size - 1
+        return await self._read(organization_id, id, Range=f"bytes={offset}-{stop}")
+
+    async def _read(self, organization_id: OrganizationID, id: UUID, **kwargs) -> bytes:
         slug = f"{organization_id}/{id}"
+        start = time.monotonic()
+        error = True
         try:
-            obj = self._s3.get_object(Bucket=self._s3_bucket, Key=slug)
+            data = await self._run_in_thread(self._get_object_data, slug, **kwargs)
+            error = False
 
         except S3ClientError as exc:
-            if exc.response["Error"]["Code"] == "404":
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
                 raise BlockNotFoundError() from exc
 
+            elif exc.response["Error"]["Code"] == "InvalidRange":
+                # The range starts after the end of the block
+                error = False
+                return b""
+
             else:
                 raise BlockTimeoutError() from exc
 
         except S3EndpointConnectionError as exc:
             raise BlockTimeoutError() from exc
 
-        return obj["Body"].read()
+        finally:
+            duration = time.monotonic() - start
+            self.read_stats.record(duration, error=error)
+            logger.debug("S3 block read", slug=slug, duration=duration, error=error)
+
+        return data
 
     async def create(self, organization_id: OrganizationID, id: UUID, block: bytes) -> None:
         slug = f"{organization_id}/{id}"
+        start = time.monotonic()
+        error = True
         try:
-            await trio.to_thread.run_sync(
-                partial(self._s3.head_object, Bucket=self._s3_bucket, Key=slug)
-            )
+            await self._run_in_thread(self._s3.head_object, Bucket=self._s3_bucket, Key=slug)
         except S3ClientError as exc:
             if exc.response["Error"]["Code"] == "404":
                 try:
-                    await trio.to_thread.run_sync(
-                        partial(self._s3.put_object, Bucket=self._s3_bucket, Key=slug, Body=block)
+                    await self._run_in_thread(
+                        self._s3.put_object, Bucket=self._s3_bucket, Key=slug, Body=block
                     )
+                    error = False
                 except (S3ClientError, S3EndpointConnectionError) as exc:
                     raise BlockTimeoutError() from exc
             else:
@@ -65,4 +143,10 @@ class S3BlockStoreComponent(BaseBlockStoreComponent):
         except S3EndpointConnectionError as exc:
             raise BlockTimeoutError() from exc
         else:
+            error = False
             raise BlockAlreadyExistsError()
+
+        finally:
+            duration = time.monotonic() - start
+            self.create_stats.record(duration, error=error)
+            logger.debug("S3 block create", slug=slug, duration=duration, error=error)
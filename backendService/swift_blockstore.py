@@ -4,6 +4,7 @@ import trio
 from unittest.mock import Mock
 import pbr.version
 from uuid import UUID
+from typing import Optional
 from functools import partial
 
 
@@ -37,16 +38,31 @@ class SwiftBlockStoreComponent(BaseBlockStoreComponent):
         self.swift_client.head_container(container)
 
     async def read(self, organization_id: OrganizationID, id: UUID) -> bytes:
+        return await self._read(organization_id, id)
+
+    async def read_range(
+        self, organization_id: OrganizationID, id: UUID, offset: int, size: Optional[int]
+    ) -> bytes:
+        if size == 0:
+            return b""
+        stop = "" if size is None else offset + size - 1
+        return await self._read(organization_id, id, headers={"Range": f"bytes={offset}-{stop}"})
+
+    async def _read(self, organization_id: OrganizationID, id: UUID, headers=None) -> bytes:
         slug = f"{organization_id}/{id}"
         try:
             headers, obj = await trio.to_thread.run_sync(
-                self.swift_client.get_object, self._container, slug
+                partial(self.swift_client.get_object, self._container, slug, headers=headers)
             )
 
         except ClientException as exc:
             if exc.http_status == 404:
                 raise BlockNotFoundError() from exc
 
+            elif exc.http_status == 416:
+                # The range starts after the end of the block
+                return b""
+
             else:
                 raise BlockTimeoutError() from exc
 
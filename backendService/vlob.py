@@ -1,6 +1,6 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
 from uuid import UUID
 import pendulum
 
@@ -10,6 +10,7 @@ from guardata.api.protocol import (
     OrganizationID,
     vlob_create_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_update_serializer,
     vlob_poll_changes_serializer,
     vlob_list_versions_serializer,
@@ -59,6 +60,26 @@ class VlobMaintenanceError(VlobError):
     pass
 
 
+VlobReadResult = Tuple[int, bytes, DeviceID, pendulum.DateTime]
+
+
+def _vlob_read_error_status(exc: VlobError) -> str:
+    if isinstance(exc, VlobNotFoundError):
+        return "not_found"
+    elif isinstance(exc, VlobAccessError):
+        return "not_allowed"
+    elif isinstance(exc, VlobVersionError):
+        return "bad_version"
+    elif isinstance(exc, VlobTimestampError):
+        return "bad_timestamp"
+    elif isinstance(exc, VlobEncryptionRevisionError):
+        return "bad_encryption_revision"
+    elif isinstance(exc, VlobInMaintenanceError):
+        return "in_maintenance"
+    else:
+        raise exc
+
+
 class BaseVlobComponent:
     @api("vlob_create")
     @catch_protocol_errors
@@ -124,6 +145,39 @@ class BaseVlobComponent:
             }
         )
 
+    @api("vlob_read_batch")
+    @catch_protocol_errors
+    async def api_vlob_read_batch(self, client_ctx, msg):
+        msg = vlob_read_batch_serializer.req_load(msg)
+
+        results = await self.read_batch(
+            client_ctx.organization_id,
+            client_ctx.device_id,
+            msg["encryption_revision"],
+            [(item["vlob_id"], item["version"], item["timestamp"]) for item in msg["items"]],
+        )
+
+        items = []
+        for item, result in zip(msg["items"], results):
+            if isinstance(result, VlobError):
+                items.append(
+                    {"status": _vlob_read_error_status(result), "vlob_id": item["vlob_id"]}
+                )
+            else:
+                version, blob, author, created_on = result
+                items.append(
+                    {
+                        "status": "ok",
+                        "vlob_id": item["vlob_id"],
+                        "blob": blob,
+                        "version": version,
+                        "author": author,
+                        "timestamp": created_on,
+                    }
+                )
+
+        return vlob_read_batch_serializer.rep_dump({"status": "ok", "items": items})
+
     @api("vlob_update")
     @catch_protocol_errors
     async def api_vlob_update(self, client_ctx, msg):
@@ -329,6 +383,20 @@ class BaseVlobComponent:
         """
         raise NotImplementedError()
 
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        encryption_revision: int,
+        items: List[Tuple[UUID, Optional[int], Optional[pendulum.DateTime]]],
+    ) -> List[Union[VlobReadResult, VlobError]]:
+        """
+        Read several vlobs, each item being `(vlob_id, version, timestamp)`
+        as for `read`. The results are in the same order than the items, an
+        item that cannot be read gets the error `read` would have raised.
+        """
+        raise NotImplementedError()
+
     async def update(
         self,
         organization_id: OrganizationID,
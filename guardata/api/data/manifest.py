@@ -45,6 +45,11 @@ class BlockAccess(BaseData):
         offset = fields.Integer(required=True, validate=validate.Range(min=0))
         size = fields.Integer(required=True, validate=validate.Range(min=0))
         digest = fields.HashDigest(required=True)
+        # None for legacy blocks encrypted as a whole, otherwise the block
+        # is encrypted as independently authenticated segments of this size
+        segment_size = fields.Integer(
+            validate=lambda n: n is None or n >= 1, allow_none=True, missing=None
+        )
 
         @post_load
         def make_obj(self, data):
@@ -55,6 +60,7 @@ class BlockAccess(BaseData):
     offset: int
     size: int
     digest: HashDigest
+    segment_size: Optional[int] = None
 
 
 @attr.s(slots=True, frozen=True, auto_attribs=True, kw_only=True, eq=False)
@@ -49,6 +49,7 @@ from guardata.api.protocol.organization import (
 from guardata.api.protocol.events import (
     events_subscribe_serializer,
     events_listen_serializer,
+    events_listen_batch_serializer,
     APIEvent,
 )
 from guardata.api.protocol.ping import ping_serializer
@@ -109,6 +110,7 @@ from guardata.api.protocol.block import block_create_serializer, block_read_seri
 from guardata.api.protocol.vlob import (
     vlob_create_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_update_serializer,
     vlob_poll_changes_serializer,
     vlob_list_versions_serializer,
@@ -168,6 +170,7 @@ __all__ = (
     # Events
     "events_subscribe_serializer",
     "events_listen_serializer",
+    "events_listen_batch_serializer",
     "APIEvent",
     # Ping
     "ping_serializer",
@@ -225,6 +228,7 @@ __all__ = (
     # Vlob
     "vlob_create_serializer",
     "vlob_read_serializer",
+    "vlob_read_batch_serializer",
     "vlob_update_serializer",
     "vlob_poll_changes_serializer",
     "vlob_list_versions_serializer",
@@ -1,6 +1,6 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
-from guardata.serde import fields
+from guardata.serde import fields, validate
 from guardata.api.protocol.base import BaseReqSchema, BaseRepSchema, CmdSerializer
 
 
@@ -22,6 +22,9 @@ block_create_serializer = CmdSerializer(BlockCreateReqSchema, BlockCreateRepSche
 
 class BlockReadReqSchema(BaseReqSchema):
     block_id = fields.UUID(required=True)
+    # Optional range, `size=None` means up to the end of the block
+    offset = fields.Integer(validate=validate.Range(min=0), missing=0)
+    size = fields.Integer(validate=lambda n: n is None or n >= 0, missing=None)
 
 
 class BlockReadRepSchema(BaseRepSchema):
@@ -4,6 +4,7 @@
 AUTHENTICATED_CMDS = {
     "events_subscribe",
     "events_listen",
+    "events_listen_batch",
     "ping",  # TODO: remove ping and ping event (only have them in tests)
     # Message
     "message_get",
@@ -31,6 +32,7 @@ AUTHENTICATED_CMDS = {
     "vlob_poll_changes",
     "vlob_create",
     "vlob_read",
+    "vlob_read_batch",
     "vlob_update",
     "vlob_list_versions",
     "vlob_maintenance_get_reencryption_batch",
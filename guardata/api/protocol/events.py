@@ -83,6 +83,33 @@ class EventsListenRepSchema(OneOfSchema):
 events_listen_serializer = CmdSerializer(EventsListenReqSchema, EventsListenRepSchema)
 
 
+class EventsListenBatchReqSchema(BaseReqSchema):
+    wait = fields.Boolean(missing=True)
+
+
+class EventsListenBatchItemSchema(OneOfSchema):
+    type_field = "event"
+    type_schemas = {
+        event: schema.__class__(exclude=("status",))
+        for event, schema in EventsListenRepSchema.type_schemas.items()
+    }
+
+    def get_obj_type(self, obj):
+        return obj["event"]
+
+
+class EventsListenBatchRepSchema(BaseRepSchema):
+    events = fields.List(fields.Nested(EventsListenBatchItemSchema), required=True)
+    # Some events have been lost given the backend queue was full, the client
+    # should poll the changes instead of relying on the events
+    overflow = fields.Boolean(required=True)
+
+
+events_listen_batch_serializer = CmdSerializer(
+    EventsListenBatchReqSchema, EventsListenBatchRepSchema
+)
+
+
 class EventsSubscribeReqSchema(BaseReqSchema):
     pass
 
@@ -102,6 +102,8 @@ class HandshakeChallengeSchema(BaseSchema):
     handshake = fields.CheckedConstant("challenge", required=True)
     challenge = fields.Bytes(required=True)
     supported_api_versions = fields.List(ApiVersionField(), required=True)
+    # Backend is able to process concurrently requests tagged with a `req_id`
+    multiplexing = fields.Boolean(missing=False)
 
 
 handshake_challenge_serializer = serializer_factory(HandshakeChallengeSchema)
@@ -123,6 +125,7 @@ class HandshakeAuthenticatedAnswerSchema(BaseSchema):
     device_id = DeviceIDField(required=True)
     rvk = fields.VerifyKey(required=True)
     answer = fields.Bytes(required=True)
+    multiplexing = fields.Boolean(missing=False)
 
 
 class HandshakeInvitedAnswerSchema(BaseSchema):
@@ -132,6 +135,7 @@ class HandshakeInvitedAnswerSchema(BaseSchema):
     organization_id = OrganizationIDField(required=True)
     invitation_type = InvitationTypeField(required=True)
     token = fields.UUID(required=True)
+    multiplexing = fields.Boolean(missing=False)
 
 
 class HandshakeAnswerSchema(OneOfSchema):
@@ -201,6 +205,7 @@ handshake_result_serializer = serializer_factory(HandshakeResultSchema)
 class ServerHandshake:
     # Class attribute
     SUPPORTED_API_VERSIONS = (API_V2_VERSION, API_V1_VERSION)
+    SUPPORT_MULTIPLEXING = True
 
     def __init__(self, challenge_size: int = 48):
         # Challenge
@@ -213,6 +218,9 @@ class ServerHandshake:
         self.client_api_version = None
         self.backend_api_version = None
 
+        # Multiplexing is only enabled if requested by the client
+        self.multiplexing = False
+
         # State
         self.state = "stalled"
 
@@ -231,6 +239,7 @@ class ServerHandshake:
                 "handshake": "challenge",
                 "challenge": self.challenge,
                 "supported_api_versions": self.SUPPORTED_API_VERSIONS,
+                "multiplexing": self.SUPPORT_MULTIPLEXING,
             }
         )
 
@@ -254,6 +263,7 @@ class ServerHandshake:
 
         data.pop("handshake")
         self.answer_type = data.pop("type")
+        self.multiplexing = self.SUPPORT_MULTIPLEXING and data.pop("multiplexing", False)
         self.answer_data = data
         self.state = "answer"
 
@@ -348,6 +358,7 @@ class ServerHandshake:
 
 class BaseClientHandshake:
     SUPPORTED_API_VERSIONS = None  # Overwritten by subclasses
+    multiplexing = False  # Overwritten by subclasses supporting multiplexing
 
     def __init__(self):
         self.challenge_data = None
@@ -397,14 +408,18 @@ class AuthenticatedClientHandshake(BaseClientHandshake):
         device_id: DeviceID,
         user_signkey: SigningKey,
         root_verify_key: VerifyKey,
+        multiplexing: bool = False,
     ):
         self.organization_id = organization_id
         self.device_id = device_id
         self.user_signkey = user_signkey
         self.root_verify_key = root_verify_key
+        self.multiplexing = multiplexing
 
     def process_challenge_req(self, req: bytes) -> bytes:
         self.load_challenge_req(req)
+        # Only ask for multiplexing if the backend supports it
+        self.multiplexing = self.multiplexing and self.challenge_data["multiplexing"]
         answer = self.user_signkey.sign(self.challenge_data["challenge"])
         return self.HANDSHAKE_ANSWER_SERIALIZER.dumps(
             {
@@ -415,6 +430,7 @@ class AuthenticatedClientHandshake(BaseClientHandshake):
                 "device_id": self.device_id,
                 "rvk": self.root_verify_key,
                 "answer": answer,
+                "multiplexing": self.multiplexing,
             }
         )
 
@@ -8,6 +8,7 @@ from guardata.api.protocol.types import DeviceIDField
 __all__ = (
     "vlob_create_serializer",
     "vlob_read_serializer",
+    "vlob_read_batch_serializer",
     "vlob_update_serializer",
     "vlob_poll_changes_serializer",
     "vlob_list_versions_serializer",
@@ -57,6 +58,41 @@ class VlobReadRepSchema(BaseRepSchema):
 vlob_read_serializer = CmdSerializer(VlobReadReqSchema, VlobReadRepSchema)
 
 
+VLOB_READ_BATCH_MAX_SIZE = 1000
+
+
+class VlobReadBatchReqItemSchema(BaseSchema):
+    vlob_id = fields.UUID(required=True)
+    version = fields.Integer(validate=lambda n: n is None or _validate_version(n), missing=None)
+    timestamp = fields.DateTime(allow_none=True, missing=None)
+
+
+class VlobReadBatchReqSchema(BaseReqSchema):
+    encryption_revision = fields.Integer(required=True)
+    items = fields.List(
+        fields.Nested(VlobReadBatchReqItemSchema),
+        required=True,
+        validate=validate.Length(max=VLOB_READ_BATCH_MAX_SIZE),
+    )
+
+
+# Each item has its own status, using the same values than `vlob_read`
+class VlobReadBatchRepItemSchema(BaseSchema):
+    status = fields.String(required=True)
+    vlob_id = fields.UUID(required=True)
+    version = fields.Integer(validate=lambda n: n is None or _validate_version(n), missing=None)
+    blob = fields.Bytes(allow_none=True, missing=None)
+    author = DeviceIDField(allow_none=True, missing=None)
+    timestamp = fields.DateTime(allow_none=True, missing=None)
+
+
+class VlobReadBatchRepSchema(BaseRepSchema):
+    items = fields.List(fields.Nested(VlobReadBatchRepItemSchema), required=True)
+
+
+vlob_read_batch_serializer = CmdSerializer(VlobReadBatchReqSchema, VlobReadBatchRepSchema)
+
+
 class VlobUpdateReqSchema(BaseReqSchema):
     encryption_revision = fields.Integer(required=True)
     vlob_id = fields.UUID(required=True)
@@ -42,6 +42,9 @@ class Transport:
         self.logger = logger.bind(conn_id=self.conn_id)
         self._ws_events = ws.events()
         self._handshake = None
+        # Sending can be done concurrently from receiving (ping/pong) and,
+        # on multiplexed connections, by multiple senders
+        self._send_lock = trio.StrictFIFOLock()
 
     # Application handshake interface
     # TODO: Investigate a better place for providing an access to the peer API version
@@ -89,7 +92,8 @@ class Transport:
 
     async def _net_send(self, wsmsg):
         try:
-            await self.stream.send_all(self.ws.send(wsmsg))
+            async with self._send_lock:
+                await self.stream.send_all(self.ws.send(wsmsg))
 
         except BrokenResourceError as exc:
             raise TransportError(*exc.args) from exc
@@ -146,9 +150,10 @@ class Transport:
     async def aclose(self) -> None:
         try:
             try:
-                await self.stream.send_all(
-                    self.ws.send(CloseConnection(code=CloseReason.NORMAL_CLOSURE))
-                )
+                async with self._send_lock:
+                    await self.stream.send_all(
+                        self.ws.send(CloseConnection(code=CloseReason.NORMAL_CLOSURE))
+                    )
             except LocalProtocolError:
                 # TODO: exception occurs when ws.state is already closed...
                 pass
@@ -50,6 +50,23 @@ def _handle_event(event_bus: EventBus, rep: dict) -> None:
         logger.warning("Bad response to `events_listen` command", rep=rep)
         return
 
+    _dispatch_event(event_bus, rep)
+
+
+def _handle_events_batch(event_bus: EventBus, rep: dict) -> None:
+    if rep["status"] != "ok":
+        logger.warning("Bad response to `events_listen_batch` command", rep=rep)
+        return
+
+    for event in rep["events"]:
+        _dispatch_event(event_bus, event)
+
+    if rep["overflow"]:
+        # The events we missed can only be recovered by polling the changes
+        event_bus.send(ClientEvent.BACKEND_EVENTS_OVERFLOWED)
+
+
+def _dispatch_event(event_bus: EventBus, rep: dict) -> None:
     if rep["event"] == APIEvent.MESSAGE_RECEIVED:
         event_bus.send(ClientEvent.BACKEND_MESSAGE_RECEIVED, index=rep["index"])
 
@@ -87,9 +104,13 @@ def _handle_event(event_bus: EventBus, rep: dict) -> None:
 
 
 def _transport_pool_factory(addr, device_id, signing_key, max_pool, keepalive):
-    async def _connect():
+    async def _connect(multiplexing=False):
         transport = await connect_as_authenticated(
-            addr, device_id=device_id, signing_key=signing_key, keepalive=keepalive
+            addr,
+            device_id=device_id,
+            signing_key=signing_key,
+            keepalive=keepalive,
+            multiplexing=multiplexing,
         )
         transport.logger = transport.logger.bind(device_id=device_id)
         return transport
@@ -107,6 +128,7 @@ class BackendAuthenticatedConn:
         max_cooldown: int = 30,
         max_pool: int = 4,
         keepalive: Optional[int] = None,
+        multiplexing: bool = True,
     ):
         if max_pool < 2:
             raise ValueError("max_pool must be at least 2 (for event listener + query sender)")
@@ -126,6 +148,7 @@ class BackendAuthenticatedConn:
         self._backend_connection_failures = 0
         self.event_bus = event_bus
         self.max_cooldown = max_cooldown
+        self.multiplexing = multiplexing
 
     @property
     def status(self) -> BackendConnStatus:
@@ -172,6 +195,10 @@ class BackendAuthenticatedConn:
         if self._started:
             raise RuntimeError("Already started")
         async with trio.open_service_nursery() as nursery:
+            if self.multiplexing:
+                # Commands share a single transport (the event listener keeps
+                # its own one), given the backend supports it
+                self._transport_pool.multiplexing_nursery = nursery
             nursery.start_soon(self._run_manager)
             yield
             nursery.cancel_scope.cancel()
@@ -257,6 +284,13 @@ class BackendAuthenticatedConn:
 
                     self.set_status(BackendConnStatus.READY)
 
+                    while True:
+                        rep = await cmds.events_listen_batch(transport, wait=True)
+                        # Older backends only provide events one at a time
+                        if rep["status"] == "unknown_command":
+                            break
+                        _handle_events_batch(self.event_bus, rep)
+
                     while True:
                         rep = await cmds.events_listen(transport, wait=True)
                         _handle_event(self.event_bus, rep)
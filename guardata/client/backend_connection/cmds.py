@@ -41,8 +41,10 @@ from guardata.api.protocol import (
     apiv1_organization_bootstrap_serializer,
     events_subscribe_serializer,
     events_listen_serializer,
+    events_listen_batch_serializer,
     message_get_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_create_serializer,
     vlob_update_serializer,
     vlob_poll_changes_serializer,
@@ -76,6 +78,7 @@ from guardata.api.protocol import (
 )
 from guardata.client.types import EntryID
 from guardata.client.backend_connection.exceptions import BackendNotAvailable, BackendProtocolError
+from guardata.client.backend_connection.transport import MultiplexedTransport
 
 
 async def _send_cmd(transport: Transport, serializer, **req) -> dict:
@@ -91,24 +94,35 @@ async def _send_cmd(transport: Transport, serializer, **req) -> dict:
         BackendCmdsBadResponse
     """
     transport.logger.info("Request", cmd=req["cmd"])
+    multiplexed = isinstance(transport, MultiplexedTransport)
 
     try:
-        raw_req = serializer.req_dumps(req)
+        if multiplexed:
+            # Request/reply are packed by the multiplexed transport
+            req_data = serializer.req_dump(req)
+        else:
+            raw_req = serializer.req_dumps(req)
 
     except ProtocolError as exc:
         transport.logger.exception("Invalid request data", cmd=req["cmd"], error=exc)
         raise BackendProtocolError("Invalid request data") from exc
 
     try:
-        await transport.send(raw_req)
-        raw_rep = await transport.recv()
+        if multiplexed:
+            rep_data = await transport.send_and_recv(req_data)
+        else:
+            await transport.send(raw_req)
+            raw_rep = await transport.recv()
 
     except TransportError as exc:
         transport.logger.debug("Request failed (backend not available)", cmd=req["cmd"])
         raise BackendNotAvailable(exc) from exc
 
     try:
-        rep = serializer.rep_loads(raw_rep)
+        if multiplexed:
+            rep = serializer.rep_load(rep_data)
+        else:
+            rep = serializer.rep_loads(raw_rep)
 
     except ProtocolError as exc:
         transport.logger.exception("Invalid response data", cmd=req["cmd"], error=exc)
@@ -145,6 +159,12 @@ async def events_listen(transport: Transport, wait: bool = True) -> dict:
     return await _send_cmd(transport, events_listen_serializer, cmd="events_listen", wait=wait)
 
 
+async def events_listen_batch(transport: Transport, wait: bool = True) -> dict:
+    return await _send_cmd(
+        transport, events_listen_batch_serializer, cmd="events_listen_batch", wait=wait
+    )
+
+
 ### Message API ###
 
 
@@ -193,6 +213,23 @@ async def vlob_read(
     )
 
 
+async def vlob_read_batch(
+    transport: Transport,
+    encryption_revision: int,
+    items: List[Tuple[UUID, Optional[int], Optional[pendulum.DateTime]]],
+) -> dict:
+    return await _send_cmd(
+        transport,
+        vlob_read_batch_serializer,
+        cmd="vlob_read_batch",
+        encryption_revision=encryption_revision,
+        items=[
+            {"vlob_id": vlob_id, "version": version, "timestamp": timestamp}
+            for vlob_id, version, timestamp in items
+        ],
+    )
+
+
 async def vlob_update(
     transport: Transport,
     encryption_revision: int,
@@ -273,12 +310,15 @@ async def realm_status(transport: Transport, realm_id: UUID) -> dict:
     )
 
 
-async def realm_get_role_certificates(transport: Transport, realm_id: UUID) -> dict:
+async def realm_get_role_certificates(
+    transport: Transport, realm_id: UUID, since: pendulum.DateTime = None
+) -> dict:
     return await _send_cmd(
         transport,
         realm_get_role_certificates_serializer,
         cmd="realm_get_role_certificates",
         realm_id=realm_id,
+        since=since,
     )
 
 
@@ -338,8 +378,17 @@ async def block_create(transport: Transport, block_id: UUID, realm_id: UUID, blo
     )
 
 
-async def block_read(transport: Transport, block_id: UUID) -> dict:
-    return await _send_cmd(transport, block_read_serializer, cmd="block_read", block_id=block_id)
+async def block_read(
+    transport: Transport, block_id: UUID, offset: int = 0, size: int = None
+) -> dict:
+    return await _send_cmd(
+        transport,
+        block_read_serializer,
+        cmd="block_read",
+        block_id=block_id,
+        offset=offset,
+        size=size,
+    )
 
 
 ### Invite API ###
@@ -4,15 +4,18 @@
 import os
 import trio
 import ssl
+from itertools import count
 from async_generator import asynccontextmanager
 from structlog import get_logger
-from typing import Optional, Union
+from typing import Optional, Union, Dict
 
 from guardata.crypto import SigningKey
 from guardata.api.transport import Transport, TransportError, TransportClosedByPeer
 from guardata.api.protocol import (
     DeviceID,
     ProtocolError,
+    packb,
+    unpackb,
     HandshakeError,
     BaseClientHandshake,
     AuthenticatedClientHandshake,
@@ -37,6 +40,7 @@ from guardata.client.backend_connection.exceptions import (
 logger = get_logger()
 
 TIMEOUT_SERVER_CONNECT = 8
+MAX_MULTIPLEXED_IN_FLIGHT = 32
 
 
 async def apiv1_connect(
@@ -86,12 +90,14 @@ async def connect_as_authenticated(
     device_id: DeviceID,
     signing_key: SigningKey,
     keepalive: Optional[int] = None,
+    multiplexing: bool = False,
 ):
     handshake = AuthenticatedClientHandshake(
         organization_id=addr.organization_id,
         device_id=device_id,
         user_signkey=signing_key,
         root_verify_key=addr.root_verify_key,
+        multiplexing=multiplexing,
     )
     return await _connect(addr.hostname, addr.port, addr.use_ssl, keepalive, handshake)
 
@@ -167,12 +173,129 @@ async def _do_handshake(transport: Transport, handshake):
         raise BackendProtocolError(exc) from exc
 
 
+class MultiplexedTransport:
+    """
+    Share a transport between concurrent commands.
+
+    Each request is tagged with a unique `req_id` the backend copies into the
+    reply, hence a single reader task can dispatch the replies to their
+    requesters whatever the order they arrive in.
+    """
+
+    def __init__(self, transport: Transport, max_in_flight: int = MAX_MULTIPLEXED_IN_FLIGHT):
+        self.transport = transport
+        self.logger = transport.logger
+        self._req_ids = count(1)
+        self._waiters: Dict[int, trio.MemorySendChannel] = {}
+        self._in_flight = trio.Semaphore(max_in_flight)
+        self._closed_exc = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed_exc is not None
+
+    async def aclose(self, exc: Optional[TransportError] = None) -> None:
+        if self.closed:
+            return
+        self._closed_exc = exc or TransportError("Multiplexed transport has been closed")
+        # Wake up all the requesters still waiting for their reply
+        waiters = list(self._waiters.values())
+        self._waiters.clear()
+        for waiter in waiters:
+            await waiter.aclose()
+        await self.transport.aclose()
+
+    async def run(self, *, task_status=trio.TASK_STATUS_IGNORED) -> None:
+        task_status.started()
+        try:
+            while True:
+                raw_rep = await self.transport.recv()
+                try:
+                    rep = unpackb(raw_rep)
+                    req_id = rep.pop("req_id")
+                except (ProtocolError, AttributeError, KeyError):
+                    raise TransportError("Invalid reply received on multiplexed transport")
+
+                waiter = self._waiters.pop(req_id, None)
+                if waiter:
+                    waiter.send_nowait(rep)
+                else:
+                    # Requester has been cancelled while waiting for its reply
+                    self.logger.debug("Drop reply to unknown request", req_id=req_id)
+
+        except TransportError as exc:
+            with trio.CancelScope(shield=True):
+                await self.aclose(exc)
+
+        finally:
+            with trio.CancelScope(shield=True):
+                await self.aclose()
+
+    async def send_and_recv(self, req: dict) -> dict:
+        """
+        Raises:
+            TransportError
+        """
+        async with self._in_flight:
+            if self._closed_exc:
+                raise TransportError(*self._closed_exc.args) from self._closed_exc
+            req_id = next(self._req_ids)
+            send_channel, receive_channel = trio.open_memory_channel(1)
+            self._waiters[req_id] = send_channel
+            try:
+                raw_req = packb({**req, "req_id": req_id})
+                # Cancelling in the middle of a send would corrupt the transport
+                # for all the other requesters
+                with trio.CancelScope(shield=True):
+                    try:
+                        await self.transport.send(raw_req)
+                    except TransportError as exc:
+                        await self.aclose(exc)
+                        raise
+
+                try:
+                    return await receive_channel.receive()
+                except trio.EndOfChannel:
+                    raise TransportError(*self._closed_exc.args) from self._closed_exc
+
+            finally:
+                self._waiters.pop(req_id, None)
+
+
 class TransportPool:
-    def __init__(self, connect_cb, max_pool):
+    def __init__(self, connect_cb, max_pool, multiplexing_nursery=None):
         self._connect_cb = connect_cb
         self._transports = []
         self._closed = False
         self._lock = trio.Semaphore(max_pool)
+        # Multiplexing requires a nursery to run the transport's reader task
+        self.multiplexing_nursery = multiplexing_nursery
+        self._multiplexing_supported = True
+        self._multiplexed_transport = None
+        self._multiplexed_transport_lock = trio.Lock()
+
+    async def _get_multiplexed_transport(self) -> Optional[MultiplexedTransport]:
+        if not self.multiplexing_nursery or not self._multiplexing_supported:
+            return None
+
+        async with self._multiplexed_transport_lock:
+            if self._multiplexed_transport and not self._multiplexed_transport.closed:
+                return self._multiplexed_transport
+
+            if self._closed:
+                raise trio.ClosedResourceError()
+
+            transport = await self._connect_cb(multiplexing=True)
+            if not transport.handshake.multiplexing:
+                # Backend doesn't support multiplexing, keep the transport
+                # for classic use and don't try again
+                self._multiplexing_supported = False
+                self._transports.append(transport)
+                return None
+
+            self._multiplexed_transport = MultiplexedTransport(transport)
+            await self.multiplexing_nursery.start(self._multiplexed_transport.run)
+            return self._multiplexed_transport
 
     @asynccontextmanager
     async def acquire(self, force_fresh=False):
@@ -181,6 +304,13 @@ class TransportPool:
             BackendConnectionError
             trio.ClosedResourceError: if used after having being closed
         """
+        if not force_fresh:
+            multiplexed_transport = await self._get_multiplexed_transport()
+            if multiplexed_transport:
+                # Errors are handled by the multiplexed transport itself
+                yield multiplexed_transport
+                return
+
         async with self._lock:
             transport = None
             if not force_fresh:
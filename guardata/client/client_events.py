@@ -8,6 +8,7 @@ class ClientEvent(Enum):
     MESSAGE_PINGED = "message.pinged"
     # Backend
     BACKEND_CONNECTION_CHANGED = "backend.connection.changed"
+    BACKEND_EVENTS_OVERFLOWED = "backend.events.overflowed"
     BACKEND_MESSAGE_RECEIVED = "backend.message.received"
     BACKEND_PINGED = "backend.pinged"
     BACKEND_REALM_MAINTENANCE_FINISHED = "backend.realm.maintenance_finished"
@@ -15,6 +16,7 @@ class ClientEvent(Enum):
     BACKEND_REALM_ROLES_UPDATED = "backend.realm.roles_updated"
     BACKEND_REALM_VLOBS_UPDATED = "backend.realm.vlobs_updated"
     # Fs
+    FS_BLOCK_UPLOADED = "fs.block.uploaded"
     FS_ENTRY_REMOTE_CHANGED = "fs.entry.remote_changed"
     FS_ENTRY_SYNCED = "fs.entry.synced"
     FS_ENTRY_DOWNSYNCED = "fs.entry.downsynced"
@@ -65,6 +65,13 @@ class ClientConfig:
     backend_max_cooldown: int = 30
     backend_connection_keepalive: Optional[int] = 29
     backend_max_connections: int = 4
+    backend_multiplexing: bool = True
+
+    workspace_manifest_cache_size: int = 10000
+    workspace_max_block_transfers: int = 4
+    # Segmented block encryption allows partial block reads, but such blocks
+    # cannot be read by older clients. None keeps encrypting blocks as a whole.
+    workspace_block_segment_size: Optional[int] = None
 
     invitation_token_size: int = 8
 
@@ -104,6 +111,10 @@ def config_factory(
     backend_max_cooldown: int = 30,
     backend_connection_keepalive: Optional[int] = 29,
     backend_max_connections: int = 4,
+    backend_multiplexing: bool = True,
+    workspace_manifest_cache_size: int = 10000,
+    workspace_max_block_transfers: int = 4,
+    workspace_block_segment_size: Optional[int] = None,
     debug: bool = False,
     gui_last_device: str = None,
     gui_tray_enabled: bool = True,
@@ -131,6 +142,10 @@ def config_factory(
         backend_max_cooldown=backend_max_cooldown,
         backend_connection_keepalive=backend_connection_keepalive,
         backend_max_connections=backend_max_connections,
+        backend_multiplexing=backend_multiplexing,
+        workspace_manifest_cache_size=workspace_manifest_cache_size,
+        workspace_max_block_transfers=workspace_max_block_transfers,
+        workspace_block_segment_size=workspace_block_segment_size,
         debug=debug,
         gui_last_device=gui_last_device,
         gui_tray_enabled=gui_tray_enabled,
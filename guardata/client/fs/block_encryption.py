@@ -0,0 +1,128 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Blocks are encrypted with their own key (see `BlockAccess.key`).
+
+Legacy blocks (`BlockAccess.segment_size` is None) are encrypted as a whole,
+hence they have to be downloaded entirely to be read.
+
+Segmented blocks are split into segments of `segment_size` bytes (the last
+one being possibly shorter), each of them encrypted independently with its
+own nonce and authenticated along with its index. This way, any range of a
+block can be downloaded and checked without the rest of the block.
+"""
+
+from typing import Tuple
+
+from guardata.crypto import HashDigest, CryptoError
+from guardata.crypto.secretbox2 import SecretBox
+from guardata.api.data import BlockAccess
+from guardata.client.fs.exceptions import FSError
+
+
+SEGMENT_OVERHEAD = SecretBox.NONCE_SIZE + SecretBox.MACBYTES
+
+
+def _segment_aad(index: int) -> bytes:
+    return index.to_bytes(8, "big")
+
+
+def _segments_span(access: BlockAccess, start: int, stop: int) -> Tuple[int, int]:
+    # Return the indexes of the first and last+1 segments covering [start, stop[
+    first = start // access.segment_size
+    last = (stop - 1) // access.segment_size + 1 if stop > start else first
+    return first, last
+
+
+def _segment_ciphered_size(access: BlockAccess, index: int) -> int:
+    plain_size = min(access.segment_size, access.size - index * access.segment_size)
+    return plain_size + SEGMENT_OVERHEAD
+
+
+def get_ciphered_range(access: BlockAccess, start: int, stop: int) -> Tuple[int, int]:
+    """
+    Return the offset and size of the ciphered data to download in order
+    to decrypt the [start, stop[ range of a segmented block.
+    """
+    assert access.segment_size is not None
+    first, last = _segments_span(access, start, stop)
+    offset = first * (access.segment_size + SEGMENT_OVERHEAD)
+    size = sum(_segment_ciphered_size(access, index) for index in range(first, last))
+    return offset, size
+
+
+def encrypt_block(access: BlockAccess, data: bytes) -> bytes:
+    """
+    Raises:
+        FSError
+    """
+    # Each block has its own key, hence no point in going through the
+    # ciphers cache of `SecretKey`
+    try:
+        box = SecretBox(access.key)
+        if access.segment_size is None:
+            return box.encrypt_buffer(data)
+
+        view = memoryview(data)
+        return b"".join(
+            box.encrypt_buffer(view[offset : offset + access.segment_size], aad=_segment_aad(index))
+            for index, offset in enumerate(range(0, len(data), access.segment_size))
+        )
+
+    # Encryption error
+    except CryptoError as exc:
+        raise FSError(f"Cannot encrypt block: {exc}") from exc
+
+
+def decrypt_block_range(access: BlockAccess, ciphered: bytes, start: int, stop: int) -> bytes:
+    """
+    Decrypt the [start, stop[ range of a segmented block given the ciphered
+    data returned by `get_ciphered_range`.
+
+    Raises:
+        FSError
+    """
+    assert access.segment_size is not None
+    first, last = _segments_span(access, start, stop)
+    box = SecretBox(access.key)
+    view = memoryview(ciphered)
+    segments = []
+    position = 0
+    try:
+        for index in range(first, last):
+            size = _segment_ciphered_size(access, index)
+            segment = view[position : position + size]
+            if len(segment) != size:
+                raise FSError("Cannot decrypt block: truncated data")
+            segments.append(box.decrypt_buffer(segment, aad=_segment_aad(index)))
+            position += size
+
+    # Decryption error
+    except CryptoError as exc:
+        raise FSError(f"Cannot decrypt block: {exc}") from exc
+
+    if position != len(ciphered):
+        raise FSError("Cannot decrypt block: unexpected trailing data")
+    offset = first * access.segment_size
+    return b"".join(segments)[start - offset : stop - offset]
+
+
+def decrypt_block(access: BlockAccess, ciphered: bytes) -> bytes:
+    """
+    Raises:
+        FSError
+    """
+    if access.segment_size is None:
+        try:
+            block = SecretBox(access.key).decrypt_buffer(ciphered)
+
+        # Decryption error
+        except CryptoError as exc:
+            raise FSError(f"Cannot decrypt block: {exc}") from exc
+
+    else:
+        block = decrypt_block_range(access, ciphered, 0, access.size)
+
+    # TODO: let encryption manager do the digest check ?
+    assert HashDigest.from_data(block) == access.digest, access
+    return block
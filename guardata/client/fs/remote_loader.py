@@ -1,14 +1,15 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 
+import trio
 from contextlib import contextmanager
-from typing import Dict, Optional, List, Tuple, cast
+from typing import Dict, Optional, List, Tuple, Set, cast
 
 from pendulum import DateTime, now as pendulum_now
 
-from guardata.utils import timestamps_in_the_ballpark
-from guardata.crypto import HashDigest, CryptoError
+from guardata.utils import TIMESTAMP_MAX_DT, timestamps_in_the_ballpark, open_service_nursery
 from guardata.api.protocol import UserID, DeviceID, RealmRole
+from guardata.api.protocol.vlob import VLOB_READ_BATCH_MAX_SIZE
 from guardata.api.data import (
     DataError,
     BlockAccess,
@@ -30,6 +31,12 @@ from guardata.client.remote_devices_manager import (
     RemoteDevicesManagerDeviceNotFoundError,
     RemoteDevicesManagerInvalidTrustchainError,
 )
+from guardata.client.fs.block_encryption import (
+    encrypt_block,
+    decrypt_block,
+    decrypt_block_range,
+    get_ciphered_range,
+)
 from guardata.client.fs.exceptions import (
     FSError,
     FSRemoteSyncError,
@@ -49,6 +56,9 @@ from guardata.client.fs.exceptions import (
 )
 
 
+DEFAULT_MAX_BLOCK_TRANSFERS = 4
+
+
 @contextmanager
 def translate_remote_devices_manager_errors():
     try:
@@ -65,6 +75,53 @@ def translate_remote_devices_manager_errors():
         raise FSRemoteOperationError(str(exc))
 
 
+class RealmRoleTimeline:
+    """Verified role certificates of a realm, ordered by timestamp.
+
+    The timeline is updated incrementally: only the certificates issued since
+    the last known ones are fetched and get their signature verified. If a
+    storage is provided, the verified certificates are persisted there so they
+    don't have to be verified again on next start.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage
+        self.loaded = storage is None
+        self.lock = trio.Lock()
+        self.certificates: List[RealmRoleCertificateContent] = []
+        self.raw_certificates: Set[bytes] = set()
+        self.current_roles: Dict[UserID, RealmRole] = {}
+        self._users_certificates: Dict[UserID, List[RealmRoleCertificateContent]] = {}
+
+    @property
+    def since(self) -> Optional[DateTime]:
+        if not self.certificates:
+            return None
+        # Certificates are accepted by the backend as long as their timestamp is in
+        # the ballpark of its clock, so they are not necessarily received in timestamp
+        # order: a certificate received later can be up to twice the ballpark older
+        return self.certificates[-1].timestamp.subtract(seconds=2 * TIMESTAMP_MAX_DT)
+
+    def update(
+        self,
+        certificates: List[RealmRoleCertificateContent],
+        raw_certificates: List[bytes],
+        current_roles: Dict[UserID, RealmRole],
+    ) -> None:
+        self.certificates = certificates
+        self.raw_certificates.update(raw_certificates)
+        self.current_roles = current_roles
+        self._users_certificates = {}
+        for certif in certificates:
+            self._users_certificates.setdefault(certif.user_id, []).append(certif)
+
+    def get_user_role_at(self, user_id: UserID, timestamp: DateTime) -> Optional[RealmRole]:
+        for certif in reversed(self._users_certificates.get(user_id, ())):
+            if certif.timestamp <= timestamp:
+                return certif.role
+        return None
+
+
 class RemoteLoader:
     def __init__(
         self,
@@ -74,6 +131,7 @@ class RemoteLoader:
         backend_cmds,
         remote_devices_manager,
         local_storage,
+        max_block_transfers: int = DEFAULT_MAX_BLOCK_TRANSFERS,
     ):
         self.device = device
         self.workspace_id = workspace_id
@@ -81,24 +139,24 @@ class RemoteLoader:
         self.backend_cmds = backend_cmds
         self.remote_devices_manager = remote_devices_manager
         self.local_storage = local_storage
-        self._realm_role_certificates_cache = None
+        self.max_block_transfers = max_block_transfers
+        # Only the timeline of the workspace realm is persisted in the local storage
+        self._realm_role_timelines = {workspace_id: RealmRoleTimeline(local_storage)}
         self._realm_role_certificates_cache_timestamp = None
 
     async def _get_user_realm_role_at(self, user_id: UserID, timestamp: DateTime):
+        timeline = self._realm_role_timelines[self.workspace_id]
         if (
-            not self._realm_role_certificates_cache
+            not timeline.certificates
+            or self._realm_role_certificates_cache_timestamp is None
             or self._realm_role_certificates_cache_timestamp <= timestamp
         ):
             cache_timestamp = pendulum_now()
-            self._realm_role_certificates_cache, _ = await self._load_realm_role_certificates()
+            await self._load_realm_role_certificates()
             # Set the cache timestamp in two times to avoid invalid value in case of exception
             self._realm_role_certificates_cache_timestamp = cache_timestamp
 
-        for certif in reversed(self._realm_role_certificates_cache):
-            if certif.user_id == user_id and certif.timestamp <= timestamp:
-                return certif.role
-        else:
-            return None
+        return timeline.get_user_role_at(user_id, timestamp)
 
     async def _backend_cmds(self, cmd, *args, **kwargs):
         try:
@@ -111,23 +169,80 @@ class RemoteLoader:
             raise FSError(f"`{cmd}` request has failed due to connection error `{exc}`") from exc
 
     async def _load_realm_role_certificates(self, realm_id: Optional[EntryID] = None):
-        rep = await self._backend_cmds("realm_get_role_certificates", realm_id or self.workspace_id)
+        realm_id = realm_id or self.workspace_id
+        try:
+            timeline = self._realm_role_timelines[realm_id]
+        except KeyError:
+            timeline = self._realm_role_timelines[realm_id] = RealmRoleTimeline()
+
+        async with timeline.lock:
+            if not timeline.loaded:
+                raw_certifs = await timeline.storage.get_realm_role_certificates()
+                try:
+                    certifs = sorted(
+                        [RealmRoleCertificateContent.unsecure_load(raw) for raw in raw_certifs],
+                        key=lambda x: x.timestamp,
+                    )
+                except DataError as exc:
+                    raise FSError(f"Invalid realm role certificates: {exc}") from exc
+                # Those certificates have been verified before being stored
+                current_roles = await self._replay_realm_role_certificates(
+                    [(certif, None) for certif in certifs]
+                )
+                timeline.update(certifs, raw_certifs, current_roles)
+                timeline.loaded = True
+
+            await self._update_realm_role_timeline(realm_id, timeline)
+
+            return list(timeline.certificates), dict(timeline.current_roles)
+
+    async def _update_realm_role_timeline(
+        self, realm_id: EntryID, timeline: RealmRoleTimeline
+    ) -> None:
+        rep = await self._backend_cmds("realm_get_role_certificates", realm_id, timeline.since)
         if rep["status"] == "not_allowed":
             # Seems we lost the access to the realm
             raise FSWorkspaceNoReadAccess("Cannot get workspace roles: no read access")
         elif rep["status"] != "ok":
             raise FSError(f"Cannot retrieve workspace roles: `{rep['status']}`")
 
+        new_raw_certifs = [
+            raw_certif
+            for raw_certif in rep["certificates"]
+            if raw_certif not in timeline.raw_certificates
+        ]
+        if not new_raw_certifs:
+            return
+
         try:
             # Must read unverified certificates to access metadata
             unsecure_certifs = sorted(
-                [
-                    (RealmRoleCertificateContent.unsecure_load(uv_role), uv_role)
-                    for uv_role in rep["certificates"]
+                [(certif, None) for certif in timeline.certificates]
+                + [
+                    (RealmRoleCertificateContent.unsecure_load(raw_certif), raw_certif)
+                    for raw_certif in new_raw_certifs
                 ],
                 key=lambda x: x[0].timestamp,
             )
+        except DataError as exc:
+            raise FSError(f"Invalid realm role certificates: {exc}") from exc
+
+        current_roles = await self._replay_realm_role_certificates(unsecure_certifs)
 
+        # Now unsecure_certifs is no longer unsecure given we have valided it items
+        timeline.update([c for c, _ in unsecure_certifs], new_raw_certifs, current_roles)
+        if timeline.storage is not None:
+            await timeline.storage.add_realm_role_certificates(new_raw_certifs)
+
+    async def _replay_realm_role_certificates(
+        self, unsecure_certifs: List[Tuple[RealmRoleCertificateContent, Optional[bytes]]]
+    ) -> Dict[UserID, RealmRole]:
+        """
+        Check the role certificates (ordered by timestamp) one after the other
+        and return the resulting roles. Only the certificates provided along with
+        their raw version get their signature verified.
+        """
+        try:
             current_roles: Dict[UserID, RealmRole] = {}
             owner_only = (RealmRole.OWNER,)
             owner_or_manager = (RealmRole.OWNER, RealmRole.MANAGER)
@@ -135,18 +250,22 @@ class RemoteLoader:
             # Now verify each certif
             for unsecure_certif, raw_certif in unsecure_certifs:
 
-                with translate_remote_devices_manager_errors():
-                    author = await self.remote_devices_manager.get_device(unsecure_certif.author)
+                if raw_certif is not None:
+                    with translate_remote_devices_manager_errors():
+                        author = await self.remote_devices_manager.get_device(
+                            unsecure_certif.author
+                        )
 
-                RealmRoleCertificateContent.verify_and_load(
-                    raw_certif,
-                    author_verify_key=author.verify_key,
-                    expected_author=author.device_id,
-                )
+                    RealmRoleCertificateContent.verify_and_load(
+                        raw_certif,
+                        author_verify_key=author.verify_key,
+                        expected_author=author.device_id,
+                    )
 
                 # Make sure author had the right to do this
+                author_id = cast(DeviceID, unsecure_certif.author)
                 existing_user_role = current_roles.get(unsecure_certif.user_id)
-                if not current_roles and unsecure_certif.user_id == author.device_id.user_id:
+                if not current_roles and unsecure_certif.user_id == author_id.user_id:
                     # First user is autosigned
                     needed_roles: Tuple[Optional[RealmRole], ...] = (None,)
                 elif (
@@ -157,10 +276,7 @@ class RemoteLoader:
                 else:
                     needed_roles = owner_or_manager
                 # TODO: typing, author is optional in base.py but it seems that manifests always have an author (no RVK)
-                if (
-                    current_roles.get(cast(DeviceID, unsecure_certif.author).user_id)
-                    not in needed_roles
-                ):
+                if current_roles.get(author_id.user_id) not in needed_roles:
                     raise FSError(
                         f"Invalid realm role certificates: "
                         f"{unsecure_certif.author} has not right to give "
@@ -177,8 +293,7 @@ class RemoteLoader:
         except DataError as exc:
             raise FSError(f"Invalid realm role certificates: {exc}") from exc
 
-        # Now unsecure_certifs is no longer unsecure given we have valided it items
-        return [c for c, _ in unsecure_certifs], current_roles
+        return current_roles
 
     async def load_realm_role_certificates(
         self, realm_id: Optional[EntryID] = None
@@ -245,8 +360,21 @@ class RemoteLoader:
             FSBackendOfflineError
             FSWorkspaceInMaintenance
         """
-        for access in accesses:
-            await self.load_block(access)
+        if len(accesses) <= 1 or self.max_block_transfers <= 1:
+            for access in accesses:
+                await self.load_block(access)
+            return
+
+        # Each worker pulls the next access to download from the shared iterator
+        accesses_iterator = iter(accesses)
+
+        async def _load_blocks_worker():
+            for access in accesses_iterator:
+                await self.load_block(access)
+
+        async with open_service_nursery() as nursery:
+            for _ in range(min(self.max_block_transfers, len(accesses))):
+                nursery.start_soon(_load_blocks_worker)
 
     async def load_block(self, access: BlockAccess) -> None:
         """
@@ -258,7 +386,44 @@ class RemoteLoader:
             FSWorkspaceNoAccess
         """
         # Download
-        rep = await self._backend_cmds("block_read", access.id)
+        ciphered = await self._block_read(access)
+
+        # Decryption and digest check are CPU bound, don't block the event loop
+        block = await trio.to_thread.run_sync(decrypt_block, access, ciphered)
+        await self.local_storage.set_clean_block(access.id, block)
+
+    async def load_block_range(self, access: BlockAccess, start: int, stop: int) -> bytes:
+        """
+        Download and return the [start, stop[ range of a block without
+        storing it in the local storage. Legacy blocks cannot be partially
+        decrypted so they are entirely loaded instead.
+
+        Raises:
+            FSError
+            FSRemoteBlockNotFound
+            FSBackendOfflineError
+            FSWorkspaceInMaintenance
+            FSWorkspaceNoAccess
+        """
+        if access.segment_size is None:
+            await self.load_block(access)
+            block = await self.local_storage.get_chunk(ChunkID(access.id))
+            return block[start:stop]
+
+        # Download only the segments covering the range
+        offset, size = get_ciphered_range(access, start, stop)
+        ciphered = await self._block_read(access, offset=offset, size=size)
+
+        # A backend not supporting range reads returns the whole block
+        if len(ciphered) != size:
+            block = await trio.to_thread.run_sync(decrypt_block, access, ciphered)
+            await self.local_storage.set_clean_block(access.id, block)
+            return block[start:stop]
+
+        return await trio.to_thread.run_sync(decrypt_block_range, access, ciphered, start, stop)
+
+    async def _block_read(self, access: BlockAccess, **kwargs) -> bytes:
+        rep = await self._backend_cmds("block_read", access.id, **kwargs)
         if rep["status"] == "not_found":
             raise FSRemoteBlockNotFound(access)
         elif rep["status"] == "not_allowed":
@@ -270,18 +435,7 @@ class RemoteLoader:
             )
         elif rep["status"] != "ok":
             raise FSError(f"Cannot download block: `{rep['status']}`")
-
-        # Decryption
-        try:
-            block = access.key.decrypt(rep["block"])
-
-        # Decryption error
-        except CryptoError as exc:
-            raise FSError(f"Cannot decrypt block: {exc}") from exc
-
-        # TODO: let encryption manager do the digest check ?
-        assert HashDigest.from_data(block) == access.digest, access
-        await self.local_storage.set_clean_block(access.id, block)
+        return rep["block"]
 
     async def upload_block(self, access: BlockAccess, data: bytes):
         """
@@ -291,13 +445,8 @@ class RemoteLoader:
             FSWorkspaceInMaintenance
             FSWorkspaceNoAccess
         """
-        # Encryption
-        try:
-            ciphered = access.key.encrypt(data)
-
-        # Encryption error
-        except CryptoError as exc:
-            raise FSError(f"Cannot encrypt block: {exc}") from exc
+        # Encryption is CPU bound, don't block the event loop
+        ciphered = await trio.to_thread.run_sync(encrypt_block, access, data)
 
         # Upload block
         rep = await self._backend_cmds("block_create", access.id, self.workspace_id, ciphered)
@@ -356,6 +505,100 @@ class RemoteLoader:
             version=version,
             timestamp=timestamp if version is None else None,
         )
+        return await self._verify_manifest(
+            entry_id, rep, version=version, expected_backend_timestamp=expected_backend_timestamp
+        )
+
+    async def load_manifests(
+        self, entries: List[Tuple[EntryID, Optional[int], Optional[DateTime]]]
+    ) -> List[Optional[BaseRemoteManifest]]:
+        """
+        Download several manifests, each entry being a `(entry_id, version, timestamp)`
+        tuple with the same meaning as the `load_manifest` parameters.
+
+        The vlobs are fetched with a single request per batch of `VLOB_READ_BATCH_MAX_SIZE`
+        entries, then the manifests are verified concurrently. The result follows the
+        entries order, with `None` for the manifests not found.
+
+        Raises:
+            FSError
+            FSBackendOfflineError
+            FSWorkspaceInMaintenance
+            FSBadEncryptionRevision
+            FSWorkspaceNoAccess
+            FSUserNotFoundError
+            FSDeviceNotFoundError
+            FSInvalidTrustchainError
+        """
+        for entry_id, version, timestamp in entries:
+            if timestamp is not None and version is not None:
+                raise FSError(
+                    f"Supplied both version {version} and timestamp `{timestamp}` for manifest "
+                    f"`{entry_id}`"
+                )
+        entries = [
+            (entry_id, version, timestamp if version is None else None)
+            for entry_id, version, timestamp in entries
+        ]
+
+        # Download the vlobs
+        workspace_entry = self.get_workspace_entry()
+        reps: List[Optional[dict]] = []
+        for i in range(0, len(entries), VLOB_READ_BATCH_MAX_SIZE):
+            batch = entries[i : i + VLOB_READ_BATCH_MAX_SIZE]
+            rep = await self._backend_cmds(
+                "vlob_read_batch", workspace_entry.encryption_revision, batch
+            )
+            # Older backends don't know about batch read, fall back on one request per entry
+            if rep["status"] == "unknown_command":
+                reps += [None] * (len(entries) - len(reps))
+                break
+            elif rep["status"] != "ok":
+                raise FSError(f"Cannot fetch vlobs: `{rep['status']}`")
+            reps += rep["items"]
+
+        # Each worker pulls the next vlob to verify from the shared iterator
+        results: List[Optional[BaseRemoteManifest]] = [None] * len(entries)
+        todo = iter(enumerate(zip(entries, reps)))
+
+        async def _verify_manifests_worker():
+            for index, ((entry_id, version, timestamp), rep) in todo:
+                try:
+                    if rep is None:
+                        results[index] = await self.load_manifest(
+                            entry_id, version=version, timestamp=timestamp
+                        )
+                    else:
+                        results[index] = await self._verify_manifest(entry_id, rep, version=version)
+                except FSRemoteManifestNotFound:
+                    pass
+
+        async with open_service_nursery() as nursery:
+            for _ in range(min(self.max_block_transfers, len(entries))):
+                nursery.start_soon(_verify_manifests_worker)
+
+        return results
+
+    async def _verify_manifest(
+        self,
+        entry_id: EntryID,
+        rep: dict,
+        version: Optional[int] = None,
+        expected_backend_timestamp: Optional[DateTime] = None,
+    ) -> BaseRemoteManifest:
+        """
+        Check the backend response to a vlob read, then decrypt and verify the manifest.
+
+        Raises:
+            FSError
+            FSWorkspaceInMaintenance
+            FSRemoteManifestNotFound
+            FSBadEncryptionRevision
+            FSWorkspaceNoAccess
+            FSUserNotFoundError
+            FSDeviceNotFoundError
+            FSInvalidTrustchainError
+        """
         if rep["status"] == "not_found":
             raise FSRemoteManifestNotFound(entry_id)
         elif rep["status"] == "not_allowed":
@@ -376,6 +619,7 @@ class RemoteLoader:
         elif rep["status"] != "ok":
             raise FSError(f"Cannot fetch vlob {entry_id}: `{rep['status']}`")
 
+        workspace_entry = self.get_workspace_entry()
         expected_version = rep["version"]
         expected_author = rep["author"]
         expected_timestamp = rep["timestamp"]
@@ -589,7 +833,8 @@ class RemoteLoaderTimestamped(RemoteLoader):
         self.backend_cmds = remote_loader.backend_cmds
         self.remote_devices_manager = remote_loader.remote_devices_manager
         self.local_storage = remote_loader.local_storage.to_timestamped(timestamp)
-        self._realm_role_certificates_cache = None
+        self.max_block_transfers = remote_loader.max_block_transfers
+        self._realm_role_timelines = remote_loader._realm_role_timelines
         self._realm_role_certificates_cache_timestamp = None
         self.timestamp = timestamp
 
@@ -628,6 +873,31 @@ class RemoteLoaderTimestamped(RemoteLoader):
             expected_backend_timestamp=expected_backend_timestamp,
         )
 
+    async def load_manifests(
+        self, entries: List[Tuple[EntryID, Optional[int], Optional[DateTime]]]
+    ) -> List[Optional[BaseRemoteManifest]]:
+        """
+        Same as `load_manifest`, entries without version nor timestamp are
+        loaded at the remote loader timestamp.
+
+        Raises:
+            FSError
+            FSBackendOfflineError
+            FSWorkspaceInMaintenance
+            FSBadEncryptionRevision
+            FSWorkspaceNoAccess
+        """
+        return await super().load_manifests(
+            [
+                (
+                    entry_id,
+                    version,
+                    self.timestamp if timestamp is None and version is None else timestamp,
+                )
+                for entry_id, version, timestamp in entries
+            ]
+        )
+
     async def upload_manifest(self, *e, **ke):
         raise FSError("Cannot upload manifest through a timestamped remote loader")
 
@@ -5,16 +5,20 @@ from guardata.client.fs.storage.local_database import LocalDatabase
 from guardata.client.fs.storage.user_storage import UserStorage
 from guardata.client.fs.storage.manifest_storage import ManifestStorage
 from guardata.client.fs.storage.chunk_storage import ChunkStorage, BlockStorage
+from guardata.client.fs.storage.certificate_storage import CertificateStorage
 from guardata.client.fs.storage.workspace_storage import (
+    DEFAULT_MANIFEST_CACHE_SIZE,
     WorkspaceStorage,
     WorkspaceStorageTimestamped,
 )
 
 __all__ = (
+    "DEFAULT_MANIFEST_CACHE_SIZE",
     "LocalDatabase",
     "ManifestStorage",
     "ChunkStorage",
     "BlockStorage",
+    "CertificateStorage",
     "UserStorage",
     "WorkspaceStorage",
     "WorkspaceStorageTimestamped",
@@ -0,0 +1,53 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+from pathlib import Path
+from typing import Iterable, Set
+from async_generator import asynccontextmanager
+
+from guardata.client.types import LocalDevice
+from guardata.client.fs.storage.version import CERTIFICATE_STORAGE_NAME
+from guardata.client.fs.storage.local_database import LocalDatabase
+
+
+class CertificateStorage:
+    """Storage for the digests of the certificates whose signature has been verified.
+
+    The digests are keyed with the device local key, so they cannot be forged
+    by someone having write access to the local data but not to the device keys.
+    """
+
+    def __init__(self, device: LocalDevice, localdb: LocalDatabase):
+        self.digest_key = device.local_symkey
+        self.localdb = localdb
+
+    @classmethod
+    @asynccontextmanager
+    async def run(cls, device: LocalDevice, path: Path):
+        async with LocalDatabase.run(path / CERTIFICATE_STORAGE_NAME) as localdb:
+            self = cls(device, localdb)
+            await self._create_db()
+            yield self
+
+    # Database initialization
+
+    async def _create_db(self):
+        async with self.localdb.open_cursor() as cursor:
+            cursor.execute(
+                """CREATE TABLE IF NOT EXISTS verified_certificates
+                    (digest BLOB PRIMARY KEY NOT NULL -- Keyed hash
+                );"""
+            )
+
+    # Verified certificates
+
+    async def get_verified_certificates(self) -> Set[bytes]:
+        async with self.localdb.open_cursor() as cursor:
+            cursor.execute("SELECT digest FROM verified_certificates")
+            return {digest for digest, in cursor.fetchall()}
+
+    async def add_verified_certificates(self, digests: Iterable[bytes]) -> None:
+        async with self.localdb.open_cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO verified_certificates(digest) VALUES (?)",
+                ((digest,) for digest in digests),
+            )
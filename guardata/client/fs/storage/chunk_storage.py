@@ -12,6 +12,9 @@ from guardata.client.fs.exceptions import FSLocalMissError, FSLocalStorageClosed
 from guardata.client.types import LocalDevice, DEFAULT_BLOCK_SIZE
 from guardata.client.fs.storage.local_database import LocalDatabase
 
+# Number of pending access times that triggers a write in the block cache
+MAX_PENDING_ACCESSES = 1000
+
 
 class ChunkStorage:
     """Interface to access the local chunks of data."""
@@ -89,34 +92,38 @@ class ChunkStorage:
 
     async def get_chunk(self, chunk_id: ChunkID):
         async with self._open_cursor() as cursor:
-            cursor.execute(
-                """
-                UPDATE chunks SET accessed_on = ? WHERE chunk_id = ?;
-                """,
-                (time.time(), chunk_id.bytes),
-            )
-            cursor.execute("SELECT changes()")
-            (changes,) = cursor.fetchone()
-            if not changes:
-                raise FSLocalMissError(chunk_id)
-
             cursor.execute("""SELECT data FROM chunks WHERE chunk_id = ?""", (chunk_id.bytes,))
-            (ciphered,) = cursor.fetchone()
+            row = cursor.fetchone()
 
+        if not row:
+            raise FSLocalMissError(chunk_id)
+        (ciphered,) = row
         return self.local_symkey.decrypt(ciphered)
 
-    async def set_chunk(self, chunk_id: ChunkID, raw: bytes):
+    async def set_chunk(self, chunk_id: ChunkID, raw: bytes) -> bool:
+        """
+        Return True if the chunk was not already present.
+        """
         assert isinstance(raw, (bytes, bytearray))
         ciphered = self.local_symkey.encrypt(raw)
 
-        # Update database
+        # Update database, chunks are most often new so try the insertion first
         async with self._open_cursor() as cursor:
             cursor.execute(
-                """INSERT OR REPLACE INTO
+                """INSERT OR IGNORE INTO
                 chunks (chunk_id, size, offline, accessed_on, data)
                 VALUES (?, ?, ?, ?, ?)""",
                 (chunk_id.bytes, len(ciphered), False, time.time(), ciphered),
             )
+            if cursor.rowcount:
+                return True
+            cursor.execute(
+                """UPDATE chunks
+                SET size = ?, offline = ?, accessed_on = ?, data = ?
+                WHERE chunk_id = ?""",
+                (len(ciphered), False, time.time(), ciphered, chunk_id.bytes),
+            )
+            return False
 
     async def clear_chunk(self, chunk_id: ChunkID):
         async with self._open_cursor() as cursor:
@@ -134,6 +141,26 @@ class BlockStorage(ChunkStorage):
     def __init__(self, device: LocalDevice, localdb: LocalDatabase, cache_size: int):
         super().__init__(device, localdb)
         self.cache_size = cache_size
+        # Number of blocks in the cache, loaded at startup and then maintained
+        # in memory to avoid counting the whole table on each insertion
+        self._nb_blocks = 0
+        # Access times waiting to be written in the database, this way reading
+        # a block from the cache doesn't require a write transaction
+        self._pending_accesses = {}
+
+    @classmethod
+    @asynccontextmanager
+    async def run(cls, *args, **kwargs):
+        async with super().run(*args, **kwargs) as self:
+            try:
+                yield self
+            finally:
+                with trio.CancelScope(shield=True):
+                    try:
+                        await self.flush_accessed_on()
+                    # Ignore storage closed exceptions, since it follows an operational error
+                    except FSLocalStorageClosedError:
+                        pass
 
     def _open_cursor(self):
         # It doesn't matter for blocks to be commited as soon as they're added
@@ -142,6 +169,34 @@ class BlockStorage(ChunkStorage):
         # least compare to the downloading of the block).
         return self.localdb.open_cursor(commit=True)
 
+    # Database initialization
+
+    async def _create_db(self):
+        await super()._create_db()
+        async with self._open_cursor() as cursor:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS chunks_accessed_on_idx ON chunks (accessed_on);"
+            )
+            cursor.execute("SELECT COUNT(*) FROM chunks")
+            (self._nb_blocks,) = cursor.fetchone()
+
+    # Size and chunks
+
+    async def get_nb_blocks(self):
+        return self._nb_blocks
+
+    # Access times
+
+    async def flush_accessed_on(self):
+        if not self._pending_accesses:
+            return
+        pending, self._pending_accesses = self._pending_accesses, {}
+        async with self._open_cursor() as cursor:
+            cursor.executemany(
+                "UPDATE chunks SET accessed_on = ? WHERE chunk_id = ?",
+                [(accessed_on, chunk_id) for chunk_id, accessed_on in pending.items()],
+            )
+
     # Garbage collection
 
     @property
@@ -149,10 +204,14 @@ class BlockStorage(ChunkStorage):
         return self.cache_size // DEFAULT_BLOCK_SIZE
 
     async def clear_all_blocks(self):
+        self._pending_accesses.clear()
         async with self._open_cursor() as cursor:
             cursor.execute("DELETE FROM chunks")
+            self._nb_blocks = 0
 
     async def clear_old_blocks(self, limit):
+        # Eviction relies on the access times, make sure they are up to date
+        await self.flush_accessed_on()
         async with self._open_cursor() as cursor:
             cursor.execute(
                 """
@@ -162,18 +221,37 @@ class BlockStorage(ChunkStorage):
                 """,
                 (limit,),
             )
+            cursor.execute("SELECT changes()")
+            (changes,) = cursor.fetchone()
+            self._nb_blocks -= changes
 
-    # Upgraded set method
+    # Upgraded chunk methods
 
-    async def set_chunk(self, chunk_id: ChunkID, raw: bytes):
+    async def get_chunk(self, chunk_id: ChunkID):
+        data = await super().get_chunk(chunk_id)
+        self._pending_accesses[chunk_id.bytes] = time.time()
+        if len(self._pending_accesses) >= MAX_PENDING_ACCESSES:
+            await self.flush_accessed_on()
+        return data
+
+    async def set_chunk(self, chunk_id: ChunkID, raw: bytes) -> bool:
         # Actual set operation
-        await super().set_chunk(chunk_id, raw)
+        self._pending_accesses.pop(chunk_id.bytes, None)
+        is_new = await super().set_chunk(chunk_id, raw)
+        if is_new:
+            self._nb_blocks += 1
 
         # Clean up if necessary
-        nb_blocks = await self.get_nb_blocks()
-        extra_blocks = nb_blocks - self.block_limit
+        extra_blocks = self._nb_blocks - self.block_limit
         if extra_blocks > 0:
 
             # Remove the extra block plus 10 % of the cache size, i.e about 100 blocks
             limit = extra_blocks + self.block_limit // 10
             await self.clear_old_blocks(limit=limit)
+
+        return is_new
+
+    async def clear_chunk(self, chunk_id: ChunkID):
+        self._pending_accesses.pop(chunk_id.bytes, None)
+        await super().clear_chunk(chunk_id)
+        self._nb_blocks -= 1
@@ -5,8 +5,9 @@ import re
 
 import trio
 from pathlib import Path
+from collections import OrderedDict
 from structlog import get_logger
-from typing import Dict, Tuple, Set, Optional, Union, Pattern
+from typing import Dict, Tuple, Set, Optional, Union, Pattern, List
 from async_generator import asynccontextmanager
 
 from guardata.client.fs.exceptions import FSLocalMissError, FSLocalStorageClosedError
@@ -21,17 +22,31 @@ EMPTY_PATTERN = r"^/b$"  # Do not match anything
 class ManifestStorage:
     """Persistent storage with cache for storing manifests.
 
-    Also stores the checkpoint.
+    Also stores the checkpoint and the verified role certificates of the realm.
     """
 
-    def __init__(self, device: LocalDevice, localdb: LocalDatabase, realm_id: EntryID):
+    def __init__(
+        self,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        realm_id: EntryID,
+        cache_size: Optional[int] = None,
+    ):
+        assert cache_size is None or cache_size > 0
         self.device = device
         self.localdb = localdb
         self.realm_id = realm_id
 
-        # This cache contains all the manifests that have been set or accessed
-        # since the last call to `clear_memory_cache`
-        self._cache: Dict[EntryID, BaseLocalManifest] = {}
+        # This cache contains the manifests that have been set or accessed
+        # since the last call to `clear_memory_cache`, ordered from the least
+        # recently used to the most recently used. If `cache_size` is provided,
+        # the least recently used entries are evicted once the cache gets bigger
+        # (entries ahead of the localdb are never evicted)
+        self._cache: Dict[EntryID, BaseLocalManifest] = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
 
         # This dictionnary keeps track of all the entry ids of the manifests
         # that have been added to the cache but still needs to be written to
@@ -72,6 +87,31 @@ class ManifestStorage:
         self._cache_ahead_of_localdb.clear()
         self._cache.clear()
 
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+        }
+
+    def _evict_cache(self) -> None:
+        if self.cache_size is None:
+            return
+        # Entries that are not persistent yet cannot be evicted
+        evictable = len(self._cache) - len(self._cache_ahead_of_localdb)
+        while len(self._cache) > self.cache_size and evictable > 0:
+            # Oldest entries first, the non persistent ones are moved at the end
+            # so that the next evictions don't have to skip them again
+            entry_id = next(iter(self._cache))
+            if entry_id in self._cache_ahead_of_localdb:
+                self._cache.move_to_end(entry_id)
+                continue
+            del self._cache[entry_id]
+            self.cache_evictions += 1
+            evictable -= 1
+
     # Database initialization
 
     async def _create_db(self):
@@ -99,6 +139,16 @@ class ManifestStorage:
                 );
                 """
             )
+            # Verified role certificates, in the order they have been verified
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS realm_role_certificates
+                (
+                  _id INTEGER PRIMARY KEY NOT NULL,
+                  certificate BLOB NOT NULL
+                );
+                """
+            )
             # Singleton storing the pattern_filter
             cursor.execute(
                 """
@@ -169,6 +219,27 @@ class ManifestStorage:
                 (new_checkpoint,),
             )
 
+    # Realm role certificates operations
+
+    async def get_realm_role_certificates(self) -> List[bytes]:
+        """
+        Raises: Nothing !
+        """
+        async with self._open_cursor() as cursor:
+            cursor.execute("SELECT certificate FROM realm_role_certificates ORDER BY _id")
+            rows = cursor.fetchall()
+        return self.device.local_symkey.decrypt_batch([ciphered for ciphered, in rows])
+
+    async def add_realm_role_certificates(self, certificates: List[bytes]) -> None:
+        """
+        Raises: Nothing !
+        """
+        async with self._open_cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO realm_role_certificates(certificate) VALUES (?)",
+                ((ciphered,) for ciphered in self.device.local_symkey.encrypt_batch(certificates)),
+            )
+
     async def get_need_sync_entries(self) -> Tuple[Set[EntryID], Set[EntryID]]:
         """
         Raises: Nothing !
@@ -200,9 +271,13 @@ class ManifestStorage:
         """
         # Look in cache first
         try:
-            return self._cache[entry_id]
+            manifest = self._cache[entry_id]
         except KeyError:
-            pass
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            self._cache.move_to_end(entry_id)
+            return manifest
 
         # Look into the database
         async with self._open_cursor() as cursor:
@@ -220,7 +295,9 @@ class ManifestStorage:
             )
 
         # Always return the cached value
-        return self._cache[entry_id]
+        manifest = self._cache[entry_id]
+        self._evict_cache()
+        return manifest
 
     async def set_manifest(
         self,
@@ -236,6 +313,7 @@ class ManifestStorage:
 
         # Set the cache first
         self._cache[entry_id] = manifest
+        self._cache.move_to_end(entry_id)
 
         # Tag the entry as ahead of localdb
         self._cache_ahead_of_localdb.setdefault(entry_id, set())
@@ -248,6 +326,8 @@ class ManifestStorage:
         if not cache_only:
             await self._ensure_manifest_persistent(entry_id)
 
+        self._evict_cache()
+
     async def _ensure_manifest_persistent(self, entry_id: EntryID) -> None:
 
         # Get cursor
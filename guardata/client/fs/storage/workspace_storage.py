@@ -3,7 +3,7 @@
 
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, Tuple, Set, Optional, Union, AsyncIterator, NoReturn, Pattern
+from typing import Dict, Tuple, Set, Optional, Union, AsyncIterator, NoReturn, Pattern, List
 
 import trio
 from trio import lowlevel
@@ -13,6 +13,7 @@ from async_generator import asynccontextmanager
 
 from guardata.client.types import (
     EntryID,
+    EntryName,
     BlockID,
     ChunkID,
     LocalDevice,
@@ -35,7 +36,9 @@ logger = get_logger()
 
 # TODO: should be in config.py
 DEFAULT_BLOCK_CACHE_SIZE = 512 * 1024 * 1024
+DEFAULT_MANIFEST_CACHE_SIZE = 10000  # In number of manifests
 DEFAULT_CHUNK_VACUUM_THRESHOLD = 512 * 1024 * 1024
+LOOKUP_CACHE_SIZE = 10000  # In number of folders
 
 
 class BaseWorkspaceStorage:
@@ -72,6 +75,11 @@ class BaseWorkspaceStorage:
         self._pattern_filter: Optional[Pattern] = None
         self._pattern_filter_fully_applied: bool = False
 
+        # Path resolution cache: folder id -> {child name -> (child id, confined)}
+        # Entries are derived from the folder manifest, hence dropped as soon as
+        # the manifest is changed
+        self._lookup_cache: Dict[EntryID, Dict[EntryName, Tuple[EntryID, bool]]] = {}
+
     def _get_next_fd(self) -> FileDescriptor:
         self.fd_counter += 1
         return FileDescriptor(self.fd_counter)
@@ -79,6 +87,30 @@ class BaseWorkspaceStorage:
     async def get_manifest(self, entry_id: EntryID) -> BaseLocalManifest:
         raise NotImplementedError
 
+    # Path resolution cache
+
+    def get_cached_child(
+        self, parent_id: EntryID, name: EntryName
+    ) -> Optional[Tuple[EntryID, bool]]:
+        children = self._lookup_cache.get(parent_id)
+        return None if children is None else children.get(name)
+
+    def set_cached_child(
+        self, parent_id: EntryID, name: EntryName, child_id: EntryID, confined: bool
+    ) -> None:
+        children = self._lookup_cache.get(parent_id)
+        if children is None:
+            if len(self._lookup_cache) >= LOOKUP_CACHE_SIZE:
+                self._lookup_cache.clear()
+            children = self._lookup_cache[parent_id] = {}
+        children[name] = (child_id, confined)
+
+    def _invalidate_cached_children(self, entry_id: Optional[EntryID] = None) -> None:
+        if entry_id is None:
+            self._lookup_cache.clear()
+        else:
+            self._lookup_cache.pop(entry_id, None)
+
     # Locking helpers
 
     @asynccontextmanager
@@ -129,6 +161,10 @@ class BaseWorkspaceStorage:
         assert isinstance(block_id, BlockID)
         return await self.block_storage.set_chunk(ChunkID(block_id), block)
 
+    async def is_clean_block(self, block_id: BlockID) -> bool:
+        assert isinstance(block_id, BlockID)
+        return await self.block_storage.is_chunk(ChunkID(block_id))
+
     async def clear_clean_block(self, block_id: BlockID) -> None:
         assert isinstance(block_id, BlockID)
         try:
@@ -204,6 +240,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
         workspace_id: EntryID,
         cache_size=DEFAULT_BLOCK_CACHE_SIZE,
         vacuum_threshold=DEFAULT_CHUNK_VACUUM_THRESHOLD,
+        manifest_cache_size=DEFAULT_MANIFEST_CACHE_SIZE,
     ):
         data_path = path / WORKSPACE_DATA_STORAGE_NAME
         cache_path = path / WORKSPACE_CACHE_STORAGE_NAME
@@ -223,7 +260,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
 
                     # Manifest storage service
                     async with ManifestStorage.run(
-                        device, data_localdb, workspace_id
+                        device, data_localdb, workspace_id, cache_size=manifest_cache_size
                     ) as manifest_storage:
 
                         # Chunk storage service
@@ -251,6 +288,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
 
     async def clear_memory_cache(self, flush=True) -> None:
         await self.manifest_storage.clear_memory_cache(flush=flush)
+        self._invalidate_cached_children()
 
     # Checkpoint interface
 
@@ -268,6 +306,14 @@ class WorkspaceStorage(BaseWorkspaceStorage):
     async def get_need_sync_entries(self) -> Tuple[Set[EntryID], Set[EntryID]]:
         return await self.manifest_storage.get_need_sync_entries()
 
+    # Realm role certificates interface
+
+    async def get_realm_role_certificates(self) -> List[bytes]:
+        return await self.manifest_storage.get_realm_role_certificates()
+
+    async def add_realm_role_certificates(self, certificates: List[bytes]) -> None:
+        await self.manifest_storage.add_realm_role_certificates(certificates)
+
     # Manifest interface
 
     async def get_manifest(self, entry_id: EntryID) -> BaseLocalManifest:
@@ -287,6 +333,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
         await self.manifest_storage.set_manifest(
             entry_id, manifest, cache_only=cache_only, removed_ids=removed_ids
         )
+        self._invalidate_cached_children(entry_id)
 
     async def ensure_manifest_persistent(self, entry_id: EntryID) -> None:
         self._check_lock_status(entry_id)
@@ -295,6 +342,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
     async def clear_manifest(self, entry_id: EntryID) -> None:
         self._check_lock_status(entry_id)
         await self.manifest_storage.clear_manifest(entry_id)
+        self._invalidate_cached_children(entry_id)
 
     # Pattern filter interface
 
@@ -397,6 +445,7 @@ class WorkspaceStorageTimestamped(BaseWorkspaceStorage):
             self._throw_permission_error()
         self._check_lock_status(entry_id)
         self._cache[entry_id] = manifest
+        self._invalidate_cached_children(entry_id)
 
     async def ensure_manifest_persistent(self, entry_id: EntryID) -> None:
         pass
@@ -4,7 +4,7 @@
 import trio
 from pathlib import Path
 from pendulum import DateTime, now as pendulum_now
-from typing import Tuple, Optional, Union, Dict, Sequence, Pattern
+from typing import Tuple, List, Optional, Union, Dict, Sequence, Pattern
 from structlog import get_logger
 
 from async_generator import asynccontextmanager
@@ -42,8 +42,8 @@ from guardata.client.backend_connection import (
 from guardata.client.remote_devices_manager import RemoteDevicesManager
 
 from guardata.client.fs.workspacefs import WorkspaceFS
-from guardata.client.fs.remote_loader import RemoteLoader
-from guardata.client.fs.storage import UserStorage, WorkspaceStorage
+from guardata.client.fs.remote_loader import RemoteLoader, DEFAULT_MAX_BLOCK_TRANSFERS
+from guardata.client.fs.storage import UserStorage, WorkspaceStorage, DEFAULT_MANIFEST_CACHE_SIZE
 from guardata.client.fs.userfs.merging import merge_local_user_manifests, merge_workspace_entry
 from guardata.client.fs.exceptions import (
     FSError,
@@ -68,6 +68,10 @@ class ReencryptionJob:
         self.old_workspace_entry = old_workspace_entry
         assert new_workspace_entry.id == old_workspace_entry.id
 
+    def _reencrypt(self, blobs: List[bytes]) -> List[bytes]:
+        cleartexts = self.old_workspace_entry.key.decrypt_batch(blobs)
+        return self.new_workspace_entry.key.encrypt_batch(cleartexts)
+
     async def do_one_batch(self, size=512) -> Tuple[int, int]:
         """
         Raises:
@@ -95,11 +99,14 @@ class ReencryptionJob:
                     f"Cannot do reencryption maintenance on workspace {workspace_id}: {rep}"
                 )
 
-            donebatch = []
-            for item in rep["batch"]:
-                cleartext = self.old_workspace_entry.key.decrypt(item["blob"])
-                newciphered = self.new_workspace_entry.key.encrypt(cleartext)
-                donebatch.append((item["vlob_id"], item["version"], newciphered))
+            # Reencryption is CPU bound, don't block the event loop
+            newciphereds = await trio.to_thread.run_sync(
+                self._reencrypt, [item["blob"] for item in rep["batch"]]
+            )
+            donebatch = [
+                (item["vlob_id"], item["version"], newciphered)
+                for item, newciphered in zip(rep["batch"], newciphereds)
+            ]
 
             rep = await self.backend_cmds.vlob_maintenance_save_reencryption_batch(
                 workspace_id, new_encryption_revision, donebatch
@@ -153,6 +160,9 @@ class UserFS:
         remote_devices_manager: RemoteDevicesManager,
         event_bus: EventBus,
         pattern_filter: Pattern,
+        manifest_cache_size: int = DEFAULT_MANIFEST_CACHE_SIZE,
+        max_block_transfers: int = DEFAULT_MAX_BLOCK_TRANSFERS,
+        block_segment_size: Optional[int] = None,
     ):
         self.device = device
         self.path = path
@@ -160,12 +170,16 @@ class UserFS:
         self.remote_devices_manager = remote_devices_manager
         self.event_bus = event_bus
         self.pattern_filter = pattern_filter
+        self.manifest_cache_size = manifest_cache_size
+        self.max_block_transfers = max_block_transfers
+        self.block_segment_size = block_segment_size
 
         self.storage: UserStorage  # Setup by UserStorage.run factory
 
         # Message processing is done in-order, hence it is pointless to do
         # it concurrently
         self._workspace_storage_nursery: trio.Nursery  # Setup by UserStorage.run factory
+        self._read_ahead_nursery: trio.Nursery  # Setup by UserStorage.run factory
         self._process_messages_lock = trio.Lock()
         self._update_user_manifest_lock = trio.Lock()
         self._workspace_storages: Dict[EntryID, WorkspaceFS] = {}
@@ -201,14 +215,20 @@ class UserFS:
             # Nursery for workspace storages
             async with trio.open_service_nursery() as self._workspace_storage_nursery:
 
-                # Make sure all the workspaces are loaded
-                # In particular, we want to make sure that any workspace available through
-                # `userfs.get_user_manifest().workspaces` is also available through
-                # `userfs.get_workspace(workspace_id)`.
-                for workspace_entry in self.get_user_manifest().workspaces:
-                    await self._load_workspace(workspace_entry.id)
+                # Nursery for block prefetching, stopped before the storages it relies on
+                async with trio.open_service_nursery() as self._read_ahead_nursery:
+
+                    # Make sure all the workspaces are loaded
+                    # In particular, we want to make sure that any workspace available through
+                    # `userfs.get_user_manifest().workspaces` is also available through
+                    # `userfs.get_workspace(workspace_id)`.
+                    for workspace_entry in self.get_user_manifest().workspaces:
+                        await self._load_workspace(workspace_entry.id)
+
+                    yield self
 
-                yield self
+                    # Stop the prefetching
+                    self._read_ahead_nursery.cancel_scope.cancel()
 
                 # Stop the workspace storages
                 self._workspace_storage_nursery.cancel_scope.cancel()
@@ -244,7 +264,9 @@ class UserFS:
         path = self.path / str(workspace_id)
 
         async def workspace_storage_task(task_status=trio.TASK_STATUS_IGNORED):
-            async with WorkspaceStorage.run(self.device, path, workspace_id) as workspace_storage:
+            async with WorkspaceStorage.run(
+                self.device, path, workspace_id, manifest_cache_size=self.manifest_cache_size
+            ) as workspace_storage:
                 task_status.started(workspace_storage)
                 await trio.sleep_forever()
 
@@ -272,6 +294,9 @@ class UserFS:
             backend_cmds=self.backend_cmds,
             event_bus=self.event_bus,
             remote_devices_manager=self.remote_devices_manager,
+            max_block_transfers=self.max_block_transfers,
+            read_ahead_nursery=self._read_ahead_nursery,
+            block_segment_size=self.block_segment_size,
         )
 
         # Apply the current filter
@@ -1,11 +1,12 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 
-from typing import Tuple, cast, Optional, AsyncIterator
+from typing import Tuple, Dict, Iterable, cast, Optional, AsyncIterator
 from async_generator import asynccontextmanager
 
 from guardata.client.types import (
     EntryID,
+    EntryName,
     FsPath,
     WorkspaceRole,
     BaseLocalManifest,
@@ -79,6 +80,43 @@ class EntryTransactions(FileTransactions):
         async with self._load_and_lock_manifest(entry_id) as manifest:
             return manifest
 
+    async def _load_manifests(
+        self, entry_ids: Iterable[EntryID], local_only: bool = False
+    ) -> Dict[EntryID, BaseLocalManifest]:
+        """Load several manifests, downloading all the missing ones at once.
+
+        The manifests that cannot be found remotely are not part of the result,
+        nor the ones missing locally when `local_only` is set.
+        """
+        manifests = {}
+        missing = []
+        for entry_id in entry_ids:
+            try:
+                manifests[entry_id] = await self.local_storage.get_manifest(entry_id)
+            except FSLocalMissError:
+                missing.append(entry_id)
+        if not missing or local_only:
+            return manifests
+
+        remote_manifests = await self.remote_loader.load_manifests(
+            [(entry_id, None, None) for entry_id in missing]
+        )
+        for entry_id, remote_manifest in zip(missing, remote_manifests):
+            if remote_manifest is None:
+                continue
+            async with self.local_storage.lock_entry_id(entry_id):
+                # The manifest might have been loaded in the meantime
+                try:
+                    local_manifest = await self.local_storage.get_manifest(entry_id)
+                except FSLocalMissError:
+                    local_manifest = BaseLocalManifest.from_remote(
+                        remote_manifest, pattern_filter=self.local_storage.get_pattern_filter()
+                    )
+                    await self.local_storage.set_manifest(entry_id, local_manifest)
+            manifests[entry_id] = local_manifest
+
+        return manifests
+
     async def _entry_id_from_path(self, path: FsPath) -> Tuple[EntryID, bool]:
         # Root entry_id and manifest
         entry_id = self.workspace_id
@@ -86,15 +124,23 @@ class EntryTransactions(FileTransactions):
 
         # Follow the path
         for name in path.parts:
-            manifest = await self._load_manifest(entry_id)
-            if is_file_manifest(manifest):
-                raise FSNotADirectoryError(filename=path)
-            manifest = cast(LocalFolderishManifests, manifest)
-            try:
-                entry_id = manifest.children[name]
-            except (AttributeError, KeyError):
-                raise FSFileNotFoundError(filename=path)
-            if entry_id in manifest.confined_entries:
+
+            # Resolve the name from the cache, or from the parent manifest
+            cached = self.local_storage.get_cached_child(entry_id, name)
+            if cached is not None:
+                entry_id, child_confined = cached
+            else:
+                manifest = await self._load_manifest(entry_id)
+                if is_file_manifest(manifest):
+                    raise FSNotADirectoryError(filename=path)
+                manifest = cast(LocalFolderishManifests, manifest)
+                try:
+                    entry_id = manifest.children[name]
+                except (AttributeError, KeyError):
+                    raise FSFileNotFoundError(filename=path)
+                child_confined = entry_id in manifest.confined_entries
+                self.local_storage.set_cached_child(manifest.id, name, entry_id, child_confined)
+            if child_confined:
                 confined = True
 
         # Return both entry_id and confined status
@@ -178,6 +224,35 @@ class EntryTransactions(FileTransactions):
         stats["confined"] = confined
         return stats
 
+    async def entry_info_with_children(
+        self, path: FsPath, local_only: bool = False
+    ) -> Tuple[dict, Dict[EntryName, dict]]:
+        # Check read rights
+        self.check_read_rights(path)
+
+        # Fetch folder data
+        manifest, confined = await self._get_manifest_from_path(path)
+        if not is_folderish_manifest(manifest):
+            raise FSNotADirectoryError(filename=path)
+        manifest = cast(LocalFolderishManifests, manifest)
+        stats = manifest.to_stats()
+        stats["confined"] = confined
+
+        # Fetch children data, in a single pass
+        children_manifests = await self._load_manifests(manifest.children.values(), local_only)
+        children_stats = {}
+        for name, entry_id in manifest.children.items():
+            try:
+                child_stats = children_manifests[entry_id].to_stats()
+            # The child manifest is not available locally (and not fetched) or remotely
+            except KeyError:
+                if not local_only:
+                    children_stats[name] = {"type": "inconsistency", "id": entry_id}
+                continue
+            child_stats["confined"] = confined or entry_id in manifest.confined_entries
+            children_stats[name] = child_stats
+        return stats, children_stats
+
     async def entry_rename(
         self, source: FsPath, destination: FsPath, overwrite: bool = True
     ) -> Optional[EntryID]:
@@ -1,18 +1,23 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 
+import math
 from guardata.client.client_events import ClientEvent
-from typing import Tuple, List, Callable, Dict
+from typing import Tuple, List, Callable, Dict, Optional, Set
 
+import attr
+import trio
 from collections import defaultdict
 from async_generator import asynccontextmanager
 
 from guardata.event_bus import EventBus
-from guardata.client.types import FileDescriptor, EntryID, LocalDevice
+from guardata.client.types import FileDescriptor, EntryID, ChunkID, BlockID, LocalDevice
 
 from guardata.client.fs.remote_loader import RemoteLoader
 from guardata.client.fs.storage import WorkspaceStorage
 from guardata.client.fs.exceptions import (
+    FSError,
+    FSInternalError,
     FSLocalMissError,
     FSInvalidFileDescriptor,
     FSEndOfFileError,
@@ -30,6 +35,10 @@ from guardata.api.data import BlockAccess
 __all__ = ("FSInvalidFileDescriptor", "FileTransactions")
 
 
+# Maximum number of blocks prefetched ahead of a sequential reader
+MAX_READ_AHEAD_BLOCKS = 8
+
+
 # Helpers
 
 
@@ -50,6 +59,58 @@ def padded_data(data: bytes, start: int, stop: int) -> bytes:
     return b"\x00" * (0 - start) + data[0:stop]
 
 
+def range_key(chunk: Chunk) -> Tuple[ChunkID, int, int]:
+    return chunk.id, chunk.start, chunk.stop
+
+
+def is_range_read_worth(chunk: Chunk) -> bool:
+    """Whether the chunk should be downloaded without the rest of its block."""
+    access = chunk.access
+    if access is None or access.segment_size is None:
+        return False
+    return 2 * (chunk.stop - chunk.start) < access.size
+
+
+@attr.s(slots=True, auto_attribs=True)
+class ReadAheadState:
+    """Access pattern of a file descriptor, used to prefetch the blocks
+    a sequential reader is about to need."""
+
+    next_offset: int
+    streak_start: float
+    streak_bytes: int = 0
+    # Moving average of the time it takes to download a block
+    block_load_time: float = 0.0
+    requested: Set[BlockID] = attr.ib(factory=set)
+    loading: Dict[BlockID, trio.Event] = attr.ib(factory=dict)
+    cancel_scopes: Set[trio.CancelScope] = attr.ib(factory=set)
+    closed: bool = False
+
+    def restart_streak(self, offset: int, now: float) -> None:
+        self.next_offset = offset
+        self.streak_start = now
+        self.streak_bytes = 0
+
+    def record_load_time(self, load_time: float) -> None:
+        if self.block_load_time:
+            load_time = 0.7 * self.block_load_time + 0.3 * load_time
+        self.block_load_time = load_time
+
+    def read_ahead_size(self, now: float, blocksize: int) -> int:
+        """Number of blocks to prefetch for the reader not to catch up with the downloads."""
+        elapsed = now - self.streak_start
+        if elapsed <= 0 or not self.block_load_time:
+            return 1
+        # Number of blocks consumed by the reader while a block is downloaded
+        nb_blocks = self.streak_bytes / elapsed * self.block_load_time / blocksize
+        return max(1, min(MAX_READ_AHEAD_BLOCKS, math.ceil(nb_blocks) + 1))
+
+    def close(self) -> None:
+        self.closed = True
+        for cancel_scope in self.cancel_scopes:
+            cancel_scope.cancel()
+
+
 class FileTransactions:
     """A stateless class to centralize all file transactions.
 
@@ -80,6 +141,8 @@ class FileTransactions:
         local_storage: WorkspaceStorage,
         remote_loader: RemoteLoader,
         event_bus: EventBus,
+        read_ahead_nursery: Optional[trio.Nursery] = None,
+        block_segment_size: Optional[int] = None,
     ):
         self.workspace_id = workspace_id
         self.get_workspace_entry = get_workspace_entry
@@ -88,6 +151,11 @@ class FileTransactions:
         self.remote_loader = remote_loader
         self.event_bus = event_bus
         self._write_count: Dict[FileDescriptor, int] = defaultdict(int)
+        # Prefetching is disabled when no nursery is provided
+        self.read_ahead_nursery = read_ahead_nursery
+        self._read_ahead: Dict[FileDescriptor, ReadAheadState] = {}
+        # Segment size of the new blocks, None to encrypt them as a whole
+        self.block_segment_size = block_segment_size
 
     # Event helper
 
@@ -105,7 +173,11 @@ class FileTransactions:
         await self.local_storage.set_chunk(chunk.id, data)
         return len(data)
 
-    async def _build_data(self, chunks: Tuple[Chunk, ...]) -> Tuple[bytes, List[BlockAccess]]:
+    async def _build_data(
+        self,
+        chunks: Tuple[Chunk, ...],
+        loaded_ranges: Optional[Dict[Tuple[ChunkID, int, int], bytes]] = None,
+    ) -> Tuple[bytes, List[BlockAccess]]:
         # Empty array
         if not chunks:
             return bytearray(), []
@@ -119,7 +191,11 @@ class FileTransactions:
                 result[chunk.start - start : chunk.stop - start] = await self._read_chunk(chunk)
             except FSLocalMissError:
                 assert chunk.access is not None
-                missing.append(chunk.access)
+                data = loaded_ranges.get(range_key(chunk)) if loaded_ranges else None
+                if data is not None:
+                    result[chunk.start - start : chunk.stop - start] = data
+                else:
+                    missing.append(chunk.access)
 
         # Return byte array
         return result, missing
@@ -156,8 +232,11 @@ class FileTransactions:
             # Atomic change
             self.local_storage.remove_file_descriptor(fd)
 
-            # Clear write count
+            # Clear write count and cancel the prefetching
             self._write_count.pop(fd, None)
+            read_ahead = self._read_ahead.pop(fd, None)
+            if read_ahead is not None:
+                read_ahead.close()
 
     async def fd_write(
         self, fd: FileDescriptor, content: bytes, offset: int, constrained: bool = False
@@ -212,12 +291,32 @@ class FileTransactions:
         self._send_event(ClientEvent.FS_ENTRY_UPDATED, id=manifest.id)
 
     async def fd_read(self, fd: FileDescriptor, size: int, offset: int, raise_eof=False) -> bytes:
+        # Sequential reads download whole blocks as the rest of them is about to be
+        # read anyway, random reads only download the parts of the blocks they need
+        read_ahead = self._read_ahead.get(fd)
+        sequential = read_ahead is not None and read_ahead.next_offset == offset
+
         # Loop over attemps
         missing: List[BlockAccess] = []
+        missing_ranges: List[Chunk] = []
+        loaded_ranges: Dict[Tuple[ChunkID, int, int], bytes] = {}
         while True:
 
-            # Load missing blocks
-            await self.remote_loader.load_blocks(missing)
+            # Load missing blocks, waiting for the ones already being prefetched
+            prefetching = read_ahead.loading if read_ahead is not None else {}
+            await self.remote_loader.load_blocks(
+                [access for access in missing if access.id not in prefetching]
+            )
+            for access in missing:
+                event = prefetching.get(access.id)
+                if event is not None:
+                    await event.wait()
+
+            # Load missing parts of blocks
+            for chunk in missing_ranges:
+                loaded_ranges[range_key(chunk)] = await self.remote_loader.load_block_range(
+                    chunk.access, chunk.start - chunk.raw_offset, chunk.stop - chunk.raw_offset
+                )
 
             # Fetch and lock
             async with self._load_and_lock_file(fd) as manifest:
@@ -236,17 +335,83 @@ class FileTransactions:
 
                 # Prepare
                 chunks = prepare_read(manifest, size, offset)
-                data, missing = await self._build_data(chunks)
+                data, missing = await self._build_data(chunks, loaded_ranges)
 
                 # Return the data
                 if not missing:
+                    self._read_ahead_after(fd, manifest, offset, len(data), sequential)
                     return data
 
+                # Pick the missing blocks that can be partially downloaded
+                if not sequential:
+                    missing_ids = {access.id for access in missing}
+                    missing_ranges = [
+                        chunk
+                        for chunk in chunks
+                        if chunk.access is not None
+                        and chunk.access.id in missing_ids
+                        and range_key(chunk) not in loaded_ranges
+                        and is_range_read_worth(chunk)
+                    ]
+                    ranged_ids = {chunk.access.id for chunk in missing_ranges}
+                    missing = [access for access in missing if access.id not in ranged_ids]
+
     async def fd_flush(self, fd: FileDescriptor) -> None:
         async with self._load_and_lock_file(fd) as manifest:
             await self._manifest_reshape(manifest)
             await self.local_storage.ensure_manifest_persistent(manifest.id)
 
+    # Read-ahead helpers
+
+    def _read_ahead_after(
+        self, fd: FileDescriptor, manifest: LocalFileManifest, offset: int, size: int, sequential
+    ) -> None:
+        """This internal helper does not perform any locking."""
+        now = trio.current_time()
+        read_ahead = self._read_ahead.get(fd)
+
+        # Random access, start detecting a new sequential streak
+        if not sequential:
+            if read_ahead is None:
+                read_ahead = self._read_ahead[fd] = ReadAheadState(offset + size, now)
+            else:
+                read_ahead.restart_streak(offset + size, now)
+            return
+
+        # Sequential access, prefetch the blocks following the read
+        read_ahead.next_offset = offset + size
+        read_ahead.streak_bytes += size
+        if self.read_ahead_nursery is None:
+            return
+        nb_blocks = read_ahead.read_ahead_size(now, manifest.blocksize)
+        for chunk in prepare_read(manifest, nb_blocks * manifest.blocksize, offset + size):
+            access = chunk.access
+            if access is None or access.id in read_ahead.requested:
+                continue
+            read_ahead.requested.add(access.id)
+            read_ahead.loading[access.id] = trio.Event()
+            self.read_ahead_nursery.start_soon(self._read_ahead_block, read_ahead, access)
+
+    async def _read_ahead_block(self, read_ahead: ReadAheadState, access: BlockAccess) -> None:
+        with trio.CancelScope() as cancel_scope:
+            read_ahead.cancel_scopes.add(cancel_scope)
+            # The file descriptor might have been closed before the task started
+            if read_ahead.closed:
+                cancel_scope.cancel()
+            try:
+                if not await self.local_storage.is_clean_block(access.id):
+                    start = trio.current_time()
+                    await self.remote_loader.load_block(access)
+                    read_ahead.record_load_time(trio.current_time() - start)
+            # Prefetching is only an optimization, errors are reported by the actual read.
+            # This includes internal errors (e.g. local storage closed in the meantime)
+            # that would otherwise tear down the nursery shared by all the workspaces
+            except (FSError, FSInternalError):
+                pass
+            finally:
+                read_ahead.cancel_scopes.discard(cancel_scope)
+                read_ahead.loading.pop(access.id).set()
+
     # Transaction helpers
 
     async def _manifest_resize(
@@ -289,7 +454,7 @@ class FileTransactions:
                 continue
 
             # Write data if necessary
-            new_chunk = destination.evolve_as_block(data)
+            new_chunk = destination.evolve_as_block(data, segment_size=self.block_segment_size)
             if source != (destination,):
                 await self._write_chunk(new_chunk, data)
 
@@ -367,7 +367,9 @@ class SyncTransactions(EntryTransactions):
                         new_chunk = Chunk.new(chunk.start, chunk.stop)
                         await self.local_storage.set_chunk(new_chunk.id, data)
                         if len(chunks) == 1:
-                            new_chunk = new_chunk.evolve_as_block(data)
+                            new_chunk = new_chunk.evolve_as_block(
+                                data, segment_size=self.block_segment_size
+                            )
                         new_chunks.append(chunk)
                     new_blocks.append(tuple(new_chunks))
                 new_blocks: Tuple[Tuple[Any, ...], ...] = tuple(new_blocks)
@@ -2,24 +2,28 @@
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 
 import attr
+import math
 import trio
 from collections import defaultdict
-from typing import Union, List, Dict, Tuple, AsyncIterator, cast, Pattern, Optional
+from typing import Union, List, Dict, Tuple, AsyncIterator, Callable, cast, Pattern, Optional
 from pendulum import DateTime, now as pendulum_now
 
+from guardata.utils import open_service_nursery
 from guardata.api.data import BaseManifest as BaseRemoteManifest
 from guardata.api.data import FileManifest as RemoteFileManifest
 from guardata.api.protocol import UserID, MaintenanceType
 from guardata.client.types import (
     FsPath,
     EntryID,
+    EntryName,
     LocalDevice,
     WorkspaceRole,
     RemoteFolderishManifests,
     DEFAULT_BLOCK_SIZE,
 )
+from guardata.client.client_events import ClientEvent
 from guardata.client.backend_connection import BackendNotAvailable, BackendConnectionError
-from guardata.client.fs.remote_loader import RemoteLoader
+from guardata.client.fs.remote_loader import RemoteLoader, DEFAULT_MAX_BLOCK_TRANSFERS
 from guardata.client.fs import (
     workspacefs,
 )  # Needed to break cyclic import with WorkspaceFSTimestamped
@@ -68,6 +72,9 @@ class WorkspaceFS:
         backend_cmds,
         event_bus,
         remote_devices_manager,
+        max_block_transfers: int = DEFAULT_MAX_BLOCK_TRANSFERS,
+        read_ahead_nursery: Optional[trio.Nursery] = None,
+        block_segment_size: Optional[int] = None,
     ):
         self.workspace_id = workspace_id
         self.get_workspace_entry = get_workspace_entry
@@ -85,6 +92,7 @@ class WorkspaceFS:
             self.backend_cmds,
             self.remote_devices_manager,
             self.local_storage,
+            max_block_transfers=max_block_transfers,
         )
         self.transactions = SyncTransactions(
             self.workspace_id,
@@ -93,6 +101,8 @@ class WorkspaceFS:
             self.local_storage,
             self.remote_loader,
             self.event_bus,
+            read_ahead_nursery=read_ahead_nursery,
+            block_segment_size=block_segment_size,
         )
 
     def __repr__(self):
@@ -123,6 +133,21 @@ class WorkspaceFS:
         """
         return await self.transactions.entry_info(FsPath(path))
 
+    async def listdir_with_info(
+        self, path: AnyPath, local_only: bool = False
+    ) -> Tuple[dict, Dict[EntryName, dict]]:
+        """
+        Return the info of a folder along with the ones of its children,
+        computed in a single pass. The missing children manifests are
+        downloaded concurrently, and those not available remotely are
+        reported with an `inconsistency` type. With `local_only`, nothing
+        is downloaded and the children missing locally are left out.
+
+        Raises:
+            FSError
+        """
+        return await self.transactions.entry_info_with_children(FsPath(path), local_only)
+
     async def path_id(self, path: AnyPath) -> EntryID:
         """
         Raises:
@@ -523,16 +548,45 @@ class WorkspaceFS:
     # Sync helpers
 
     async def _synchronize_placeholders(self, manifest: RemoteFolderishManifests) -> None:
-        async for child in self.transactions.get_placeholder_children(manifest):
-            await self.minimal_sync(child)
+        placeholders = [
+            child async for child in self.transactions.get_placeholder_children(manifest)
+        ]
+
+        # Each worker pulls the next placeholder to synchronize from the shared iterator
+        placeholders_iterator = iter(placeholders)
+
+        async def _minimal_sync_worker():
+            for child in placeholders_iterator:
+                await self.minimal_sync(child)
+
+        max_workers = min(self.remote_loader.max_block_transfers, len(placeholders))
+        async with open_service_nursery() as nursery:
+            for _ in range(max_workers):
+                nursery.start_soon(_minimal_sync_worker)
 
     async def _upload_blocks(self, manifest: RemoteFileManifest) -> None:
-        for access in manifest.blocks:
-            try:
-                data = await self.local_storage.get_dirty_block(access.id)
-            except FSLocalMissError:
-                continue
-            await self.remote_loader.upload_block(access, data)
+        # Each worker pulls the next block to upload from the shared iterator
+        accesses_iterator = iter(manifest.blocks)
+
+        async def _upload_blocks_worker():
+            for access in accesses_iterator:
+                try:
+                    data = await self.local_storage.get_dirty_block(access.id)
+                except FSLocalMissError:
+                    continue
+                await self.remote_loader.upload_block(access, data)
+                self.event_bus.send(
+                    ClientEvent.FS_BLOCK_UPLOADED,
+                    workspace_id=self.workspace_id,
+                    id=manifest.id,
+                    block_id=access.id,
+                    size=access.size,
+                )
+
+        max_workers = min(self.remote_loader.max_block_transfers, len(manifest.blocks))
+        async with open_service_nursery() as nursery:
+            for _ in range(max_workers):
+                nursery.start_soon(_upload_blocks_worker)
 
     async def minimal_sync(self, entry_id: EntryID) -> None:
         """
@@ -653,24 +707,23 @@ class WorkspaceFS:
         if workspace_manifest.is_placeholder:
             await self.remote_loader.create_realm(self.workspace_id)
 
-    async def sync_by_id(
-        self, entry_id: EntryID, remote_changed: bool = True, recursive: bool = True
-    ):
+    async def _sync_entry(
+        self, entry_id: EntryID, remote_changed: bool
+    ) -> Tuple[Optional[BaseRemoteManifest], Optional[EntryID]]:
         """
-        Raises:
-            FSError
-        """
-        # Make sure the corresponding realm exists
-        await self._create_realm_if_needed()
+        Synchronize a single entry.
 
-        # Sync parent first
+        Return the synchronized remote manifest (None if there was nothing to
+        synchronize) and, if a file conflict had to be resolved, the ID of the
+        parent that now requires a recursive synchronization.
+        """
         try:
             async with self.sync_locks[entry_id]:
                 manifest = await self._sync_by_id(entry_id, remote_changed=remote_changed)
 
         # Nothing to synchronize if the manifest does not exist locally
         except FSNoSynchronizationRequired:
-            return
+            return None, None
 
         # A file conflict needs to be adressed first
         except FSFileConflictError as exc:
@@ -678,22 +731,95 @@ class WorkspaceFS:
             # Only file manifest have synchronization conflict
             assert is_file_manifest(local_manifest)
             await self.transactions.file_conflict(entry_id, local_manifest, remote_manifest)
-            return await self.sync_by_id(local_manifest.parent)
+            return None, local_manifest.parent
 
-        # Non-recursive
-        if not recursive or is_file_manifest(manifest):
+        return manifest, None
+
+    async def _sync_tree(
+        self,
+        entry_id: EntryID,
+        remote_changed: bool,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        # A folder is synchronized before its children, given the children to
+        # synchronize are only known once the folder manifest is. Apart from that,
+        # entries are synchronized concurrently by a bounded pool of workers
+        # pulling from a shared queue.
+        send_channel, receive_channel = trio.open_memory_channel(math.inf)
+        send_channel.send_nowait((entry_id, remote_changed))
+        pending = 1
+        synced = 0
+
+        async def _sync_tree_worker():
+            nonlocal pending, synced
+            async for entry_id, remote_changed in receive_channel:
+                manifest, conflict_parent_id = await self._sync_entry(entry_id, remote_changed)
+                if conflict_parent_id is not None:
+                    next_entries = [(conflict_parent_id, True)]
+                elif manifest is not None and is_folderish_manifest(manifest):
+                    children = cast(RemoteFolderishManifests, manifest).children
+                    next_entries = [(child_id, remote_changed) for child_id in children.values()]
+                else:
+                    next_entries = []
+                for next_entry in next_entries:
+                    send_channel.send_nowait(next_entry)
+
+                pending += len(next_entries) - 1
+                synced += 1
+                if progress:
+                    progress(synced, synced + pending)
+
+                # The whole tree is synchronized, let the workers stop
+                if not pending:
+                    await send_channel.aclose()
+
+        async with open_service_nursery() as nursery:
+            for _ in range(self.remote_loader.max_block_transfers):
+                nursery.start_soon(_sync_tree_worker)
+
+    async def sync_by_id(
+        self,
+        entry_id: EntryID,
+        remote_changed: bool = True,
+        recursive: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Synchronize an entry, along with all its children if `recursive` is set.
+
+        Distinct entries of the tree are synchronized concurrently, up to the
+        number of block transfers allowed by the remote loader. The optional
+        `progress` callback is called with the number of entries synchronized
+        so far and the number of entries known to synchronize.
+
+        Raises:
+            FSError
+        """
+        # Make sure the corresponding realm exists
+        await self._create_realm_if_needed()
+
+        if recursive:
+            await self._sync_tree(entry_id, remote_changed, progress=progress)
             return
 
-        # Synchronize children
-        for name, entry_id in cast(RemoteFolderishManifests, manifest).children.items():
-            await self.sync_by_id(entry_id, remote_changed=remote_changed, recursive=True)
+        # Non-recursive
+        _, conflict_parent_id = await self._sync_entry(entry_id, remote_changed)
+        if conflict_parent_id is not None:
+            await self.sync_by_id(conflict_parent_id)
 
-    async def sync(self, *, remote_changed: bool = True) -> None:
+    async def sync(
+        self,
+        *,
+        remote_changed: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
         """
         Raises:
             FSError
         """
-        await self.sync_by_id(self.workspace_id, remote_changed=remote_changed, recursive=True)
+        await self.sync_by_id(
+            self.workspace_id, remote_changed=remote_changed, recursive=True, progress=progress
+        )
 
     # Apply filter
 
@@ -20,7 +20,6 @@ from guardata.client.types import (
 )
 from guardata.client.fs import WorkspaceFS, WorkspaceFSTimestamped
 from guardata.client.fs.exceptions import (
-    FSRemoteManifestNotFound,
     FSInvalidArgumentError,
     FSFileNotFoundError,
 )
@@ -77,14 +76,7 @@ async def _do_delete(workspace_fs, files, silent=False):
 
 
 async def _do_folder_stat(workspace_fs, path, default_selection):
-    stats = {}
-    dir_stat = await workspace_fs.path_info(path)
-    for child in dir_stat["children"]:
-        try:
-            child_stat = await workspace_fs.path_info(path / child)
-        except FSRemoteManifestNotFound as exc:
-            child_stat = {"type": "inconsistency", "id": exc.args[0]}
-        stats[child] = child_stat
+    dir_stat, stats = await workspace_fs.listdir_with_info(path)
     return path, dir_stat["id"], stats, default_selection
 
 
@@ -43,6 +43,7 @@ from guardata.client.mountpoint import mountpoint_manager_factory, MountpointMan
 from guardata.client.messages_monitor import monitor_messages
 from guardata.client.sync_monitor import monitor_sync
 from guardata.client.fs import UserFS
+from guardata.client.fs.storage import CertificateStorage
 
 
 logger = get_logger()
@@ -348,35 +349,55 @@ async def logged_client_factory(
         max_cooldown=config.backend_max_cooldown,
         max_pool=config.backend_max_connections,
         keepalive=config.backend_connection_keepalive,
+        multiplexing=config.backend_multiplexing,
     )
 
+    # Without multiplexing, concurrent block transfers are bound by the transport
+    # pool (minus the connection dedicated to the backend events listener)
+    max_block_transfers = config.workspace_max_block_transfers
+    if not config.backend_multiplexing:
+        max_block_transfers = min(max_block_transfers, config.backend_max_connections - 1)
+
     path = config.data_base_dir / device.slug
-    remote_devices_manager = RemoteDevicesManager(backend_conn.cmds, device.root_verify_key)
-    async with UserFS.run(
-        device, path, backend_conn.cmds, remote_devices_manager, event_bus, pattern_filter
-    ) as user_fs:
-
-        backend_conn.register_monitor(partial(monitor_messages, user_fs, event_bus))
-        backend_conn.register_monitor(partial(monitor_sync, user_fs, event_bus))
-
-        async with backend_conn.run():
-            async with mountpoint_manager_factory(
-                user_fs,
-                event_bus,
-                config.mountpoint_base_dir,
-                mount_all=config.mountpoint_enabled,
-                mount_on_workspace_created=config.mountpoint_enabled,
-                mount_on_workspace_shared=config.mountpoint_enabled,
-                unmount_on_workspace_revoked=config.mountpoint_enabled,
-                exclude_from_mount_all=config.disabled_workspaces,
-            ) as mountpoint_manager:
-
-                yield LoggedClient(
-                    config=config,
-                    device=device,
-                    event_bus=event_bus,
-                    mountpoint_manager=mountpoint_manager,
-                    user_fs=user_fs,
-                    remote_devices_manager=remote_devices_manager,
-                    backend_conn=backend_conn,
-                )
+    async with CertificateStorage.run(device, path) as certificate_storage:
+        remote_devices_manager = RemoteDevicesManager(
+            backend_conn.cmds,
+            device.root_verify_key,
+            certificate_storage=certificate_storage,
+        )
+        async with UserFS.run(
+            device,
+            path,
+            backend_conn.cmds,
+            remote_devices_manager,
+            event_bus,
+            pattern_filter,
+            manifest_cache_size=config.workspace_manifest_cache_size,
+            max_block_transfers=max_block_transfers,
+            block_segment_size=config.workspace_block_segment_size,
+        ) as user_fs:
+
+            backend_conn.register_monitor(partial(monitor_messages, user_fs, event_bus))
+            backend_conn.register_monitor(partial(monitor_sync, user_fs, event_bus))
+
+            async with backend_conn.run():
+                async with mountpoint_manager_factory(
+                    user_fs,
+                    event_bus,
+                    config.mountpoint_base_dir,
+                    mount_all=config.mountpoint_enabled,
+                    mount_on_workspace_created=config.mountpoint_enabled,
+                    mount_on_workspace_shared=config.mountpoint_enabled,
+                    unmount_on_workspace_revoked=config.mountpoint_enabled,
+                    exclude_from_mount_all=config.disabled_workspaces,
+                ) as mountpoint_manager:
+
+                    yield LoggedClient(
+                        config=config,
+                        device=device,
+                        event_bus=event_bus,
+                        mountpoint_manager=mountpoint_manager,
+                        user_fs=user_fs,
+                        remote_devices_manager=remote_devices_manager,
+                        backend_conn=backend_conn,
+                    )
@@ -19,7 +19,7 @@ async def freeze_messages_monitor_mockpoint():
 async def monitor_messages(user_fs, event_bus, task_status):
     wakeup = trio.Event()
 
-    def _on_message_received(event, index):
+    def _on_message_received(event, index=None):
         nonlocal wakeup
         wakeup.set()
         # Don't wait for the *actual* awakening to change the status to
@@ -27,7 +27,11 @@ async def monitor_messages(user_fs, event_bus, task_status):
         # not yet notified to task_status
         task_status.awake()
 
-    with event_bus.connect_in_context((ClientEvent.BACKEND_MESSAGE_RECEIVED, _on_message_received)):
+    with event_bus.connect_in_context(
+        (ClientEvent.BACKEND_MESSAGE_RECEIVED, _on_message_received),
+        # Message received events may have been lost
+        (ClientEvent.BACKEND_EVENTS_OVERFLOWED, _on_message_received),
+    ):
         try:
             await user_fs.process_last_messages()
             task_status.started()
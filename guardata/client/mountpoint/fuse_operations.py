@@ -4,8 +4,9 @@
 from guardata.client.client_events import ClientEvent
 import os
 import errno
-from typing import Optional
-from trio import Cancelled
+import threading
+from typing import Optional, Dict, Tuple
+from trio import Cancelled, RunFinishedError
 from structlog import get_logger
 from contextlib import contextmanager
 from stat import S_IRWXU, S_IFDIR, S_IFREG
@@ -13,12 +14,15 @@ from fuse import FuseOSError, Operations, LoggingMixIn, fuse_get_context, fuse_e
 
 
 from guardata.client.types import FsPath
-from guardata.client.fs import FSLocalOperationError, FSRemoteOperationError
+from guardata.client.fs import FSLocalOperationError, FSRemoteOperationError, FSFileNotFoundError
 
 
 logger = get_logger()
 MODES = {os.O_RDONLY: "r", os.O_WRONLY: "w", os.O_RDWR: "rw"}
 
+# Maximum number of entry infos kept in memory between two changes in the workspace
+ENTRY_INFO_CACHE_SIZE = 10000
+
 
 # We are preventing the creation of file and folders starting with those prefixes
 # It might not be the best solution but it does fix our problems for the moment.
@@ -49,8 +53,9 @@ def translate_error(event_bus, operation, path):
         event_bus.send(ClientEvent.MOUNTPOINT_REMOTE_ERROR, exc=exc, operation=operation, path=path)
         raise FuseOSError(exc.errno) from exc
 
-    except Cancelled as exc:
-        # Raised by self.fs_access incase trio loop finishes early
+    except (Cancelled, RunFinishedError) as exc:
+        # Raised by self.fs_access incase trio loop finishes early, which can
+        # happen given the operations are concurrently run from several threads
         raise FuseOSError(errno.EACCES) from exc
 
     except Exception as exc:
@@ -69,6 +74,12 @@ class FuseOperations(LoggingMixIn, Operations):
         self.fs_access = fs_access
         self.fds = {}
         self._need_exit = False
+        # Entry infos (None for missing entries) by path parts. The cache is cleared
+        # each time the workspace changes (see `clear_entry_info_cache`), hence the
+        # generation counter to detect an info fetched before such a change.
+        self._entry_infos: Dict[Tuple[str, ...], Optional[dict]] = {}
+        self._entry_infos_generation = 0
+        self._entry_infos_lock = threading.Lock()
 
     def __call__(self, name, path, *args, **kwargs):
         # The path argument might be None or "-" in some special cases
@@ -84,6 +95,33 @@ class FuseOperations(LoggingMixIn, Operations):
         # (see https://github.com/fusepy/fusepy/issues/116).
         self._need_exit = True
 
+    def clear_entry_info_cache(self):
+        with self._entry_infos_lock:
+            self._entry_infos.clear()
+            self._entry_infos_generation += 1
+
+    def _cache_entry_infos(self, generation: int, entry_infos: Dict[Tuple[str, ...], dict]):
+        with self._entry_infos_lock:
+            if generation != self._entry_infos_generation:
+                return
+            if len(self._entry_infos) + len(entry_infos) > ENTRY_INFO_CACHE_SIZE:
+                self._entry_infos.clear()
+            self._entry_infos.update(entry_infos)
+
+    def _entry_info(self, path: FsPath) -> dict:
+        with self._entry_infos_lock:
+            generation = self._entry_infos_generation
+            cached = self._entry_infos.get(path.parts, False)
+        if cached is False:
+            try:
+                cached = self.fs_access.entry_info(path)
+            except FSFileNotFoundError:
+                cached = None
+            self._cache_entry_infos(generation, {path.parts: cached})
+        if cached is None:
+            raise FuseOSError(errno.ENOENT)
+        return cached
+
     def init(self, path: FsPath):
         pass
 
@@ -100,7 +138,7 @@ class FuseOperations(LoggingMixIn, Operations):
         if self._need_exit:
             fuse_exit()
 
-        stat = self.fs_access.entry_info(path)
+        stat = self._entry_info(path)
 
         fuse_stat = {}
         # Set it to 777 access
@@ -134,10 +172,17 @@ class FuseOperations(LoggingMixIn, Operations):
         return
 
     def readdir(self, path: FsPath, fh: int):
-        stat = self.fs_access.entry_info(path)
-
-        if stat["type"] == "file":
-            raise FuseOSError(errno.ENOTDIR)
+        # Listing a folder is typically followed by a `getattr` on each child,
+        # so keep the infos of the children already available locally in the
+        # cache. The other ones are not downloaded here, listing a folder must
+        # not depend on the backend (nor fetch all its children manifests)
+        with self._entry_infos_lock:
+            generation = self._entry_infos_generation
+        stat, children_stats = self.fs_access.entry_info_with_children(path, local_only=True)
+        entry_infos = {path.parts: stat}
+        for name, child_stat in children_stats.items():
+            entry_infos[(path / name).parts] = child_stat
+        self._cache_entry_infos(generation, entry_infos)
 
         return [".", ".."] + list(stat["children"])
 
@@ -27,6 +27,23 @@ __all__ = ("fuse_mountpoint_runner",)
 logger = get_logger()
 
 
+# Time (in seconds) the kernel keeps the attributes and directory entries (including
+# the missing ones) without asking them again. Changes made through the mountpoint
+# are directly accounted for by the kernel, the other ones (remote changes, changes
+# made from the application) become visible once the timeout is expired.
+FUSE_CACHE_TIMEOUT = 1.0
+# Timestamped workspaces are read-only snapshots, their entries never change
+FUSE_TIMESTAMPED_CACHE_TIMEOUT = 3600.0
+
+# Events signaling a change in the entries of a workspace
+ENTRY_CHANGED_EVENTS = (
+    ClientEvent.FS_ENTRY_UPDATED,
+    ClientEvent.FS_ENTRY_SYNCED,
+    ClientEvent.FS_ENTRY_DOWNSYNCED,
+    ClientEvent.FS_ENTRY_FILE_CONFLICT_RESOLVED,
+)
+
+
 def on_mac():
     return sys.platform == "darwin"
 
@@ -113,12 +130,25 @@ async def fuse_mountpoint_runner(
         base_mountpoint_path, workspace_fs
     )
 
+    # Entry infos are cached by the kernel and by the fuse operations, the latter
+    # being cleared as soon as the workspace changes
+    def _on_entry_changed(event, workspace_id=None, **kwargs):
+        if workspace_id == workspace_fs.workspace_id:
+            fuse_operations.clear_entry_info_cache()
+
+    if getattr(workspace_fs, "timestamp", None) is None:
+        cache_timeout = FUSE_CACHE_TIMEOUT
+    else:
+        cache_timeout = FUSE_TIMESTAMPED_CACHE_TIMEOUT
+
     # Prepare event information
     event_kwargs = {
         "mountpoint": mountpoint_path,
         "workspace_id": workspace_fs.workspace_id,
         "timestamp": getattr(workspace_fs, "timestamp", None),
     }
+    for event in ENTRY_CHANGED_EVENTS:
+        event_bus.connect(event, _on_entry_changed)
     try:
         teardown_cancel_scope = None
         event_bus.send(ClientEvent.MOUNTPOINT_STARTING, **event_kwargs)
@@ -151,6 +181,9 @@ async def fuse_mountpoint_runner(
                         str(mountpoint_path.absolute()),
                         foreground=True,
                         encoding=encoding,
+                        attr_timeout=cache_timeout,
+                        entry_timeout=cache_timeout,
+                        negative_timeout=cache_timeout,
                         **plt_options,
                         **config,
                     )
@@ -187,6 +220,8 @@ async def fuse_mountpoint_runner(
             await _stop_fuse_thread(
                 mountpoint_path, fuse_operations, fuse_thread_started, fuse_thread_stopped
             )
+            for event in ENTRY_CHANGED_EVENTS:
+                event_bus.disconnect(event, _on_entry_changed)
             event_bus.send(ClientEvent.MOUNTPOINT_STOPPED, **event_kwargs)
             await _teardown_mountpoint(mountpoint_path)
 
@@ -285,13 +285,17 @@ async def mountpoint_manager_factory(
     base_mountpoint_path,
     *,
     debug: bool = False,
+    nothreads: bool = False,
     mount_all: bool = False,
     mount_on_workspace_created: bool = False,
     mount_on_workspace_shared: bool = False,
     unmount_on_workspace_revoked: bool = False,
     exclude_from_mount_all: list = (),
 ):
-    config = {"debug": debug}
+    # Unless `nothreads` is set, FUSE operations are processed by a pool of threads,
+    # so that a slow operation (e.g. reading a block from the backend) doesn't
+    # prevent the rest of the mountpoint from being accessed
+    config = {"debug": debug, "nothreads": nothreads}
 
     runner = get_mountpoint_runner()
 
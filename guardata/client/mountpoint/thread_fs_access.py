@@ -5,6 +5,13 @@ import trio
 
 
 class ThreadFSAccess:
+    """Run the workspace operations in the trio loop on behalf of the driver threads.
+
+    The driver might call the methods concurrently from several threads, each
+    call being processed by its own trio task. The workspace transactions being
+    safe to run concurrently, a slow operation only blocks its calling thread.
+    """
+
     def __init__(self, trio_token, workspace_fs):
         self.workspace_fs = workspace_fs
         self._trio_token = trio_token
@@ -28,6 +35,9 @@ class ThreadFSAccess:
     def entry_info(self, path):
         return self._run(self.workspace_fs.transactions.entry_info, path)
 
+    def entry_info_with_children(self, path, local_only=False):
+        return self._run(self.workspace_fs.transactions.entry_info_with_children, path, local_only)
+
     def entry_rename(self, source, destination, *, overwrite):
         return self._run(
             self.workspace_fs.transactions.entry_rename, source, destination, overwrite
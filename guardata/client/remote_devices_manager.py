@@ -58,6 +58,10 @@ class RemoteDevicesManager:
     """
     Fetch users&devices from backend, verify their trustchain and keep
     a cache of them for a limited duration.
+
+    If a certificate storage (see `guardata.client.fs.storage.CertificateStorage`)
+    is provided, the certificates verified once are remembered across restarts
+    so only the new ones get their signature checked.
     """
 
     def __init__(
@@ -65,9 +69,16 @@ class RemoteDevicesManager:
         backend_cmds: BackendAuthenticatedCmds,
         root_verify_key: VerifyKey,
         cache_validity: int = DEFAULT_CACHE_VALIDITY,
+        certificate_storage=None,
     ):
         self._backend_cmds = backend_cmds
-        self._trustchain_ctx = TrustchainContext(root_verify_key, cache_validity)
+        self._certificate_storage = certificate_storage
+        self._verified_certificates_loaded = certificate_storage is None
+        self._trustchain_ctx = TrustchainContext(
+            root_verify_key,
+            cache_validity,
+            certificates_digest_key=certificate_storage.digest_key if certificate_storage else b"",
+        )
 
     @property
     def cache_validity(self) -> int:
@@ -161,6 +172,12 @@ class RemoteDevicesManager:
         elif rep["status"] != "ok":
             raise RemoteDevicesManagerError(f"Cannot fetch user {user_id}: `{rep['status']}`")
 
+        if not self._verified_certificates_loaded:
+            self._trustchain_ctx.add_verified_certificates(
+                await self._certificate_storage.get_verified_certificates()
+            )
+            self._verified_certificates_loaded = True
+
         try:
             return self._trustchain_ctx.load_user_and_devices(
                 trustchain=rep["trustchain"],
@@ -171,6 +188,11 @@ class RemoteDevicesManager:
             )
         except TrustchainError as exc:
             raise RemoteDevicesManagerInvalidTrustchainError(exc) from exc
+        finally:
+            # Signatures verified before a trustchain error are still valid
+            new_verified_certificates = self._trustchain_ctx.pop_new_verified_certificates()
+            if self._certificate_storage and new_verified_certificates:
+                await self._certificate_storage.add_verified_certificates(new_verified_certificates)
 
 
 async def get_device_invitation_creator(
@@ -5,9 +5,12 @@ from guardata.client.client_events import ClientEvent
 import trio
 from trio.lowlevel import current_clock
 import math
+from heapq import heappush, heappop, heapify
+from itertools import count
+from typing import Optional, Tuple
 from structlog import get_logger
 
-from guardata.client.types import EntryID, WorkspaceRole
+from guardata.client.types import EntryID, WorkspaceRole, LocalFileManifest
 from guardata.client.fs import (
     FSBackendOfflineError,
     FSWorkspaceNotFoundError,
@@ -15,6 +18,7 @@ from guardata.client.fs import (
     FSWorkspaceNoWriteAccess,
     FSWorkspaceInMaintenance,
 )
+from guardata.client.fs.exceptions import FSLocalMissError
 from guardata.client.backend_connection import BackendConnectionError, BackendNotAvailable
 
 
@@ -24,6 +28,9 @@ MIN_WAIT = 1
 MAX_WAIT = 60
 MAINTENANCE_MIN_WAIT = 30
 TICK_CRASH_COOLDOWN = 5
+MAX_CONCURRENT_SYNCS = 4
+# Remote changes are cheap to download and have priority over local changes
+REMOTE_CHANGE_PRIORITY = -1
 
 
 async def freeze_sync_monitor_mockpoint():
@@ -64,6 +71,11 @@ class SyncContext:
     - Otherwise (typically when the application starts or when back online after
       an disconnection) it uses the realm's checkpoint stored in the persistent
       storage to get the list of changes (entry id + version) it has missed
+
+    Local changes are indexed by due time in a heap, then moved to a second
+    heap ordered by priority once due. Each change is pushed to the due time
+    heap only once: a new modification can only postpone its due time, so the
+    change is lazily pushed back when it pops before its actual due time.
     """
 
     def __init__(self, user_fs, id: EntryID, read_only: bool = False):
@@ -72,7 +84,13 @@ class SyncContext:
         self.read_only = read_only
         self.due_time = math.inf
         self._changes_loaded = False
+        self._sequence = count()
         self._local_changes = {}
+        # Heap of (due_time, sequence, local_change, entry_id)
+        self._pending_local_changes = []
+        # Heap of (priority, sequence, local_change, entry_id)
+        self._ready_local_changes = []
+        self._local_syncs_in_progress = 0
         self._remote_changes = set()
         self._confined_entries = {}
 
@@ -85,6 +103,10 @@ class SyncContext:
     def _get_local_storage(self):
         raise NotImplementedError
 
+    async def _get_priority(self, entry_id: EntryID) -> int:
+        # The lower the sooner
+        return 0
+
     def __repr__(self):
         return f"{type(self).__name__}(id={self.id!r})"
 
@@ -131,6 +153,12 @@ class SyncContext:
         # Ignore local changes in read only mode
         if not self.read_only:
             self._local_changes = {entry_id: LocalChange(now) for entry_id in need_sync_local}
+            self._pending_local_changes = [
+                (local_change.due_time, next(self._sequence), local_change, entry_id)
+                for entry_id, local_change in self._local_changes.items()
+            ]
+            heapify(self._pending_local_changes)
+            self._ready_local_changes = []
         self._remote_changes = need_sync_remote
 
         # 4) Finally refresh due time according to the changes
@@ -139,6 +167,15 @@ class SyncContext:
         self._changes_loaded = True
         return True
 
+    def _add_local_change(self, entry_id: EntryID, now: float) -> float:
+        local_change = LocalChange(now)
+        self._local_changes[entry_id] = local_change
+        heappush(
+            self._pending_local_changes,
+            (local_change.due_time, next(self._sequence), local_change, entry_id),
+        )
+        return local_change.due_time
+
     def set_local_change(self, entry_id: EntryID) -> bool:
         # Ignore local changes in read only mode
         wake_up = False
@@ -153,14 +190,13 @@ class SyncContext:
             if self.set_local_change(confined_entry):
                 wake_up = True
 
-        # Update local_changes dictionnary
+        # Update local_changes dictionnary, the heap entry of an already known
+        # change is updated lazily given its due time can only be postponed
         now = timestamp()
         try:
             new_due_time = self._local_changes[entry_id].changed(now)
         except KeyError:
-            local_change = LocalChange(now)
-            self._local_changes[entry_id] = local_change
-            new_due_time = local_change.due_time
+            new_due_time = self._add_local_change(entry_id, now)
 
         # Trigger a wake up if necessary
         if new_due_time <= self.due_time:
@@ -174,17 +210,23 @@ class SyncContext:
         self.due_time = timestamp()
         return True
 
+    def reload_changes(self) -> None:
+        """
+        Poll the changes from the backend again on next schedule (e.g. when
+        backend events have been lost).
+        """
+        self._changes_loaded = False
+        self.due_time = timestamp()
+
     def set_confined_entry(self, entry_id: EntryID, cause_id: EntryID) -> None:
         self._confined_entries.setdefault(cause_id, set()).add(entry_id)
 
     def _compute_due_time(self, now=None, min_due_time=None):
-        if self._remote_changes:
+        if self._remote_changes or self._ready_local_changes:
             self.due_time = now or timestamp()
-        elif self._local_changes:
-            # TODO: index changes by due_time to avoid this O(n) operation
-            self.due_time = min(
-                change_info.due_time for change_info in self._local_changes.values()
-            )
+        elif self._pending_local_changes:
+            # Lower bound given the due time of a change may have been postponed
+            self.due_time = self._pending_local_changes[0][0]
         else:
             self.due_time = math.inf
 
@@ -197,21 +239,76 @@ class SyncContext:
         await self._load_changes()
         return self.due_time
 
-    async def tick(self) -> float:
+    async def schedule(self) -> float:
+        """
+        Move the local changes that are due to the ready heap, according to
+        their priority.
+        """
         now = timestamp()
         if self.due_time > now:
             return self.due_time
 
         # Sync contexts created by `SyncContextStore.get` are bootstrapped
-        # lazily on first tick
+        # lazily on first schedule
         if not await self._load_changes():
             return self.due_time
 
-        min_due_time = None
+        while self._pending_local_changes and self._pending_local_changes[0][0] <= now:
+            _, _, local_change, entry_id = heappop(self._pending_local_changes)
+            # The change has already been synchronized or replaced
+            if self._local_changes.get(entry_id) is not local_change:
+                continue
+            # The change has been postponed by a new modification
+            if local_change.due_time > now:
+                heappush(
+                    self._pending_local_changes,
+                    (local_change.due_time, next(self._sequence), local_change, entry_id),
+                )
+                continue
+            priority = await self._get_priority(entry_id)
+            heappush(
+                self._ready_local_changes, (priority, next(self._sequence), local_change, entry_id)
+            )
+
+        return self._compute_due_time(now=now)
 
+    def get_ready_priority(self) -> Optional[int]:
+        """
+        Return the priority of the next entry to synchronize, or None if no
+        entry is ready.
+        """
+        if self.due_time > timestamp():
+            return None
         # Remote changes sync have priority over local changes
+        if self._remote_changes:
+            return REMOTE_CHANGE_PRIORITY
+        if self._ready_local_changes:
+            return self._ready_local_changes[0][0]
+        return None
+
+    def pop_ready_entry(self) -> Tuple[EntryID, bool]:
+        """
+        Return the next entry to synchronize along with a flag indicating if
+        it is a remote change. `get_ready_priority` must have returned a
+        priority beforehand.
+        """
         if self._remote_changes:
             entry_id = self._remote_changes.pop()
+            remote = True
+        else:
+            _, _, local_change, entry_id = heappop(self._ready_local_changes)
+            # Newer modifications are going to be synchronized as well
+            if self._local_changes.get(entry_id) is local_change:
+                del self._local_changes[entry_id]
+            remote = False
+        self._compute_due_time()
+        return entry_id, remote
+
+    async def sync_entry(self, entry_id: EntryID, remote: bool) -> float:
+        now = timestamp()
+        min_due_time = None
+
+        if remote:
             try:
                 await self._sync(entry_id)
             except FSBackendOfflineError as exc:
@@ -233,41 +330,35 @@ class SyncContext:
                 min_due_time = now + MAINTENANCE_MIN_WAIT
                 self._remote_changes.add(entry_id)
 
-        elif self._local_changes:
-            entry_id = next(
-                (
-                    entry_id
-                    for entry_id, change_info in self._local_changes.items()
-                    if change_info.due_time <= now
-                ),
-                None,
-            )
-            if entry_id:
-                del self._local_changes[entry_id]
-                try:
-                    await self._sync(entry_id)
-                except FSBackendOfflineError as exc:
-                    raise BackendNotAvailable from exc
-                except (FSWorkspaceNoReadAccess, FSWorkspaceNoWriteAccess):
-                    # We've just lost the write access to the workspace, and
-                    # the corresponding `sharing.updated` event hasn't updated
-                    # the `read_only` flag yet.
-                    # We keep track of the change (given we may be given back
-                    # the write access in the future) but pretent it just accured
-                    # to avoid a busy sync loop until `read_only` flag is updated.
-                    self._local_changes[entry_id] = LocalChange(now)
-                except FSWorkspaceInMaintenance:
-                    # Not the right time for the sync, retry later
-                    min_due_time = now + MAINTENANCE_MIN_WAIT
-                    self._local_changes[entry_id] = LocalChange(now)
-
-                # This is where we plug our vacuuming routine
-                # as it corresponds to a fresh synchronized state
-                if not self._local_changes:
-                    await self._get_local_storage().run_vacuum()
-
-        self._compute_due_time(now=now, min_due_time=min_due_time)
-        return self.due_time
+        else:
+            self._local_syncs_in_progress += 1
+            try:
+                await self._sync(entry_id)
+            except FSBackendOfflineError as exc:
+                raise BackendNotAvailable from exc
+            except (FSWorkspaceNoReadAccess, FSWorkspaceNoWriteAccess):
+                # We've just lost the write access to the workspace, and
+                # the corresponding `sharing.updated` event hasn't updated
+                # the `read_only` flag yet.
+                # We keep track of the change (given we may be given back
+                # the write access in the future) but pretent it just accured
+                # to avoid a busy sync loop until `read_only` flag is updated.
+                if entry_id not in self._local_changes:
+                    self._add_local_change(entry_id, now)
+            except FSWorkspaceInMaintenance:
+                # Not the right time for the sync, retry later
+                min_due_time = now + MAINTENANCE_MIN_WAIT
+                if entry_id not in self._local_changes:
+                    self._add_local_change(entry_id, now)
+            finally:
+                self._local_syncs_in_progress -= 1
+
+            # This is where we plug our vacuuming routine
+            # as it corresponds to a fresh synchronized state
+            if not self._local_changes and not self._local_syncs_in_progress:
+                await self._get_local_storage().run_vacuum()
+
+        return self._compute_due_time(now=now, min_due_time=min_due_time)
 
 
 class WorkspaceSyncContext(SyncContext):
@@ -281,6 +372,17 @@ class WorkspaceSyncContext(SyncContext):
         # (remotely or locally) should get synchronized
         await self.workspace.sync_by_id(entry_id, recursive=False)
 
+    async def _get_priority(self, entry_id: EntryID) -> int:
+        # Folders are cheap to synchronize and make the changes visible to
+        # other users, while files go from the smallest to the largest
+        try:
+            manifest = await self.workspace.local_storage.get_manifest(entry_id)
+        except FSLocalMissError:
+            return 0
+        if isinstance(manifest, LocalFileManifest):
+            return manifest.size
+        return 0
+
     def _get_backend_cmds(self):
         return self.workspace.backend_cmds
 
@@ -361,6 +463,12 @@ async def monitor_sync(user_fs, event_bus, task_status):
         if ctx and ctx.set_remote_change(src_id):
             _trigger_early_wakeup()
 
+    def _on_events_overflowed(event):
+        # Backend events have been lost, so are the remote changes they notified
+        for ctx in ctxs.iter():
+            ctx.reload_changes()
+        _trigger_early_wakeup()
+
     def _on_sharing_updated(sender, new_entry, previous_entry):
         # If role have changed we have to reset the sync context given
         # behavior could have changed a lot (e.g. switching to/from read-only)
@@ -378,9 +486,9 @@ async def monitor_sync(user_fs, event_bus, task_status):
         if ctx is not None:
             ctx.set_confined_entry(entry_id, cause_id)
 
-    async def _ctx_action(ctx, meth):
+    async def _ctx_action(ctx, meth, *args):
         try:
-            return await getattr(ctx, meth)()
+            return await getattr(ctx, meth)(*args)
         except BackendNotAvailable:
             raise
         except Exception:
@@ -395,37 +503,77 @@ async def monitor_sync(user_fs, event_bus, task_status):
             else:
                 return math.inf
 
+    syncs_in_progress = 0
+
+    async def _sync_entry(ctx, entry_id, remote):
+        nonlocal syncs_in_progress
+        try:
+            await _ctx_action(ctx, "sync_entry", entry_id, remote)
+        finally:
+            syncs_in_progress -= 1
+            # Let the monitor start the next sync
+            _trigger_early_wakeup()
+
+    def _pop_most_urgent_ctx():
+        most_urgent_ctx = None
+        most_urgent_priority = None
+        for ctx in ctxs.iter():
+            priority = ctx.get_ready_priority()
+            if priority is not None and (
+                most_urgent_priority is None or priority < most_urgent_priority
+            ):
+                most_urgent_ctx = ctx
+                most_urgent_priority = priority
+        return most_urgent_ctx
+
     with event_bus.connect_in_context(
         (ClientEvent.FS_ENTRY_UPDATED, _on_entry_updated),
         (ClientEvent.BACKEND_REALM_VLOBS_UPDATED, _on_realm_vlobs_updated),
+        (ClientEvent.BACKEND_EVENTS_OVERFLOWED, _on_events_overflowed),
         (ClientEvent.SHARING_UPDATED, _on_sharing_updated),
         (ClientEvent.FS_ENTRY_CONFINED, _on_entry_confined),
     ):
-        due_times = []
         # Init userfs sync context
         ctx = ctxs.get(user_fs.user_manifest_id)
-        due_times.append(await _ctx_action(ctx, "bootstrap"))
+        await _ctx_action(ctx, "bootstrap")
         # Init workspaces sync context
         user_manifest = user_fs.get_user_manifest()
         for entry in user_manifest.workspaces:
             if entry.role is not None:
                 ctx = ctxs.get(entry.id)
                 if ctx:
-                    due_times.append(await _ctx_action(ctx, "bootstrap"))
-
-        task_status.started()
-        while True:
-            next_due_time = min(due_times)
-            if next_due_time == math.inf:
-                task_status.idle()
-            with trio.move_on_at(next_due_time) as cancel_scope:
-                await early_wakeup.wait()
-                early_wakeup = trio.Event()
-            # In case of early wakeup, `_trigger_early_wakeup` is responsible
-            # for calling `task_status.awake()`
-            if cancel_scope.cancelled_caught:
-                task_status.awake()
-            due_times.clear()
-            await freeze_sync_monitor_mockpoint()
-            for ctx in ctxs.iter():
-                due_times.append(await _ctx_action(ctx, "tick"))
+                    await _ctx_action(ctx, "bootstrap")
+
+        async with trio.open_service_nursery() as nursery:
+            task_status.started()
+            while True:
+                await freeze_sync_monitor_mockpoint()
+
+                # Collect the entries that are due in every sync context
+                for ctx in ctxs.iter():
+                    await _ctx_action(ctx, "schedule")
+
+                # Start the most urgent syncs across all the sync contexts
+                while syncs_in_progress < MAX_CONCURRENT_SYNCS:
+                    ctx = _pop_most_urgent_ctx()
+                    if ctx is None:
+                        break
+                    entry_id, remote = ctx.pop_ready_entry()
+                    syncs_in_progress += 1
+                    nursery.start_soon(_sync_entry, ctx, entry_id, remote)
+
+                # Contexts with ready entries are waiting for a running sync
+                # to finish, which triggers an early wakeup
+                next_due_time = min(
+                    (ctx.due_time for ctx in ctxs.iter() if ctx.get_ready_priority() is None),
+                    default=math.inf,
+                )
+                if next_due_time == math.inf and not syncs_in_progress:
+                    task_status.idle()
+                with trio.move_on_at(next_due_time) as cancel_scope:
+                    await early_wakeup.wait()
+                    early_wakeup = trio.Event()
+                # In case of early wakeup, `_trigger_early_wakeup` is responsible
+                # for calling `task_status.awake()`
+                if cancel_scope.cancelled_caught:
+                    task_status.awake()
@@ -1,10 +1,10 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 
-from typing import Tuple, List, Sequence, Optional
+from typing import Tuple, List, Sequence, Optional, Iterable
 from pendulum import DateTime, now as pendulum_now
 
-from guardata.crypto import VerifyKey
+from guardata.crypto import VerifyKey, HashDigest
 from guardata.api.protocol import UserID, DeviceID
 from guardata.api.data import (
     DataError,
@@ -33,12 +33,48 @@ class CertifState:
 
 
 class TrustchainContext:
-    def __init__(self, root_verify_key: VerifyKey, cache_validity: int):
+    def __init__(
+        self, root_verify_key: VerifyKey, cache_validity: int, certificates_digest_key: bytes = b""
+    ):
         self.root_verify_key = root_verify_key
         self.cache_validity = cache_validity
         self._users_cache = {}
         self._devices_cache = {}
         self._revoked_users_cache = {}
+        # Digests of the certificates whose signature is known to be valid, they
+        # outlive the cache validity given a certificate is immutable. Note the
+        # trustchain itself (author profile, revocations) is always checked again.
+        self._certificates_digest_key = certificates_digest_key
+        self._verified_certificates = set()
+        self._new_verified_certificates = []
+
+    def add_verified_certificates(self, digests: Iterable[bytes]) -> None:
+        self._verified_certificates.update(digests)
+
+    def pop_new_verified_certificates(self) -> List[bytes]:
+        new_verified_certificates = self._new_verified_certificates
+        self._new_verified_certificates = []
+        return new_verified_certificates
+
+    def _verify_and_load(self, certif, certif_cls, unverified, author_verify_key, expected_author):
+        digest = HashDigest.from_data(
+            author_verify_key.encode() + certif, key=self._certificates_digest_key
+        )
+        if digest not in self._verified_certificates:
+            verified = certif_cls.verify_and_load(
+                certif, author_verify_key=author_verify_key, expected_author=expected_author
+            )
+            self._verified_certificates.add(digest)
+            self._new_verified_certificates.append(digest)
+            return verified
+
+        # Signature already verified, the author is part of the signed content
+        if unverified.author != expected_author:
+            repr_expected_author = expected_author or "<root key>"
+            raise DataError(
+                f"Invalid author: expected `{repr_expected_author}`, got `{unverified.author}`"
+            )
+        return unverified
 
     def invalidate_user_cache(self, user_id: UserID) -> None:
         self._users_cache.pop(user_id, None)
@@ -191,21 +227,27 @@ class TrustchainContext:
             except KeyError:
                 return None
 
-        def _verify_created_by_root(certif, certif_cls, sign_chain):
+        def _verify_created_by_root(certif, certif_cls, unverified, sign_chain):
             try:
-                return certif_cls.verify_and_load(
-                    certif, author_verify_key=self.root_verify_key, expected_author=None
+                return self._verify_and_load(
+                    certif,
+                    certif_cls,
+                    unverified,
+                    author_verify_key=self.root_verify_key,
+                    expected_author=None,
                 )
 
             except DataError as exc:
                 path = _build_signature_path(*sign_chain, "<Root Key>")
                 raise TrustchainError(f"{path}: Invalid certificate: {exc}") from exc
 
-        def _verify_created_by_device(certif, certif_cls, author_id, sign_chain):
+        def _verify_created_by_device(certif, certif_cls, unverified, author_id, sign_chain):
             author_device = _recursive_verify_device(author_id, sign_chain)
             try:
-                verified = certif_cls.verify_and_load(
+                verified = self._verify_and_load(
                     certif,
+                    certif_cls,
+                    unverified,
                     author_verify_key=author_device.verify_key,
                     expected_author=author_device.device_id,
                 )
@@ -243,7 +285,15 @@ class TrustchainContext:
 
             return verified
 
+        # A device typically signs many certificates, no need to verify it each time
+        verified_devices = {}
+
         def _recursive_verify_device(device_id, signed_children=()):
+            try:
+                return verified_devices[device_id]
+            except KeyError:
+                pass
+
             if device_id in signed_children:
                 path = _build_signature_path(*signed_children, device_id)
                 raise TrustchainError(f"{path}: Invalid signature loop detected")
@@ -257,15 +307,20 @@ class TrustchainContext:
             author = state.content.author
             if author is None:
                 verified_device = _verify_created_by_root(
-                    state.certif, DeviceCertificateContent, sign_chain=(*signed_children, device_id)
+                    state.certif,
+                    DeviceCertificateContent,
+                    state.content,
+                    sign_chain=(*signed_children, device_id),
                 )
             else:
                 verified_device = _verify_created_by_device(
                     state.certif,
                     DeviceCertificateContent,
+                    state.content,
                     author,
                     sign_chain=(*signed_children, device_id),
                 )
+            verified_devices[device_id] = verified_device
             return verified_device
 
         def _verify_user(unverified_content, certif):
@@ -273,13 +328,20 @@ class TrustchainContext:
             user_id = unverified_content.user_id
             if author is None:
                 verified_user = _verify_created_by_root(
-                    certif, UserCertificateContent, sign_chain=(f"{user_id}'s creation",)
+                    certif,
+                    UserCertificateContent,
+                    unverified_content,
+                    sign_chain=(f"{user_id}'s creation",),
                 )
             elif author.user_id == user_id:
                 raise TrustchainError(f"{user_id}: Invalid self-signed user certificate")
             else:
                 verified_user = _verify_created_by_device(
-                    certif, UserCertificateContent, author, sign_chain=(f"{user_id}'s creation",)
+                    certif,
+                    UserCertificateContent,
+                    unverified_content,
+                    author,
+                    sign_chain=(f"{user_id}'s creation",),
                 )
             return verified_user
 
@@ -288,7 +350,10 @@ class TrustchainContext:
             user_id = unverified_content.user_id
             if author is None:
                 verified_revoked_user = _verify_created_by_root(
-                    certif, RevokedUserCertificateContent, sign_chain=(f"{user_id}'s revocation",)
+                    certif,
+                    RevokedUserCertificateContent,
+                    unverified_content,
+                    sign_chain=(f"{user_id}'s revocation",),
                 )
             elif author.user_id == user_id:
                 raise TrustchainError(f"{user_id}: Invalid self-signed user revocation certificate")
@@ -296,6 +361,7 @@ class TrustchainContext:
                 verified_revoked_user = _verify_created_by_device(
                     certif,
                     RevokedUserCertificateContent,
+                    unverified_content,
                     author,
                     sign_chain=(f"{user_id}'s revocation",),
                 )
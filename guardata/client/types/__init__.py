@@ -21,6 +21,7 @@ from guardata.client.types.backend_address import (
 from guardata.client.types.local_device import LocalDevice, UserInfo, DeviceInfo
 from guardata.client.types.manifest import (
     DEFAULT_BLOCK_SIZE,
+    DEFAULT_BLOCK_SEGMENT_SIZE,
     LocalFileManifest,
     LocalFolderManifest,
     LocalWorkspaceManifest,
@@ -70,6 +71,7 @@ __all__ = (
     "DeviceInfo",
     # "manifest"
     "DEFAULT_BLOCK_SIZE",
+    "DEFAULT_BLOCK_SEGMENT_SIZE",
     "LocalFileManifest",
     "LocalFolderManifest",
     "LocalWorkspaceManifest",
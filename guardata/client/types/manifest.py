@@ -38,6 +38,7 @@ __all__ = (
 
 
 DEFAULT_BLOCK_SIZE = 4096 * 1024  # 4 MB
+DEFAULT_BLOCK_SEGMENT_SIZE = 64 * 1024  # 64 KB
 
 
 # Cheap rename
@@ -158,7 +159,7 @@ class Chunk(BaseData):
 
     # Evolve
 
-    def evolve_as_block(self, data: bytes) -> "Chunk":
+    def evolve_as_block(self, data: bytes, segment_size: Optional[int] = None) -> "Chunk":
         # No-op
         if self.is_block:
             return self
@@ -174,6 +175,7 @@ class Chunk(BaseData):
             offset=self.start,
             size=self.stop - self.start,
             digest=HashDigest.from_data(data),
+            segment_size=segment_size,
         )
 
         # Evolve
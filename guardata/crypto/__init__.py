@@ -1,8 +1,10 @@
 # Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
-from typing import Tuple
+from typing import Tuple, List, Callable, Iterable, Optional
 from base64 import b32decode, b32encode
+from functools import lru_cache
+from concurrent.futures import Executor
 
 from nacl.exceptions import CryptoError, TypeError, ensure  # noqa: republishing
 from nacl.public import SealedBox, PrivateKey as _PrivateKey, PublicKey as _PublicKey
@@ -38,6 +40,42 @@ __all__ = (
 CRYPTO_OPSLIMIT = argon2id.OPSLIMIT_MODERATE
 CRYPTO_MEMLIMIT = argon2id.MEMLIMIT_MODERATE
 
+# Number of secret keys whose cipher is kept around, only long lived keys
+# (local symkey, workspaces keys...) are expected to go through it
+SECRET_BOX_CACHE_SIZE = 128
+# Batch items are dispatched to the executor in groups of about this many
+# bytes, so small items don't pay a thread switch each
+BATCH_GROUP_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=SECRET_BOX_CACHE_SIZE)
+def _get_secret_box(key: bytes) -> SecretBox:
+    return SecretBox(key)
+
+
+def _process_batch(
+    process: Callable[[bytes], bytes], items: Iterable[bytes], executor: Optional[Executor]
+) -> List[bytes]:
+    if executor is None:
+        return [process(item) for item in items]
+
+    def _process_group(group):
+        return [process(item) for item in group]
+
+    futures = []
+    group = []
+    group_size = 0
+    for item in items:
+        group.append(item)
+        group_size += len(item)
+        if group_size >= BATCH_GROUP_SIZE:
+            futures.append(executor.submit(_process_group, group))
+            group = []
+            group_size = 0
+    if group:
+        futures.append(executor.submit(_process_group, group))
+    return [result for future in futures for result in future.result()]
+
 
 # Types
 
@@ -58,29 +96,52 @@ class SecretKey(bytes):
         Raises:
             CryptoError: if key is invalid.
         """
-        box = SecretBox(self)
-        return box.encrypt(data)
+        return _get_secret_box(self).encrypt_buffer(data)
 
     def decrypt(self, ciphered: bytes) -> bytes:
         """
         Raises:
             CryptoError: if key is invalid.
         """
-        box = SecretBox(self)
-        return box.decrypt(ciphered)
+        return _get_secret_box(self).decrypt_buffer(ciphered)
+
+    def encrypt_batch(
+        self, items: Iterable[bytes], executor: Optional[Executor] = None
+    ) -> List[bytes]:
+        """
+        Encrypt each item (`bytes`, `bytearray` or `memoryview`), in the
+        threads of the given executor if any (libsodium releases the GIL).
+
+        Raises:
+            CryptoError: if key is invalid.
+        """
+        return _process_batch(_get_secret_box(self).encrypt_buffer, items, executor)
+
+    def decrypt_batch(
+        self, items: Iterable[bytes], executor: Optional[Executor] = None
+    ) -> List[bytes]:
+        """
+        Decrypt each item, see `encrypt_batch`.
+
+        Raises:
+            CryptoError: if key is invalid.
+        """
+        return _process_batch(_get_secret_box(self).decrypt_buffer, items, executor)
 
 
 class HashDigest(bytes):
     __slots__ = ()
 
     @classmethod
-    def from_data(self, data: bytes) -> "HashDigest":
+    def from_data(self, data: bytes, key: bytes = b"") -> "HashDigest":
         ensure(
             isinstance(data, bytes) or isinstance(data, bytearray),
             "data type must be bytes or bytearray",
             raising=TypeError,
         )
-        return HashDigest(blake2b(data if isinstance(data, bytes) else bytes(data)).digest())
+        return HashDigest(
+            blake2b(data if isinstance(data, bytes) else bytes(data), key=key).digest()
+        )
 
 
 # Basically just add comparison support to nacl keys
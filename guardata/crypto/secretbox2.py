@@ -8,6 +8,14 @@ import nacl.secret
 from nacl import exceptions as exc
 from nacl.utils import EncryptedMessage, random
 
+# PyNaCl is pinned, its libsodium bindings can be used to skip the copies done
+# by the high level API
+from nacl._sodium import ffi, lib
+
+
+# Output buffers are entirely written by libsodium, no need to zero them first
+_new_uninitialized = ffi.new_allocator(should_clear_after_alloc=False)
+
 
 class SecretBox(nacl.secret.SecretBox):
     """
@@ -97,3 +105,92 @@ class SecretBox(nacl.secret.SecretBox):
         )
 
         return plaintext
+
+    def encrypt_buffer(self, plaintext, aad=None):
+        """
+        Same as `encrypt` with a random nonce and the raw encoder, but the
+        plaintext can be any bytes-like object (e.g. a `memoryview` on a
+        part of a larger buffer) and the nonce and ciphertext are directly
+        written in the same output buffer, which saves several copies.
+        :param plaintext: [:class:`bytes`, :class:`bytearray` or
+            :class:`memoryview`] The plaintext message to encrypt
+        :rtype: [:class:`bytes`]
+        """
+        exc.ensure(
+            isinstance(plaintext, (bytes, bytearray, memoryview)),
+            "Plaintext type must be bytes, bytearray or memoryview",
+            raising=exc.TypeError,
+        )
+        exc.ensure(
+            aad is None or isinstance(aad, bytes),
+            "Additional data must be bytes or None",
+            raising=exc.TypeError,
+        )
+        message = ffi.from_buffer("unsigned char[]", plaintext)
+        mlen = len(message)
+        exc.ensure(
+            mlen <= self.MESSAGEBYTES_MAX,
+            f"Message must be at most {self.MESSAGEBYTES_MAX} bytes long",
+            raising=exc.ValueError,
+        )
+
+        outlen = self.NONCE_SIZE + mlen + self.MACBYTES
+        out = _new_uninitialized("unsigned char[]", outlen)
+        lib.randombytes(out, self.NONCE_SIZE)
+        res = lib.crypto_aead_xchacha20poly1305_ietf_encrypt(
+            out + self.NONCE_SIZE,
+            ffi.NULL,
+            message,
+            mlen,
+            aad or ffi.NULL,
+            len(aad) if aad else 0,
+            ffi.NULL,
+            out,
+            self._key,
+        )
+        exc.ensure(res == 0, "Encryption failed.", raising=exc.CryptoError)
+        return ffi.buffer(out, outlen)[:]
+
+    def decrypt_buffer(self, ciphertext, aad=None):
+        """
+        Same as `decrypt` with the nonce being part of the ciphertext and the
+        raw encoder, but the ciphertext can be any bytes-like object and is
+        never copied.
+        :param ciphertext: [:class:`bytes`, :class:`bytearray` or
+            :class:`memoryview`] The nonce and encrypted message to decrypt
+        :rtype: [:class:`bytes`]
+        """
+        exc.ensure(
+            isinstance(ciphertext, (bytes, bytearray, memoryview)),
+            "Ciphertext type must be bytes, bytearray or memoryview",
+            raising=exc.TypeError,
+        )
+        exc.ensure(
+            aad is None or isinstance(aad, bytes),
+            "Additional data must be bytes or None",
+            raising=exc.TypeError,
+        )
+        ciphered = ffi.from_buffer("unsigned char[]", ciphertext)
+        clen = len(ciphered) - self.NONCE_SIZE
+        exc.ensure(
+            clen >= 0,
+            f"Nonce must be a {self.NONCE_SIZE} bytes long bytes sequence",
+            raising=exc.TypeError,
+        )
+        exc.ensure(clen >= self.MACBYTES, "Decryption failed.", raising=exc.CryptoError)
+
+        mlen = clen - self.MACBYTES
+        out = _new_uninitialized("unsigned char[]", mlen)
+        res = lib.crypto_aead_xchacha20poly1305_ietf_decrypt(
+            out,
+            ffi.NULL,
+            ffi.NULL,
+            ciphered + self.NONCE_SIZE,
+            clen,
+            aad or ffi.NULL,
+            len(aad) if aad else 0,
+            ciphered,
+            self._key,
+        )
+        exc.ensure(res == 0, "Decryption failed.", raising=exc.CryptoError)
+        return ffi.buffer(out, mlen)[:]
@@ -0,0 +1,450 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Generated (de)serialization code for the marshmallow schemas.
+
+Marshmallow walks the fields of a schema through several layers of generic
+code (unmarshaller, error accumulation, per-field getters...) which dominates
+the CPU time when loading large manifests. For each schema, a dedicated
+function is generated instead, inlining the steps marshmallow would perform
+for each of its fields (missing values, `allow_none`, validators, nested
+schemas, lists and maps).
+
+Generated functions only cover the success path: as soon as something is
+invalid they raise, and the caller is expected to run the marshmallow path
+again to get the actual result or error. Schemas relying on a construct not
+handled here (`load_from`, schema validators, `many` nested fields...) are
+not compiled at all.
+"""
+
+import re
+from weakref import WeakKeyDictionary
+from collections.abc import Mapping
+from marshmallow import Schema, missing
+from marshmallow.fields import Field, Number, Integer, Nested, List
+from marshmallow.validate import Validator
+from marshmallow.utils import is_collection, _get_value_for_key
+from marshmallow.decorators import (
+    PRE_DUMP,
+    POST_DUMP,
+    PRE_LOAD,
+    POST_LOAD,
+    VALIDATES,
+    VALIDATES_SCHEMA,
+)
+
+from guardata.types import FrozenDict
+from guardata.serde.schema import OneOfSchema
+from guardata.serde.fields import Map, FrozenMap, FrozenList, FrozenSet
+
+
+__all__ = ("compile_loader", "compile_dumper")
+
+
+class FastPathError(Exception):
+    """Raised by the generated code when the data must go through marshmallow"""
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+_LIST_WRAPPERS = {List: "", FrozenList: "tuple", FrozenSet: "frozenset"}
+_MAP_WRAPPERS = {Map: "", FrozenMap: "FrozenDict"}
+
+
+def _is_sequence(value):
+    return type(value) in (list, tuple) or is_collection(value)
+
+
+def _no_getitem(obj):
+    return not hasattr(type(obj), "__getitem__")
+
+
+class _CodeBuilder:
+    def __init__(self, prefix, schema):
+        self.name = re.sub(r"\W+", "_", f"{prefix}_{type(schema).__qualname__}")
+        self.lines = []
+        self.namespace = {
+            "missing": missing,
+            "FastPathError": FastPathError,
+            "Mapping": Mapping,
+            "FrozenDict": FrozenDict,
+            "is_sequence": _is_sequence,
+            "no_getitem": _no_getitem,
+            "get_value_for_key": _get_value_for_key,
+        }
+        self._counter = 0
+
+    def var(self, prefix="v"):
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def bind(self, obj, prefix="ref"):
+        name = self.var(prefix)
+        self.namespace[name] = obj
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def build(self, args):
+        source = "\n".join([f"def {self.name}({args}):", *self.lines])
+        exec(compile(source, f"<compiled {self.name}>", "exec"), self.namespace)
+        return self.namespace[self.name]
+
+
+def _get_processors(schema, tag):
+    if schema.__processors__[(tag, True)]:
+        raise UnsupportedSchema(f"pass_many {tag} processor")
+    processors = []
+    for attr_name in schema.__processors__[(tag, False)]:
+        processor = getattr(schema, attr_name)
+        if processor.__marshmallow_kwargs__[(tag, False)].get("pass_original", False):
+            raise UnsupportedSchema(f"pass_original {tag} processor")
+        processors.append(processor)
+    return processors
+
+
+def _emit_processors(builder, processors, var, indent):
+    for processor in processors:
+        ref = builder.bind(processor, "processor")
+        res = builder.var("res")
+        builder.emit(indent, f"{res} = {ref}({var})")
+        builder.emit(indent, f"if {res} is not None:")
+        builder.emit(indent + 1, f"{var} = {res}")
+
+
+def _check_plain_schema(schema):
+    cls = type(schema)
+    if (
+        cls.load is not Schema.load
+        or cls.dump is not Schema.dump
+        or cls._do_load is not Schema._do_load
+        or cls.get_attribute is not Schema.get_attribute
+    ):
+        raise UnsupportedSchema("overloaded schema methods")
+    if schema.many or schema.partial or schema.ordered or schema.prefix:
+        raise UnsupportedSchema("unsupported schema options")
+    if schema.opts.fields or schema.opts.additional:
+        raise UnsupportedSchema("implicit fields")
+    for key in ((VALIDATES, False), (VALIDATES_SCHEMA, True), (VALIDATES_SCHEMA, False)):
+        if schema.__processors__[key]:
+            raise UnsupportedSchema("validators")
+
+
+def _is_oneof_schema(schema):
+    cls = type(schema)
+    return (
+        isinstance(schema, OneOfSchema)
+        and cls.load is OneOfSchema.load
+        and cls._load is OneOfSchema._load
+        and cls.dump is OneOfSchema.dump
+        and cls._dump is OneOfSchema._dump
+        and not schema.many
+        and not schema.partial
+    )
+
+
+def _schema_fields(schema, jitted_method_name):
+    # Toastedmarshmallow's jitted methods process the fields by name order,
+    # keep the same order in the generated dicts
+    jit = schema._jit_instance
+    if jit is not None and getattr(jit, jitted_method_name) is not None:
+        return sorted(schema.fields.items())
+    return schema.fields.items()
+
+
+def _plain_nested_schema(field):
+    if type(field) is not Nested or field.many or isinstance(field.only, str):
+        return None
+    if isinstance(field.nested, str):
+        # Recursive or registry-based nesting
+        return None
+    return field.schema
+
+
+# Loading
+
+
+def _emit_deserialize(builder, field, src, dst, attr, data, indent):
+    """Emit the code doing `dst = field.deserialize(src, attr, data)` for a present value"""
+    cls = type(field)
+    if cls.deserialize is not Field.deserialize:
+        raise UnsupportedSchema(f"overloaded deserialize in {cls}")
+    if cls._validate_missing not in (Field._validate_missing, Nested._validate_missing):
+        raise UnsupportedSchema(f"overloaded _validate_missing in {cls}")
+    if cls._validate is not Field._validate:
+        raise UnsupportedSchema(f"overloaded _validate in {cls}")
+
+    if field.allow_none is True:
+        builder.emit(indent, f"if {src} is None:")
+        builder.emit(indent + 1, f"{dst} = None")
+        builder.emit(indent, "else:")
+        indent += 1
+    else:
+        builder.emit(indent, f"if {src} is None:")
+        builder.emit(indent + 1, "raise FastPathError()")
+
+    nested_schema = _plain_nested_schema(field)
+    nested_loader = compile_loader(nested_schema) if nested_schema is not None else None
+    if nested_loader is not None:
+        ref = builder.bind(nested_loader, "loader")
+        builder.emit(indent, f"{dst} = {ref}({src})")
+
+    elif cls in _LIST_WRAPPERS:
+        acc, item, value = builder.var("acc"), builder.var("item"), builder.var()
+        builder.emit(indent, f"if not is_sequence({src}):")
+        builder.emit(indent + 1, "raise FastPathError()")
+        builder.emit(indent, f"{acc} = []")
+        builder.emit(indent, f"for {item} in {src}:")
+        _emit_deserialize(builder, field.container, item, value, "None", "None", indent + 1)
+        builder.emit(indent + 1, f"{acc}.append({value})")
+        builder.emit(indent, f"{dst} = {_LIST_WRAPPERS[cls]}({acc})")
+
+    elif cls in _MAP_WRAPPERS:
+        acc, key, item = builder.var("acc"), builder.var("key"), builder.var("item")
+        loaded_key, loaded_item = builder.var(), builder.var()
+        builder.emit(indent, f"if not isinstance({src}, Mapping):")
+        builder.emit(indent + 1, "raise FastPathError()")
+        builder.emit(indent, f"{acc} = {{}}")
+        builder.emit(indent, f"for {key}, {item} in {src}.items():")
+        _emit_deserialize(builder, field.key_field, key, loaded_key, "None", "None", indent + 1)
+        _emit_deserialize(
+            builder, field.nested_field, item, loaded_item, "None", "None", indent + 1
+        )
+        builder.emit(indent + 1, f"{acc}[{loaded_key}] = {loaded_item}")
+        builder.emit(indent, f"{dst} = {_MAP_WRAPPERS[cls]}({acc})")
+
+    else:
+        ref = builder.bind(field._deserialize, "deserialize")
+        if cls is Integer:
+            # `int(value)` is a no-op for integers
+            builder.emit(
+                indent, f"{dst} = {src} if type({src}) is int else {ref}({src}, {attr}, {data})"
+            )
+        else:
+            builder.emit(indent, f"{dst} = {ref}({src}, {attr}, {data})")
+
+    for validator in field.validators:
+        ref = builder.bind(validator, "validator")
+        if isinstance(validator, Validator):
+            builder.emit(indent, f"{ref}({dst})")
+        else:
+            builder.emit(indent, f"if {ref}({dst}) is False:")
+            builder.emit(indent + 1, "raise FastPathError()")
+
+
+def _build_schema_loader(schema):
+    _check_plain_schema(schema)
+    builder = _CodeBuilder("load", schema)
+    _emit_processors(builder, _get_processors(schema, PRE_LOAD), "data", 1)
+    builder.emit(1, "if type(data) is not dict:")
+    builder.emit(2, "raise FastPathError()")
+    builder.emit(1, "ret = {}")
+    for name, field in _schema_fields(schema, "jitted_unmarshal_method"):
+        if field.dump_only:
+            continue
+        if field.load_from:
+            raise UnsupportedSchema("load_from")
+        key = field.attribute or name
+        if "." in key:
+            raise UnsupportedSchema("dotted attribute")
+        value = builder.var()
+        builder.emit(1, f"{value} = data.get({name!r}, missing)")
+        indent = 1
+        if field.missing is not missing:
+            ref = builder.bind(field.missing, "default")
+            builder.emit(1, f"if {value} is missing:")
+            if callable(field.missing):
+                builder.emit(2, f"{value} = {ref}()")
+                builder.emit(2, f"if {value} is missing:")
+                builder.emit(3, "raise FastPathError()")
+            else:
+                builder.emit(2, f"{value} = {ref}")
+        elif field.required:
+            builder.emit(1, f"if {value} is missing:")
+            builder.emit(2, "raise FastPathError()")
+        else:
+            builder.emit(1, f"if {value} is not missing:")
+            indent = 2
+        _emit_deserialize(builder, field, value, value, repr(name), "data", indent)
+        builder.emit(indent, f"ret[{key!r}] = {value}")
+    _emit_processors(builder, _get_processors(schema, POST_LOAD), "ret", 1)
+    builder.emit(1, "return ret")
+    return builder.build("data")
+
+
+def _build_oneof_loader(schema):
+    loaders = {}
+
+    def load_oneof(data):
+        if not isinstance(data, dict):
+            raise FastPathError()
+        data = dict(data)
+        data_type = data.get(schema.type_field)
+        try:
+            loader = loaders[data_type]
+        except KeyError:
+            sub_schema = schema._get_schema(data_type)
+            loader = compile_loader(sub_schema) if sub_schema else None
+            loaders[data_type] = loader
+        if loader is None:
+            raise FastPathError()
+        return loader(data)
+
+    return load_oneof
+
+
+# Dumping
+
+
+def _emit_serialize(builder, field, src, dst, attr, obj, indent):
+    """Emit the code doing `dst = field._serialize(src, attr, obj)`"""
+    cls = type(field)
+    nested_schema = _plain_nested_schema(field)
+    nested_dumper = compile_dumper(nested_schema) if nested_schema is not None else None
+    if nested_dumper is not None:
+        ref = builder.bind(nested_dumper, "dumper")
+        builder.emit(indent, f"{dst} = None if {src} is None else {ref}({src})")
+
+    elif cls in _LIST_WRAPPERS:
+        acc, item, value = builder.var("acc"), builder.var("item"), builder.var()
+        builder.emit(indent, f"if {src} is None:")
+        builder.emit(indent + 1, f"{dst} = None")
+        builder.emit(indent, "else:")
+        builder.emit(indent + 1, f"{acc} = []")
+        builder.emit(indent + 1, f"for {item} in ({src} if is_sequence({src}) else [{src}]):")
+        _emit_serialize(builder, field.container, item, value, attr, obj, indent + 2)
+        builder.emit(indent + 2, f"{acc}.append({value})")
+        builder.emit(indent + 1, f"{dst} = {acc}")
+
+    elif cls in _MAP_WRAPPERS:
+        acc, key, item = builder.var("acc"), builder.var("key"), builder.var("item")
+        dumped_key, dumped_item = builder.var(), builder.var()
+        builder.emit(indent, f"if {src} is None:")
+        builder.emit(indent + 1, f"{dst} = None")
+        builder.emit(indent, "else:")
+        builder.emit(indent + 1, f"{acc} = {{}}")
+        builder.emit(indent + 1, f"for {key}, {item} in {src}.items():")
+        _emit_serialize(builder, field.key_field, key, dumped_key, attr, obj, indent + 2)
+        _emit_serialize(builder, field.nested_field, item, dumped_item, key, src, indent + 2)
+        builder.emit(indent + 2, f"{acc}[{dumped_key}] = {dumped_item}")
+        builder.emit(indent + 1, f"{dst} = {acc}")
+
+    else:
+        ref = builder.bind(field._serialize, "serialize")
+        if cls is Integer:
+            builder.emit(
+                indent, f"{dst} = {src} if type({src}) is int else {ref}({src}, {attr}, {obj})"
+            )
+        else:
+            builder.emit(indent, f"{dst} = {ref}({src}, {attr}, {obj})")
+
+
+def _build_schema_dumper(schema):
+    _check_plain_schema(schema)
+    builder = _CodeBuilder("dump", schema)
+    _emit_processors(builder, _get_processors(schema, PRE_DUMP), "obj", 1)
+    # Same lookup as `marshmallow.utils.get_value`, but objects without item
+    # access (e.g. attr classes) go straight to `getattr`
+    builder.emit(1, "get = getattr if no_getitem(obj) else get_value_for_key")
+    builder.emit(1, "ret = {}")
+    for name, field in _schema_fields(schema, "jitted_marshal_method"):
+        if field.load_only:
+            continue
+        cls = type(field)
+        if cls.serialize is Number.serialize:
+            if field.as_string:
+                raise UnsupportedSchema("as_string number")
+        elif cls.serialize is not Field.serialize:
+            raise UnsupportedSchema(f"overloaded serialize in {cls}")
+        if not field._CHECK_ATTRIBUTE or cls.get_value not in (Field.get_value, List.get_value):
+            raise UnsupportedSchema(f"overloaded get_value in {cls}")
+        if cls.get_value is List.get_value and field.container.attribute:
+            raise UnsupportedSchema("list container with attribute")
+        attribute = field.attribute or name
+        if "." in attribute:
+            raise UnsupportedSchema("dotted attribute")
+        key = field.dump_to or name
+        value = builder.var()
+        builder.emit(1, f"{value} = get(obj, {attribute!r}, missing)")
+        if field.default is missing:
+            builder.emit(1, f"if {value} is not missing:")
+        else:
+            ref = builder.bind(field.default, "default")
+            default = f"{ref}()" if callable(field.default) else ref
+            builder.emit(1, f"if {value} is missing:")
+            builder.emit(2, f"ret[{key!r}] = {default}")
+            builder.emit(1, "else:")
+        _emit_serialize(builder, field, value, value, repr(name), "obj", 2)
+        builder.emit(2, f"ret[{key!r}] = {value}")
+    _emit_processors(builder, _get_processors(schema, POST_DUMP), "ret", 1)
+    builder.emit(1, "return ret")
+    return builder.build("obj")
+
+
+def _build_oneof_dumper(schema):
+    dumpers = {}
+
+    def dump_oneof(obj):
+        obj_type = schema.get_obj_type(obj)
+        if not obj_type:
+            raise FastPathError()
+        try:
+            dumper = dumpers[obj_type]
+        except KeyError:
+            sub_schema = schema._get_schema(obj_type)
+            dumper = compile_dumper(sub_schema) if sub_schema else None
+            dumpers[obj_type] = dumper
+        if dumper is None:
+            raise FastPathError()
+        return dumper(obj)
+
+    return dump_oneof
+
+
+_loaders = WeakKeyDictionary()
+_dumpers = WeakKeyDictionary()
+
+
+def _compile(cache, schema, build_oneof, build_schema):
+    try:
+        return cache[schema]
+    except KeyError:
+        pass
+    try:
+        if isinstance(schema, OneOfSchema):
+            if not _is_oneof_schema(schema):
+                raise UnsupportedSchema("overloaded OneOfSchema methods")
+            compiled = build_oneof(schema)
+        else:
+            compiled = build_schema(schema)
+    except UnsupportedSchema:
+        compiled = None
+    cache[schema] = compiled
+    return compiled
+
+
+def compile_loader(schema):
+    """
+    Return a function equivalent to `schema.load(data).data` for valid data,
+    or None if the schema cannot be compiled.
+
+    Raises:
+        Any exception when the data is not valid, the marshmallow path must
+        then be used to get the actual error.
+    """
+    return _compile(_loaders, schema, _build_oneof_loader, _build_schema_loader)
+
+
+def compile_dumper(schema):
+    """
+    Return a function equivalent to `schema.dump(obj).data` for valid objects,
+    or None if the schema cannot be compiled.
+
+    Raises:
+        Any exception when the object is not valid, the marshmallow path must
+        then be used to get the actual error.
+    """
+    return _compile(_dumpers, schema, _build_oneof_dumper, _build_schema_dumper)
@@ -0,0 +1,94 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Compression codecs used by `ZipMsgpackSerializer`.
+
+Payloads compressed with zlib are kept as a bare zlib stream, so they remain
+readable by older versions. Payloads using any other codec start with a header
+made of a format version byte followed by the codec id. The version byte is
+chosen so it cannot be mistaken for the first byte of a zlib stream (whose low
+nibble is always 8, the deflate method).
+"""
+
+import zlib
+from typing import Callable, Dict, Optional
+
+import attr
+
+
+CODEC_HEADER_VERSION = 1
+_ZLIB_DEFLATE_METHOD = 8
+
+
+class CodecError(Exception):
+    pass
+
+
+@attr.s(slots=True, frozen=True, auto_attribs=True)
+class Codec:
+    id: int
+    name: str
+    # Called with the data and the compression level (None for the default one)
+    compress: Callable[[bytes, Optional[int]], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: Dict[int, Codec] = {}
+
+
+def register_codec(
+    codec_id: int,
+    name: str,
+    compress: Callable[[bytes, Optional[int]], bytes],
+    decompress: Callable[[bytes], bytes],
+) -> Codec:
+    if not 0 <= codec_id <= 255:
+        raise ValueError("Codec id must fit in a byte")
+    if codec_id in CODECS:
+        raise ValueError(f"Codec id {codec_id} already used by `{CODECS[codec_id].name}`")
+    codec = Codec(id=codec_id, name=name, compress=compress, decompress=decompress)
+    CODECS[codec_id] = codec
+    return codec
+
+
+def _zlib_compress(data: bytes, level: Optional[int]) -> bytes:
+    return zlib.compress(data, zlib.Z_DEFAULT_COMPRESSION if level is None else level)
+
+
+NONE_CODEC = register_codec(0, "none", lambda data, level: bytes(data), bytes)
+ZLIB_CODEC = register_codec(1, "zlib", _zlib_compress, zlib.decompress)
+
+
+def compress(data: bytes, codec: Codec, level: Optional[int] = None) -> bytes:
+    if codec is ZLIB_CODEC:
+        # The zlib stream header is enough to recognize it
+        return _zlib_compress(data, level)
+    return bytes((CODEC_HEADER_VERSION, codec.id)) + codec.compress(data, level)
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Raises:
+        CodecError
+    """
+    if not data:
+        raise CodecError("Empty payload")
+
+    if data[0] & 0x0F == _ZLIB_DEFLATE_METHOD:
+        codec = ZLIB_CODEC
+        payload = data
+    elif data[0] == CODEC_HEADER_VERSION:
+        if len(data) < 2:
+            raise CodecError("Truncated codec header")
+        try:
+            codec = CODECS[data[1]]
+        except KeyError:
+            raise CodecError(f"Unknown codec id {data[1]}")
+        payload = memoryview(data)[2:]
+    else:
+        raise CodecError(f"Unknown codec header version {data[0]}")
+
+    try:
+        return codec.decompress(payload)
+    except Exception as exc:
+        raise CodecError(f"Invalid `{codec.name}` payload: {exc}") from exc
@@ -145,7 +145,8 @@ def uuid_based_field_factory(value_type):
 
     def _deserialize(self, value, attr, data):
         try:
-            return value_type(str(value))
+            # UUIDs are already handled by pack/unpack, no need to parse them again
+            return value_type(value if isinstance(value, _UUID) else str(value))
         except ValueError as exc:
             raise ValidationError(str(exc)) from exc
 
@@ -1,12 +1,20 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
-import zlib
 import json
+from typing import Optional, Tuple
 
 from marshmallow import ValidationError
 
 from guardata.serde.packing import packb, unpackb, SerdePackingError
 from guardata.serde.exceptions import SerdeValidationError
+from guardata.serde.compiled import compile_loader, compile_dumper
+from guardata.serde.compression import (
+    Codec,
+    CodecError,
+    ZLIB_CODEC,
+    compress,
+    decompress,
+)
 
 
 class BaseSerializer:
@@ -24,12 +32,23 @@ class BaseSerializer:
         self.validation_exc = validation_exc
         self.packing_exc = packing_exc
         self.schema = schema_cls(strict=True)
+        # Generated on first use, see `guardata.serde.compiled`
+        self._compiled_load = self._compiled_dump = NotImplemented
 
     def load(self, data: dict):
         """
         Raises:
             SerdeValidationError
         """
+        if self._compiled_load is NotImplemented:
+            self._compiled_load = compile_loader(self.schema)
+        if self._compiled_load is not None:
+            try:
+                return self._compiled_load(data)
+            except Exception:
+                # Invalid data, let marshmallow provide the error
+                pass
+
         try:
             return self.schema.load(data).data
 
@@ -41,6 +60,15 @@ class BaseSerializer:
         Raises:
             SerdeValidationError
         """
+        if self._compiled_dump is NotImplemented:
+            self._compiled_dump = compile_dumper(self.schema)
+        if self._compiled_dump is not None:
+            try:
+                return self._compiled_dump(data)
+            except Exception:
+                # Invalid data, let marshmallow provide the error
+                pass
+
         try:
             return self.schema.dump(data).data
 
@@ -95,6 +123,21 @@ class MsgpackSerializer(BaseSerializer):
 
 
 class ZipMsgpackSerializer(MsgpackSerializer):
+    # Large payloads (typically manifests with many blocks or children) mostly
+    # contain random ids and keys, the default level costs up to twice the CPU
+    # time of the fastest one for a 1% smaller output
+    FAST_COMPRESSION_THRESHOLD = 16 * 1024
+    FAST_COMPRESSION_LEVEL = 1
+
+    def select_codec(self, raw: bytes) -> Tuple[Codec, Optional[int]]:
+        # Payloads are read by every client of the organization, so they are
+        # written as bare zlib streams until all of them understand the codec
+        # header (only the compression level can be tuned meanwhile)
+        if len(raw) >= self.FAST_COMPRESSION_THRESHOLD:
+            return ZLIB_CODEC, self.FAST_COMPRESSION_LEVEL
+        else:
+            return ZLIB_CODEC, None
+
     def loads(self, data: bytes) -> dict:
         """
         Raises:
@@ -102,15 +145,19 @@ class ZipMsgpackSerializer(MsgpackSerializer):
             SerdePackingError
         """
         try:
-            unzipped = zlib.decompress(data)
-        except zlib.error as exc:
+            unzipped = decompress(data)
+        except CodecError as exc:
             raise self.packing_exc(str(exc)) from exc
         return super().loads(unzipped)
 
+    def zip(self, raw: bytes) -> bytes:
+        codec, level = self.select_codec(raw)
+        return compress(raw, codec, level)
+
     def dumps(self, data: dict) -> bytes:
         """
         Raises:
             SerdeValidationError
             SerdePackingError
         """
-        return zlib.compress(super().dumps(data))
+        return self.zip(super().dumps(data))
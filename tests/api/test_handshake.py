@@ -56,6 +56,30 @@ def test_good_authenticated_handshake(alice):
     assert sh.client_api_version == API_V2_VERSION
 
 
+@pytest.mark.parametrize("client_multiplexing", (True, False))
+@pytest.mark.parametrize("backend_multiplexing", (True, False))
+def test_multiplexing_negotiation(alice, monkeypatch, client_multiplexing, backend_multiplexing):
+    monkeypatch.setattr(ServerHandshake, "SUPPORT_MULTIPLEXING", backend_multiplexing)
+    sh = ServerHandshake()
+    ch = AuthenticatedClientHandshake(
+        alice.organization_id,
+        alice.device_id,
+        alice.signing_key,
+        alice.root_verify_key,
+        multiplexing=client_multiplexing,
+    )
+
+    challenge_req = sh.build_challenge_req()
+    answer_req = ch.process_challenge_req(challenge_req)
+    sh.process_answer_req(answer_req)
+    result_req = sh.build_result_req(alice.verify_key)
+    ch.process_result_req(result_req)
+
+    expected = client_multiplexing and backend_multiplexing
+    assert ch.multiplexing is expected
+    assert sh.multiplexing is expected
+
+
 @pytest.mark.parametrize("invitation_type", (InvitationType.USER, InvitationType.DEVICE))
 def test_good_invited_handshake(coolorg, invitation_type):
     organization_id = OrganizationID("Org")
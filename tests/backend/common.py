@@ -18,6 +18,7 @@ from guardata.api.protocol import (
     realm_finish_reencryption_maintenance_serializer,
     vlob_create_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_update_serializer,
     vlob_list_versions_serializer,
     vlob_poll_changes_serializer,
@@ -25,6 +26,7 @@ from guardata.api.protocol import (
     vlob_maintenance_save_reencryption_batch_serializer,
     events_subscribe_serializer,
     events_listen_serializer,
+    events_listen_batch_serializer,
     user_get_serializer,
     human_find_serializer,
     user_create_serializer,
@@ -129,7 +131,13 @@ block_create = CmdSock(
     check_rep_by_default=True,
 )
 block_read = CmdSock(
-    "block_read", block_read_serializer, parse_args=lambda self, block_id: {"block_id": block_id}
+    "block_read",
+    block_read_serializer,
+    parse_args=lambda self, block_id, offset=0, size=None: {
+        "block_id": block_id,
+        "offset": offset,
+        "size": size,
+    },
 )
 
 
@@ -210,6 +218,17 @@ vlob_read = CmdSock(
         "encryption_revision": encryption_revision,
     },
 )
+vlob_read_batch = CmdSock(
+    "vlob_read_batch",
+    vlob_read_batch_serializer,
+    parse_args=lambda self, items, encryption_revision=1: {
+        "items": [
+            {"vlob_id": vlob_id, "version": version, "timestamp": timestamp}
+            for vlob_id, version, timestamp in items
+        ],
+        "encryption_revision": encryption_revision,
+    },
+)
 vlob_update = CmdSock(
     "vlob_update",
     vlob_update_serializer,
@@ -269,6 +288,13 @@ _events_listen = CmdSock(
 )
 
 
+events_listen_batch = CmdSock(
+    "events_listen_batch",
+    events_listen_batch_serializer,
+    parse_args=lambda self, wait=False: {"wait": wait},
+)
+
+
 async def events_listen_nowait(sock):
     return await _events_listen(sock, wait=False)
 
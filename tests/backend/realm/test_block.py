@@ -130,6 +130,20 @@ async def test_block_create_and_read(alice_backend_sock, realm):
     assert rep == {"status": "not_found"}
 
 
+@pytest.mark.trio
+async def test_block_read_range(alice_backend_sock, realm):
+    await block_create(alice_backend_sock, BLOCK_ID, realm, BLOCK_DATA)
+
+    rep = await block_read(alice_backend_sock, BLOCK_ID, offset=2, size=4)
+    assert rep == {"status": "ok", "block": BLOCK_DATA[2:6]}
+    rep = await block_read(alice_backend_sock, BLOCK_ID, offset=2)
+    assert rep == {"status": "ok", "block": BLOCK_DATA[2:]}
+    rep = await block_read(alice_backend_sock, BLOCK_ID, offset=5, size=100)
+    assert rep == {"status": "ok", "block": BLOCK_DATA[5:]}
+    rep = await block_read(alice_backend_sock, BLOCK_ID, offset=100, size=4)
+    assert rep == {"status": "ok", "block": b""}
+
+
 @pytest.mark.trio
 @pytest.mark.raid1_blockstore
 async def test_raid1_block_create_and_read(alice_backend_sock, realm):
@@ -176,6 +190,12 @@ async def test_raid0_block_create_and_read(alice_backend_sock, realm):
     await test_block_create_and_read(alice_backend_sock, realm)
 
 
+@pytest.mark.trio
+@pytest.mark.raid5_blockstore
+async def test_raid5_block_read_range(alice_backend_sock, realm):
+    await test_block_read_range(alice_backend_sock, realm)
+
+
 @pytest.mark.trio
 @pytest.mark.raid5_blockstore
 async def test_raid5_block_create_and_read(alice_backend_sock, realm):
@@ -349,6 +369,8 @@ async def test_block_read_not_found(alice_backend_sock):
         {"id": 42},
         {"id": None},
         {},
+        {"block_id": str(BLOCK_ID), "offset": -1},
+        {"block_id": str(BLOCK_ID), "size": -1},
     ],
 )
 @pytest.mark.trio
@@ -15,7 +15,13 @@ from guardata.api.protocol import (
 from backendService.realm import RealmGrantedRole
 
 from tests.common import freeze_time
-from tests.backend.common import vlob_create, vlob_update, vlob_read, vlob_list_versions
+from tests.backend.common import (
+    vlob_create,
+    vlob_update,
+    vlob_read,
+    vlob_read_batch,
+    vlob_list_versions,
+)
 
 
 VLOB_ID = UUID("00000000000000000000000000000001")
@@ -288,6 +294,63 @@ async def test_read_bad_version(alice_backend_sock, vlobs):
     assert rep == {"status": "bad_version"}
 
 
+@pytest.mark.trio
+async def test_read_batch(alice, alice_backend_sock, vlobs):
+    rep = await vlob_read_batch(
+        alice_backend_sock,
+        [
+            (vlobs[0], None, None),
+            (vlobs[0], 1, None),
+            (vlobs[1], None, datetime(2000, 1, 4)),
+            (vlobs[0], None, datetime(2000, 1, 1)),
+            (vlobs[1], 2, None),
+            (VLOB_ID, None, None),
+        ],
+    )
+    assert rep["status"] == "ok"
+    ok = {"status": "ok", "author": alice.device_id}
+    no_data = {"version": None, "blob": None, "author": None, "timestamp": None}
+    assert rep["items"] == [
+        {
+            **ok,
+            "vlob_id": vlobs[0],
+            "blob": b"r:A b:1 v:2",
+            "version": 2,
+            "timestamp": datetime(2000, 1, 3),
+        },
+        {
+            **ok,
+            "vlob_id": vlobs[0],
+            "blob": b"r:A b:1 v:1",
+            "version": 1,
+            "timestamp": datetime(2000, 1, 2),
+        },
+        {
+            **ok,
+            "vlob_id": vlobs[1],
+            "blob": b"r:A b:2 v:1",
+            "version": 1,
+            "timestamp": datetime(2000, 1, 4),
+        },
+        {"status": "bad_version", "vlob_id": vlobs[0], **no_data},
+        {"status": "bad_version", "vlob_id": vlobs[1], **no_data},
+        {"status": "not_found", "vlob_id": VLOB_ID, **no_data},
+    ]
+
+
+@pytest.mark.trio
+async def test_read_batch_check_access_rights(bob_backend_sock, vlobs):
+    rep = await vlob_read_batch(bob_backend_sock, [(vlob_id, None, None) for vlob_id in vlobs])
+    assert rep["status"] == "ok"
+    assert [item["status"] for item in rep["items"]] == ["not_allowed", "not_allowed"]
+
+
+@pytest.mark.trio
+async def test_read_batch_too_many_items(alice_backend_sock, vlobs):
+    rep = await vlob_read_batch(alice_backend_sock, [(vlobs[0], None, None)] * 1001)
+    assert rep["status"] == "bad_message"
+
+
 @pytest.mark.trio
 async def test_update_ok(alice_backend_sock, vlobs):
     await vlob_update(alice_backend_sock, vlobs[0], version=3, blob=b"Next version.")
@@ -8,7 +8,7 @@ from guardata.api.protocol import RealmRole, APIEvent
 from backendService.realm import RealmGrantedRole
 from backendService.backend_events import BackendEvent
 
-from tests.backend.common import events_subscribe, events_listen_nowait
+from tests.backend.common import events_subscribe, events_listen_nowait, events_listen_batch
 
 
 NOW = datetime(2000, 1, 1)
@@ -317,3 +317,67 @@ async def test_vlobs_updated_event_realm_created_after_subscribe(
 
     rep = await events_listen_nowait(alice_backend_sock)
     assert rep == {"status": "no_events"}
+
+
+@pytest.mark.trio
+async def test_vlobs_updated_events_batch(backend, alice_backend_sock, alice, alice2, realm):
+    await events_subscribe(alice_backend_sock)
+
+    with backend.event_bus.listen() as spy:
+        await backend.vlob.create(
+            organization_id=alice.organization_id,
+            author=alice2.device_id,
+            realm_id=realm,
+            encryption_revision=1,
+            vlob_id=VLOB_ID,
+            timestamp=NOW,
+            blob=b"v1",
+        )
+        await backend.vlob.create(
+            organization_id=alice.organization_id,
+            author=alice2.device_id,
+            realm_id=realm,
+            encryption_revision=1,
+            vlob_id=OTHER_VLOB_ID,
+            timestamp=NOW,
+            blob=b"v1",
+        )
+        for version in (2, 3):
+            await backend.vlob.update(
+                organization_id=alice.organization_id,
+                author=alice2.device_id,
+                encryption_revision=1,
+                vlob_id=VLOB_ID,
+                version=version,
+                timestamp=NOW,
+                blob=b"v%d" % version,
+            )
+
+        await spy.wait_multiple_with_timeout([BackendEvent.REALM_VLOBS_UPDATED] * 4)
+
+    # All the pending events are returned at once, only the last update of
+    # each vlob is kept
+    rep = await events_listen_batch(alice_backend_sock)
+    assert rep == {
+        "status": "ok",
+        "events": [
+            {
+                "event": APIEvent.REALM_VLOBS_UPDATED,
+                "realm_id": realm,
+                "checkpoint": 2,
+                "src_id": OTHER_VLOB_ID,
+                "src_version": 1,
+            },
+            {
+                "event": APIEvent.REALM_VLOBS_UPDATED,
+                "realm_id": realm,
+                "checkpoint": 4,
+                "src_id": VLOB_ID,
+                "src_version": 3,
+            },
+        ],
+        "overflow": False,
+    }
+
+    rep = await events_listen_batch(alice_backend_sock)
+    assert rep == {"status": "ok", "events": [], "overflow": False}
@@ -140,3 +140,43 @@ async def test_handle_client_coroutine_destroyed_on_client_left(
 #     await alice_backend_sock.stream.send_all(b"\x00\x00\x00\x04fooo")
 #     rep = await alice_backend_sock.recv()
 #     assert unpackb(rep) == {"status": "invalid_msg_format", "reason": "Invalid message format"}
+
+
+@pytest.mark.trio
+async def test_multiplexed_requests(backend, backend_raw_transport_factory, alice):
+    async with backend_raw_transport_factory(backend) as transport:
+        ch = AuthenticatedClientHandshake(
+            alice.organization_id,
+            alice.device_id,
+            alice.signing_key,
+            alice.root_verify_key,
+            multiplexing=True,
+        )
+        challenge_req = await transport.recv()
+        answer_req = ch.process_challenge_req(challenge_req)
+        await transport.send(answer_req)
+        result_req = await transport.recv()
+        ch.process_result_req(result_req)
+        assert ch.multiplexing
+
+        await transport.send(packb({"cmd": "events_subscribe", "req_id": 1}))
+        rep = await transport.recv()
+        assert unpackb(rep) == {"status": "ok", "req_id": 1}
+
+        # A long running request doesn't prevent the next ones to be answered
+        await transport.send(packb({"cmd": "events_listen", "wait": True, "req_id": 2}))
+        await transport.send(packb({"cmd": "ping", "ping": "42", "req_id": 3}))
+        rep = await transport.recv()
+        assert unpackb(rep) == {"status": "ok", "pong": "42", "req_id": 3}
+
+        await backend.ping.ping(alice.organization_id, "bob@dev1", "foo")
+        rep = await transport.recv()
+        assert unpackb(rep) == {"status": "ok", "event": "pinged", "ping": "foo", "req_id": 2}
+
+        # Requests must be tagged in multiplexed mode
+        await transport.send(packb({"cmd": "ping", "ping": "42"}))
+        rep = await transport.recv()
+        assert unpackb(rep) == {
+            "status": "bad_message",
+            "reason": "Missing or invalid `req_id` field",
+        }
@@ -12,6 +12,7 @@ from tests.backend.common import (
     events_listen,
     events_listen_wait,
     events_listen_nowait,
+    events_listen_batch,
     ping,
 )
 
@@ -132,4 +133,55 @@ async def test_cross_backend_event(backend_factory, backend_sock_factory, alice,
             assert rep == {"status": "no_events"}
 
 
+@pytest.mark.trio
+async def test_events_unsubscribe_on_disconnect(backend, backend_sock_factory, alice, bob):
+    async with backend_sock_factory(backend, alice) as alice_sock:
+        async with backend_sock_factory(backend, bob) as bob_sock:
+            await events_subscribe(alice_sock)
+            await events_subscribe(bob_sock)
+
+            subscribers = backend.events._subscribers[alice.organization_id]
+            assert {ctx.user_id for ctx in subscribers.clients} == {alice.user_id, bob.user_id}
+            assert set(subscribers.by_user) == {alice.user_id, bob.user_id}
+
+        # Connection teardown happens in the backend once the client is gone
+        await trio.testing.wait_all_tasks_blocked()
+        assert {ctx.user_id for ctx in subscribers.clients} == {alice.user_id}
+        assert set(subscribers.by_user) == {alice.user_id}
+        assert all(
+            ctx.user_id == alice.user_id for ctxs in subscribers.by_realm.values() for ctx in ctxs
+        )
+
+    await trio.testing.wait_all_tasks_blocked()
+    assert alice.organization_id not in backend.events._subscribers
+
+
+@pytest.mark.trio
+async def test_events_listen_batch_overflow(
+    backend, alice, alice_backend_sock, alice2_backend_sock
+):
+    await events_subscribe(alice_backend_sock)
+    (client_ctx,) = backend.events._subscribers[alice.organization_id].clients
+    # Shrink the event queue to make it overflow
+    client_ctx.channels = trio.open_memory_channel(2)
+
+    with backend.event_bus.listen() as spy:
+        for ping_value in ("foo", "bar", "spam"):
+            await ping(alice2_backend_sock, ping_value)
+        await spy.wait_multiple_with_timeout([BackendEvent.PINGED] * 3)
+
+    # The client is told an event has been lost
+    rep = await events_listen_batch(alice_backend_sock)
+    assert rep == {
+        "status": "ok",
+        "events": [
+            {"event": APIEvent.PINGED, "ping": "foo"},
+            {"event": APIEvent.PINGED, "ping": "bar"},
+        ],
+        "overflow": True,
+    }
+    rep = await events_listen_batch(alice_backend_sock)
+    assert rep == {"status": "ok", "events": [], "overflow": False}
+
+
 # TODO: test message.received and beacon.updated events
@@ -2,6 +2,14 @@
 
 import pytest
 import trio
+from uuid import uuid4
+from base64 import b64decode
+
+from guardata.serde import unpackb
+from guardata.api.protocol import RealmRole
+from backendService.backend_events import BackendEvent
+from backendService.postgresql import handler
+from backendService.postgresql.handler import PGHandler, batch_signals, send_signal
 
 
 def records_filter_debug(records):
@@ -57,3 +65,91 @@ async def test_postgresql_connection_not_ok_retrying(
         assert "initial db connection failed" in record.message
     assert records[3].levelname == "ERROR"
     assert "initial db connection failed" in records[3].message
+
+
+class NotificationsConnection:
+    def __init__(self):
+        self.payloads = []
+        self.queries = 0
+
+    async def execute(self, sql, channel, payloads):
+        assert channel == "app_notification"
+        self.queries += 1
+        self.payloads += payloads if isinstance(payloads, list) else [payloads]
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("coalesce", (False, True), ids=("single", "coalesced"))
+async def test_batched_notifications(monkeypatch, event_bus, coalesce):
+    monkeypatch.setattr(handler, "_coalesce_notifications", coalesce)
+    conn = NotificationsConnection()
+    signals = [
+        (
+            BackendEvent.REALM_VLOBS_UPDATED,
+            {
+                "organization_id": "Org",
+                "author": "alice@dev1",
+                "realm_id": uuid4(),
+                "checkpoint": i,
+                "src_id": uuid4(),
+                "src_version": 1,
+            },
+        )
+        for i in range(200)
+    ]
+    signals.append(
+        (
+            BackendEvent.REALM_ROLES_UPDATED,
+            {
+                "organization_id": "Org",
+                "author": "alice@dev1",
+                "realm_id": uuid4(),
+                "user": "bob",
+                "role_str": "OWNER",
+            },
+        )
+    )
+
+    # Signals are only sent when leaving the batch, and dropped on error
+    with pytest.raises(ZeroDivisionError):
+        async with batch_signals(conn):
+            await send_signal(
+                conn, BackendEvent.PINGED, organization_id="Org", author=None, ping=""
+            )
+            1 / 0
+    assert conn.payloads == []
+
+    async with batch_signals(conn):
+        for signal, kwargs in signals[:100]:
+            await send_signal(conn, signal, **kwargs)
+        async with batch_signals(conn):
+            for signal, kwargs in signals[100:]:
+                await send_signal(conn, signal, **kwargs)
+        assert conn.payloads == []
+    # Payloads are sent in one query, and split to fit in PostgreSQL limits
+    assert conn.queries == 1
+    if coalesce:
+        assert 1 < len(conn.payloads) < len(signals)
+    else:
+        # Readable by the backends without coalesced notifications support
+        assert len(conn.payloads) == len(signals)
+        for payload in conn.payloads:
+            assert "__signal__" in unpackb(b64decode(payload.encode("ascii")))
+    assert all(len(payload) < 8000 for payload in conn.payloads)
+
+    # Single signals keep the previous notification format
+    await send_signal(conn, BackendEvent.PINGED, organization_id="Org", author=None, ping="foo")
+    assert conn.queries == 2
+
+    dbh = PGHandler("postgresql://dummy", 1, 1, 1, 1, event_bus)
+    with event_bus.listen() as spy:
+        for payload in conn.payloads:
+            dbh._on_notification(None, 42, "app_notification", payload)
+    expected = [(signal, kwargs) for signal, kwargs in signals[:-1]]
+    _, roles_kwargs = signals[-1]
+    roles_kwargs = {k: v for k, v in roles_kwargs.items() if k != "role_str"}
+    expected.append((BackendEvent.REALM_ROLES_UPDATED, {**roles_kwargs, "role": RealmRole.OWNER}))
+    expected.append(
+        (BackendEvent.PINGED, {"organization_id": "Org", "author": None, "ping": "foo"})
+    )
+    assert [(event.event, event.kwargs) for event in spy.events] == expected
@@ -177,7 +177,8 @@ async def test_switch_offline(mock_clock, running_backend, event_bus, alice):
 
 
 @pytest.mark.trio
-async def test_concurrency_sends(running_backend, alice, event_bus):
+@pytest.mark.parametrize("multiplexing", (True, False))
+async def test_concurrency_sends(running_backend, alice, event_bus, multiplexing):
     CONCURRENCY = 10
     work_done_counter = 0
     work_all_done = trio.Event()
@@ -196,6 +197,7 @@ async def test_concurrency_sends(running_backend, alice, event_bus):
         alice.signing_key,
         event_bus,
         max_pool=CONCURRENCY // 2,
+        multiplexing=multiplexing,
     )
     async with conn.run():
 
@@ -206,6 +208,11 @@ async def test_concurrency_sends(running_backend, alice, event_bus):
         with trio.fail_after(1):
             await work_all_done.wait()
 
+        if multiplexing:
+            # All the commands have been sent through a single transport
+            assert conn._transport_pool._multiplexed_transport
+            assert not conn._transport_pool._transports
+
 
 @pytest.mark.trio
 async def test_realm_notif_on_new_entry_sync(running_backend, alice_backend_conn, alice2_user_fs):
@@ -312,3 +319,56 @@ async def test_connection_refused(mock_clock, running_backend, event_bus, mallor
             # Trying to use the connection should endup with an exception
             with pytest.raises(BackendConnectionRefused):
                 await conn.cmds.ping()
+
+
+@pytest.mark.trio
+async def test_events_listen_fallback_with_older_backend(running_backend, event_bus, alice):
+    # Backend not providing the batched events listen command
+    for apis in running_backend.backend.apis.values():
+        apis.pop("events_listen_batch", None)
+
+    conn = BackendAuthenticatedConn(
+        alice.organization_addr, alice.device_id, alice.signing_key, event_bus
+    )
+    with event_bus.listen() as spy:
+        async with conn.run():
+            await spy.wait_with_timeout(
+                ClientEvent.BACKEND_CONNECTION_CHANGED,
+                {"status": BackendConnStatus.READY, "status_exc": None},
+            )
+            running_backend.backend.event_bus.send(
+                BackendEvent.PINGED,
+                organization_id=alice.organization_id,
+                author="bob@test",
+                ping="foo",
+            )
+            await spy.wait_with_timeout(ClientEvent.BACKEND_PINGED, {"ping": "foo"})
+
+
+@pytest.mark.trio
+async def test_events_overflow(running_backend, event_bus, alice):
+    conn = BackendAuthenticatedConn(
+        alice.organization_addr, alice.device_id, alice.signing_key, event_bus
+    )
+    with event_bus.listen() as spy:
+        async with conn.run():
+            await spy.wait_with_timeout(
+                ClientEvent.BACKEND_CONNECTION_CHANGED,
+                {"status": BackendConnStatus.READY, "status_exc": None},
+            )
+            (client_ctx,) = running_backend.backend.events._subscribers[
+                alice.organization_id
+            ].clients
+            client_ctx.events_overflowed = True
+            running_backend.backend.event_bus.send(
+                BackendEvent.PINGED,
+                organization_id=alice.organization_id,
+                author="bob@test",
+                ping="foo",
+            )
+            await spy.wait_multiple_with_timeout(
+                [
+                    (ClientEvent.BACKEND_PINGED, {"ping": "foo"}),
+                    ClientEvent.BACKEND_EVENTS_OVERFLOWED,
+                ]
+            )
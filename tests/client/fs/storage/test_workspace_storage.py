@@ -227,6 +227,50 @@ async def test_clear_cache(alice_workspace_storage):
     assert await aws.get_manifest(manifest2.id) == manifest2
 
 
+@pytest.mark.trio
+async def test_bounded_cache(tmpdir, alice, workspace_id):
+    manifests = [create_manifest(alice) for _ in range(4)]
+    async with WorkspaceStorage.run(alice, tmpdir, workspace_id, manifest_cache_size=2) as aws:
+        cache = aws.manifest_storage._cache
+
+        # Manifest 0 is not persistent yet so it cannot be evicted
+        async with aws.lock_entry_id(manifests[0].id):
+            await aws.set_manifest(manifests[0].id, manifests[0], cache_only=True)
+        for manifest in manifests[1:]:
+            async with aws.lock_entry_id(manifest.id):
+                await aws.set_manifest(manifest.id, manifest)
+        assert list(cache) == [manifests[0].id, manifests[3].id]
+        assert aws.manifest_storage.cache_stats == {
+            "size": 2,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 2,
+        }
+
+        # Evicted manifests are loaded back from the local database, the non
+        # persistent manifest 0 being skipped is moved at the end of the cache
+        assert await aws.get_manifest(manifests[1].id) == manifests[1]
+        assert list(cache) == [manifests[1].id, manifests[0].id]
+        assert await aws.get_manifest(manifests[0].id) == manifests[0]
+        assert list(cache) == [manifests[1].id, manifests[0].id]
+
+        # Once persistent, manifest 0 can be evicted like the others
+        async with aws.lock_entry_id(manifests[0].id):
+            await aws.ensure_manifest_persistent(manifests[0].id)
+        assert await aws.get_manifest(manifests[2].id) == manifests[2]
+        assert list(cache) == [manifests[0].id, manifests[2].id]
+        assert aws.manifest_storage.cache_stats == {
+            "size": 2,
+            "hits": 1,
+            "misses": 2,
+            "evictions": 4,
+        }
+
+        # Evicted manifests needing sync are still reported
+        local_changes, _ = await aws.get_need_sync_entries()
+        assert local_changes == {manifest.id for manifest in manifests}
+
+
 @pytest.mark.parametrize(
     "type", [LocalWorkspaceManifest, LocalFolderManifest, LocalFileManifest, LocalUserManifest]
 )
@@ -520,6 +564,38 @@ async def test_garbage_collection(tmpdir, alice, workspace_id):
         assert await aws.block_storage.get_nb_blocks() == 0
 
 
+@pytest.mark.trio
+async def test_garbage_collection_least_recently_used(tmpdir, alice, workspace_id):
+    cache_size = 2 * DEFAULT_BLOCK_SIZE
+    data = b"\x00" * 8
+    chunk1 = Chunk.new(0, 8).evolve_as_block(data)
+    chunk2 = Chunk.new(0, 8).evolve_as_block(data)
+    chunk3 = Chunk.new(0, 8).evolve_as_block(data)
+
+    async with WorkspaceStorage.run(alice, tmpdir, workspace_id, cache_size=cache_size) as aws:
+        await aws.set_clean_block(chunk1.access.id, data)
+        await aws.set_clean_block(chunk2.access.id, data)
+        # Overwriting a block doesn't change the count
+        await aws.set_clean_block(chunk2.access.id, data)
+        assert await aws.block_storage.get_nb_blocks() == 2
+
+        # Reading the first block makes the second one the least recently used
+        assert await aws.get_chunk(chunk1.id) == data
+        await aws.set_clean_block(chunk3.access.id, data)
+        assert await aws.block_storage.get_nb_blocks() == 2
+        assert await aws.block_storage.is_chunk(chunk1.id)
+        assert not await aws.block_storage.is_chunk(chunk2.id)
+        assert await aws.block_storage.is_chunk(chunk3.id)
+
+        await aws.clear_clean_block(chunk3.access.id)
+        await aws.clear_clean_block(chunk3.access.id)
+        assert await aws.block_storage.get_nb_blocks() == 1
+
+    # The block count is restored from the database
+    async with WorkspaceStorage.run(alice, tmpdir, workspace_id, cache_size=cache_size) as aws:
+        assert await aws.block_storage.get_nb_blocks() == 1
+
+
 @pytest.mark.trio
 async def test_storage_file_tree(alice, tmpdir, workspace_id):
     path = Path(tmpdir)
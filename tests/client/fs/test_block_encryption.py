@@ -0,0 +1,68 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+import pytest
+
+from guardata.client.types import Chunk
+from guardata.client.fs.exceptions import FSError
+from guardata.client.fs.block_encryption import (
+    encrypt_block,
+    decrypt_block,
+    decrypt_block_range,
+    get_ciphered_range,
+)
+
+
+def build_access(data, segment_size):
+    access = Chunk.new(0, len(data)).evolve_as_block(data).access
+    return access.evolve(segment_size=segment_size)
+
+
+def test_blocks_not_segmented_by_default():
+    # Older clients cannot decrypt segmented blocks, so it must be opted in
+    data = bytes(range(50))
+    assert Chunk.new(0, len(data)).evolve_as_block(data).access.segment_size is None
+    chunk = Chunk.new(0, len(data)).evolve_as_block(data, segment_size=10)
+    assert chunk.access.segment_size == 10
+
+
+@pytest.mark.parametrize("segment_size", [None, 1, 7, 10, 64])
+def test_encrypt_and_decrypt_block(segment_size):
+    data = bytes(range(50))
+    access = build_access(data, segment_size)
+    ciphered = encrypt_block(access, data)
+    assert decrypt_block(access, ciphered) == data
+
+
+@pytest.mark.parametrize("start, stop", [(0, 50), (0, 1), (9, 11), (10, 20), (45, 50), (3, 3)])
+def test_decrypt_block_range(start, stop):
+    data = bytes(range(50))
+    access = build_access(data, 10)
+    ciphered = encrypt_block(access, data)
+
+    offset, size = get_ciphered_range(access, start, stop)
+    partial = ciphered[offset : offset + size]
+    assert decrypt_block_range(access, partial, start, stop) == data[start:stop]
+
+
+def test_tampered_segmented_block():
+    data = bytes(range(50))
+    access = build_access(data, 10)
+    ciphered = encrypt_block(access, data)
+    offset, size = get_ciphered_range(access, 10, 20)
+
+    # Segments cannot be swapped
+    first = ciphered[:offset]
+    second = ciphered[offset : offset + size]
+    swapped = second + first + ciphered[offset + size :]
+    with pytest.raises(FSError):
+        decrypt_block(access, swapped)
+    with pytest.raises(FSError):
+        decrypt_block_range(access, first, 10, 20)
+
+    # Segments cannot be removed
+    with pytest.raises(FSError):
+        decrypt_block(access, ciphered[: offset + size])
+
+    # Nor data added
+    with pytest.raises(FSError):
+        decrypt_block_range(access, second + b"x", 10, 20)
@@ -21,7 +21,11 @@ from hypothesis import strategies as st
 from guardata.client.types import FsPath, EntryID
 from guardata.client.fs.utils import is_folder_manifest
 from guardata.client.fs.storage import WorkspaceStorage
-from guardata.client.fs.exceptions import FSRemoteManifestNotFound
+from guardata.client.fs.exceptions import (
+    FSRemoteManifestNotFound,
+    FSFileNotFoundError,
+    FSNotADirectoryError,
+)
 
 from tests.common import freeze_time, call_with_control
 
@@ -175,6 +179,83 @@ async def test_cannot_replace_root(alice_entry_transactions):
         await entry_transactions.entry_rename(FsPath("/foo"), FsPath("/"))
 
 
+@pytest.mark.trio
+async def test_path_resolution_cache(alice_entry_transactions):
+    entry_transactions = alice_entry_transactions
+    await entry_transactions.folder_create(FsPath("/a"))
+    await entry_transactions.folder_create(FsPath("/a/b"))
+    file_id, fd = await entry_transactions.file_create(FsPath("/a/b/c.txt"))
+    await entry_transactions.fd_close(fd)
+
+    # Keep track of the manifests loaded during the resolution
+    loaded = []
+    vanilla_load_manifest = entry_transactions._load_manifest
+
+    async def _load_manifest(entry_id):
+        loaded.append(entry_id)
+        return await vanilla_load_manifest(entry_id)
+
+    entry_transactions._load_manifest = _load_manifest
+
+    # Resolving the path again doesn't load any parent
+    path = FsPath("/a/b/c.txt")
+    assert await entry_transactions._entry_id_from_path(path) == (file_id, False)
+    loaded.clear()
+    assert await entry_transactions._entry_id_from_path(path) == (file_id, False)
+    assert not loaded
+
+    # Renaming a parent invalidates the cache
+    await entry_transactions.entry_rename(FsPath("/a/b"), FsPath("/a/d"))
+    with pytest.raises(FSFileNotFoundError):
+        await entry_transactions._entry_id_from_path(path)
+    path = FsPath("/a/d/c.txt")
+    assert await entry_transactions._entry_id_from_path(path) == (file_id, False)
+
+    # And so does removing the entry
+    await entry_transactions.file_delete(path)
+    with pytest.raises(FSFileNotFoundError):
+        await entry_transactions._entry_id_from_path(path)
+
+
+@pytest.mark.trio
+async def test_entry_info_with_children(alice_entry_transactions):
+    entry_transactions = alice_entry_transactions
+    await entry_transactions.folder_create(FsPath("/a"))
+    await entry_transactions.folder_create(FsPath("/a/b"))
+    for name in ("c.txt", "d.txt"):
+        _, fd = await entry_transactions.file_create(FsPath(f"/a/{name}"))
+        await entry_transactions.fd_close(fd)
+
+    # Same result as a stat on the folder and each of its children
+    stats, children_stats = await entry_transactions.entry_info_with_children(FsPath("/a"))
+    assert stats == await entry_transactions.entry_info(FsPath("/a"))
+    assert children_stats.keys() == {"b", "c.txt", "d.txt"}
+    for name, child_stats in children_stats.items():
+        assert child_stats == await entry_transactions.entry_info(FsPath("/a") / name)
+
+    # Children missing both locally and remotely are reported as inconsistencies
+    child_id = children_stats["c.txt"]["id"]
+    async with entry_transactions.local_storage.lock_entry_id(child_id):
+        await entry_transactions.local_storage.clear_manifest(child_id)
+    _, children_stats = await entry_transactions.entry_info_with_children(FsPath("/a"))
+    assert children_stats["c.txt"] == {"type": "inconsistency", "id": child_id}
+    assert children_stats["d.txt"]["type"] == "file"
+
+    # Local only listing leaves them out without reaching the backend
+    async def _load_manifests(*args, **kwargs):
+        raise AssertionError("Remote access not expected")
+
+    entry_transactions.remote_loader.load_manifests = _load_manifests
+    stats, children_stats = await entry_transactions.entry_info_with_children(
+        FsPath("/a"), local_only=True
+    )
+    assert "c.txt" in stats["children"]
+    assert children_stats.keys() == {"b", "d.txt"}
+
+    with pytest.raises(FSNotADirectoryError):
+        await entry_transactions.entry_info_with_children(FsPath("/a/d.txt"))
+
+
 @pytest.mark.trio
 async def test_access_not_loaded_entry(alice, bob, alice_entry_transactions):
     entry_transactions = alice_entry_transactions
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 import os
+import trio
 import pytest
 from pendulum import datetime
 from pathlib import Path
@@ -12,10 +13,10 @@ from hypothesis_trio.stateful import (
 )
 from hypothesis import strategies as st
 
-from guardata.client.types import EntryID, LocalFileManifest, Chunk
+from guardata.client.types import EntryID, LocalFileManifest, Chunk, DEFAULT_BLOCK_SEGMENT_SIZE
 from guardata.client.fs.storage import WorkspaceStorage
 from guardata.client.fs.workspacefs.file_transactions import FSInvalidFileDescriptor
-from guardata.client.fs.exceptions import FSRemoteBlockNotFound
+from guardata.client.fs.exceptions import FSRemoteBlockNotFound, FSLocalStorageClosedError
 
 from tests.common import freeze_time, call_with_control
 
@@ -211,6 +212,224 @@ async def test_load_block_from_remote(alice_file_transactions, foo_txt):
     assert data == chunk1_data + chunk2_data[:4]
 
 
+@pytest.mark.trio
+async def test_load_blocks_from_remote_concurrently(alice_file_transactions, foo_txt):
+    file_transactions = alice_file_transactions
+    remote_loader = file_transactions.remote_loader
+    remote_loader.max_block_transfers = 3
+
+    # Prepare the backend
+    await remote_loader.create_realm(remote_loader.workspace_id)
+
+    chunks = []
+    for i in range(8):
+        chunk_data = bytes([i]) * 10
+        chunk = Chunk.new(i * 10, (i + 1) * 10).evolve_as_block(chunk_data)
+        await remote_loader.upload_block(chunk.access, chunk_data)
+        await file_transactions.local_storage.clear_clean_block(chunk.access.id)
+        chunks.append(chunk)
+    foo_manifest = await foo_txt.get_manifest()
+    foo_manifest = foo_manifest.evolve(blocks=(tuple(chunks),), size=80)
+    await foo_txt.set_manifest(foo_manifest)
+
+    # Keep track of the concurrent block downloads
+    in_flight = 0
+    max_in_flight = 0
+    vanilla_backend_cmds = remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(in_flight, max_in_flight)
+        try:
+            return await vanilla_backend_cmds(cmd, *args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    remote_loader._backend_cmds = _backend_cmds
+
+    fd = foo_txt.open()
+    data = await file_transactions.fd_read(fd, 80, 0)
+    assert data == b"".join(bytes([i]) * 10 for i in range(8))
+    assert max_in_flight == 3
+
+    # Missing block errors are not wrapped into a MultiError
+    await file_transactions.local_storage.clear_clean_block(chunks[0].access.id)
+    await file_transactions.local_storage.clear_clean_block(chunks[1].access.id)
+    missing = Chunk.new(0, 10).evolve_as_block(b"x" * 10)
+    with pytest.raises(FSRemoteBlockNotFound):
+        await remote_loader.load_blocks([chunks[0].access, missing.access, chunks[1].access])
+
+
+@pytest.mark.trio
+async def test_load_block_range_from_remote(alice_file_transactions, foo_txt):
+    file_transactions = alice_file_transactions
+    remote_loader = file_transactions.remote_loader
+    block_storage = file_transactions.local_storage.block_storage
+
+    # Prepare the backend
+    await remote_loader.create_realm(remote_loader.workspace_id)
+
+    chunk_data = bytes(range(256)) * 1000
+    chunk = Chunk.new(0, len(chunk_data)).evolve_as_block(
+        chunk_data, segment_size=DEFAULT_BLOCK_SEGMENT_SIZE
+    )
+    await remote_loader.upload_block(chunk.access, chunk_data)
+    await file_transactions.local_storage.clear_clean_block(chunk.access.id)
+    foo_manifest = await foo_txt.get_manifest()
+    foo_manifest = foo_manifest.evolve(blocks=((chunk,),), size=len(chunk_data))
+    await foo_txt.set_manifest(foo_manifest)
+
+    # Keep track of the block read requests
+    block_reads = []
+    vanilla_backend_cmds = remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        if cmd == "block_read":
+            block_reads.append(kwargs)
+        return await vanilla_backend_cmds(cmd, *args, **kwargs)
+
+    remote_loader._backend_cmds = _backend_cmds
+
+    # Random read only downloads the needed segments
+    fd = foo_txt.open()
+    data = await file_transactions.fd_read(fd, 100, 150000)
+    assert data == chunk_data[150000:150100]
+    assert len(block_reads) == 1
+    assert block_reads[0]["size"] < len(chunk_data) // 2
+    assert not await block_storage.is_chunk(chunk.id)
+
+    # Sequential read downloads the whole block
+    data = await file_transactions.fd_read(fd, 100, 150100)
+    assert data == chunk_data[150100:150200]
+    assert block_reads[1] == {}
+    assert await block_storage.is_chunk(chunk.id)
+
+
+async def _prepare_blocks(file_transactions, foo_txt, nb_blocks):
+    remote_loader = file_transactions.remote_loader
+    await remote_loader.create_realm(remote_loader.workspace_id)
+    chunks = []
+    for i in range(nb_blocks):
+        chunk_data = bytes([i]) * 10
+        chunk = Chunk.new(i * 10, (i + 1) * 10).evolve_as_block(chunk_data)
+        await remote_loader.upload_block(chunk.access, chunk_data)
+        await file_transactions.local_storage.clear_clean_block(chunk.access.id)
+        chunks.append(chunk)
+    foo_manifest = await foo_txt.get_manifest()
+    foo_manifest = foo_manifest.evolve(
+        blocks=tuple((chunk,) for chunk in chunks), blocksize=10, size=nb_blocks * 10
+    )
+    await foo_txt.set_manifest(foo_manifest)
+    return chunks
+
+
+@pytest.mark.trio
+async def test_read_ahead_sequential_access(alice_file_transactions, foo_txt):
+    file_transactions = alice_file_transactions
+    local_storage = file_transactions.local_storage
+    chunks = await _prepare_blocks(file_transactions, foo_txt, 8)
+
+    async def wait_prefetching(fd):
+        for event in list(file_transactions._read_ahead[fd].loading.values()):
+            await event.wait()
+
+    async with trio.open_nursery() as nursery:
+        file_transactions.read_ahead_nursery = nursery
+        fd = foo_txt.open()
+
+        # First read only starts detecting the access pattern
+        assert await file_transactions.fd_read(fd, 10, 0) == bytes([0]) * 10
+        await wait_prefetching(fd)
+        assert not await local_storage.is_clean_block(chunks[1].access.id)
+
+        # Sequential read prefetches the following block
+        assert await file_transactions.fd_read(fd, 10, 10) == bytes([1]) * 10
+        await wait_prefetching(fd)
+        assert await local_storage.is_clean_block(chunks[2].access.id)
+        assert file_transactions._read_ahead[fd].block_load_time > 0
+
+        # Then the reading goes on with the prefetched blocks
+        for i in range(2, 8):
+            assert await file_transactions.fd_read(fd, 10, i * 10) == bytes([i]) * 10
+        for chunk in chunks:
+            assert await local_storage.is_clean_block(chunk.access.id)
+
+        # Random access does not prefetch
+        await local_storage.clear_clean_block(chunks[6].access.id)
+        assert await file_transactions.fd_read(fd, 10, 40) == bytes([4]) * 10
+        await wait_prefetching(fd)
+        assert not await local_storage.is_clean_block(chunks[6].access.id)
+
+        await file_transactions.fd_close(fd)
+        assert not file_transactions._read_ahead
+
+
+@pytest.mark.trio
+async def test_read_ahead_internal_error(alice_file_transactions, foo_txt):
+    file_transactions = alice_file_transactions
+    remote_loader = file_transactions.remote_loader
+    chunks = await _prepare_blocks(file_transactions, foo_txt, 3)
+
+    # Local storage gets closed while the last block is prefetched
+    prefetch_failed = trio.Event()
+    vanilla_load_block = remote_loader.load_block
+
+    async def _load_block(access):
+        if access.id != chunks[2].access.id or prefetch_failed.is_set():
+            return await vanilla_load_block(access)
+        prefetch_failed.set()
+        raise FSLocalStorageClosedError("closed")
+
+    # The error must not crash the nursery
+    async with trio.open_nursery() as nursery:
+        file_transactions.read_ahead_nursery = nursery
+        fd = foo_txt.open()
+        remote_loader.load_block = _load_block
+        assert await file_transactions.fd_read(fd, 10, 0) == bytes([0]) * 10
+        assert await file_transactions.fd_read(fd, 10, 10) == bytes([1]) * 10
+        await prefetch_failed.wait()
+        for event in list(file_transactions._read_ahead[fd].loading.values()):
+            await event.wait()
+        # The actual read loads the block again
+        assert await file_transactions.fd_read(fd, 10, 20) == bytes([2]) * 10
+        await file_transactions.fd_close(fd)
+
+
+@pytest.mark.trio
+async def test_read_ahead_cancelled_on_close(alice_file_transactions, foo_txt):
+    file_transactions = alice_file_transactions
+    remote_loader = file_transactions.remote_loader
+    chunks = await _prepare_blocks(file_transactions, foo_txt, 3)
+
+    # Block downloads hang once the first block is loaded
+    hanging = trio.Event()
+    vanilla_backend_cmds = remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        if cmd == "block_read" and hanging.is_set():
+            await trio.sleep_forever()
+        return await vanilla_backend_cmds(cmd, *args, **kwargs)
+
+    remote_loader._backend_cmds = _backend_cmds
+
+    # The nursery doesn't exit unless the prefetching is cancelled
+    async with trio.open_nursery() as nursery:
+        file_transactions.read_ahead_nursery = nursery
+        fd = foo_txt.open()
+        assert await file_transactions.fd_read(fd, 10, 0) == bytes([0]) * 10
+        await file_transactions.local_storage.set_clean_block(chunks[1].access.id, bytes([1]) * 10)
+        hanging.set()
+        assert await file_transactions.fd_read(fd, 10, 10) == bytes([1]) * 10
+        read_ahead = file_transactions._read_ahead[fd]
+        assert chunks[2].access.id in read_ahead.loading
+        await file_transactions.fd_close(fd)
+
+    assert not read_ahead.loading
+    assert not read_ahead.cancel_scopes
+    assert not await file_transactions.local_storage.is_clean_block(chunks[2].access.id)
+
+
 size = st.integers(min_value=0, max_value=4 * 1024 ** 2)  # Between 0 and 4MB
 
 
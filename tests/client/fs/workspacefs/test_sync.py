@@ -3,7 +3,8 @@
 from functools import partial
 import pytest
 
-from guardata.client.types import FsPath
+from guardata.client.types import FsPath, DEFAULT_BLOCK_SIZE
+from guardata.client.client_events import ClientEvent
 
 from tests.common import create_shared_workspace
 
@@ -93,3 +94,90 @@ async def test_sync_by_id_couple(alice_workspace, bob_workspace):
     expected = [FsPath("/a"), FsPath("/b")]
     assert await bob_workspace.listdir("/") == expected
     assert await alice_workspace.listdir("/") == expected
+
+
+@pytest.mark.trio
+async def test_sync_uploads_blocks_concurrently(alice_workspace, bob_workspace):
+    alice_workspace.remote_loader.max_block_transfers = 3
+    data = bytes(range(256)) * (5 * DEFAULT_BLOCK_SIZE // 256)
+    await alice_workspace.write_bytes("/f", data)
+    f_id = await alice_workspace.path_id("/f")
+
+    # Keep track of the concurrent block uploads
+    in_flight = 0
+    max_in_flight = 0
+    vanilla_backend_cmds = alice_workspace.remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        if cmd != "block_create":
+            return await vanilla_backend_cmds(cmd, *args, **kwargs)
+        in_flight += 1
+        max_in_flight = max(in_flight, max_in_flight)
+        try:
+            return await vanilla_backend_cmds(cmd, *args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    alice_workspace.remote_loader._backend_cmds = _backend_cmds
+
+    with alice_workspace.event_bus.listen() as spy:
+        await alice_workspace.sync_by_id(f_id)
+    assert max_in_flight == 3
+    uploaded = [event for event in spy.events if event.event == ClientEvent.FS_BLOCK_UPLOADED]
+    assert len(uploaded) == 5
+    assert {event.kwargs["id"] for event in uploaded} == {f_id}
+    assert sum(event.kwargs["size"] for event in uploaded) == len(data)
+
+    await alice_workspace.sync()
+    await bob_workspace.sync()
+    assert await bob_workspace.read_bytes("/f") == data
+
+
+@pytest.mark.trio
+async def test_sync_tree_concurrently(alice_workspace, bob_workspace):
+    alice_workspace.remote_loader.max_block_transfers = 3
+    for folder in ("/a", "/b"):
+        await alice_workspace.mkdir(folder)
+        for name in ("x", "y", "z"):
+            await alice_workspace.write_bytes(f"{folder}/{name}", b"v1")
+    await alice_workspace.sync()
+    for folder in ("/a", "/b"):
+        for name in ("x", "y", "z"):
+            await alice_workspace.write_bytes(f"{folder}/{name}", b"v2")
+
+    # Keep track of the concurrent entry synchronizations
+    folder_ids = {await alice_workspace.path_id(path) for path in ("/", "/a", "/b")}
+    in_flight = 0
+    max_in_flight = 0
+    synced = []
+    vanilla_sync_by_id = alice_workspace._sync_by_id
+
+    async def _sync_by_id(entry_id, remote_changed=True):
+        nonlocal in_flight, max_in_flight
+        # A folder is always fully synchronized before its children
+        manifest = await alice_workspace.local_storage.get_manifest(entry_id)
+        if entry_id != alice_workspace.workspace_id:
+            assert manifest.parent in synced
+        in_flight += 1
+        max_in_flight = max(in_flight, max_in_flight)
+        try:
+            return await vanilla_sync_by_id(entry_id, remote_changed=remote_changed)
+        finally:
+            in_flight -= 1
+            synced.append(entry_id)
+
+    alice_workspace._sync_by_id = _sync_by_id
+
+    progress = []
+    await alice_workspace.sync(progress=lambda done, total: progress.append((done, total)))
+    assert max_in_flight == 3
+    assert len(synced) == 9
+    assert set(folder_ids) < set(synced)
+    assert progress[0] == (1, 3)
+    assert progress[-1] == (9, 9)
+
+    await bob_workspace.sync()
+    for folder in ("/a", "/b"):
+        for name in ("x", "y", "z"):
+            assert await bob_workspace.read_bytes(f"{folder}/{name}") == b"v2"
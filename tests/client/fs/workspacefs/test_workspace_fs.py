@@ -3,11 +3,15 @@
 
 import errno
 import pytest
+import pendulum
 from unittest.mock import ANY
 
 from guardata.api.protocol import DeviceID, RealmRole
-from guardata.api.data import BaseManifest as BaseRemoteManifest
-from guardata.client.types import FsPath, EntryID
+from guardata.api.data import BaseManifest as BaseRemoteManifest, RealmRoleCertificateContent
+from guardata.client.types import FsPath, EntryID, WorkspaceRole
+from guardata.client.fs.remote_loader import RemoteLoader
+
+from tests.common import freeze_time
 from guardata.client.fs.exceptions import FSError, FSBackendOfflineError
 from guardata.client.fs.workspacefs.workspacefs import ReencryptionNeed
 
@@ -398,6 +402,42 @@ async def test_dump(alice_workspace):
     }
 
 
+@pytest.mark.trio
+async def test_load_manifests(monkeypatch, alice_workspace):
+    foo_id = await alice_workspace.path_id("/foo")
+    bar_id = await alice_workspace.path_id("/foo/bar")
+    entries = [(foo_id, None, None), (bar_id, 1, None), (EntryID(), None, None)]
+
+    remote_loader = alice_workspace.remote_loader
+    vanilla_backend_cmds = remote_loader._backend_cmds
+    cmds = []
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        cmds.append(cmd)
+        return await vanilla_backend_cmds(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(remote_loader, "_backend_cmds", _backend_cmds)
+
+    # All the vlobs are fetched in a single request
+    foo_manifest, bar_manifest, unknown_manifest = await remote_loader.load_manifests(entries)
+    assert cmds.count("vlob_read_batch") == 1
+    assert "vlob_read" not in cmds
+    assert foo_manifest == await remote_loader.load_manifest(foo_id)
+    assert bar_manifest == await remote_loader.load_manifest(bar_id, version=1)
+    assert unknown_manifest is None
+
+    # Backends without batch read are requested one vlob at a time
+    async def _legacy_backend_cmds(cmd, *args, **kwargs):
+        if cmd == "vlob_read_batch":
+            return {"status": "unknown_command", "reason": "Unknown command"}
+        return await _backend_cmds(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(remote_loader, "_backend_cmds", _legacy_backend_cmds)
+    cmds.clear()
+    assert await remote_loader.load_manifests(entries) == [foo_manifest, bar_manifest, None]
+    assert cmds.count("vlob_read") == 3
+
+
 @pytest.mark.trio
 async def test_path_info_remote_loader_exceptions(monkeypatch, alice_workspace, alice):
     manifest, _ = await alice_workspace.transactions._get_manifest_from_path(FsPath("/foo/bar"))
@@ -445,7 +485,7 @@ async def test_get_reencryption_need(alice_workspace, running_backend, monkeypat
     original = alice_workspace.remote_loader._backend_cmds
 
     async def mockup(name, *args):
-        if name == "realm_get_role_certificates" and args == (alice_workspace.workspace_id,):
+        if name == "realm_get_role_certificates" and args[0] == alice_workspace.workspace_id:
             return reply
         return await original(name, *args)
 
@@ -454,3 +494,96 @@ async def test_get_reencryption_need(alice_workspace, running_backend, monkeypat
     with running_backend.offline():
         with pytest.raises(FSBackendOfflineError):
             await alice_workspace.get_reencryption_need()
+
+
+@pytest.mark.trio
+async def test_realm_role_certificates_incremental_loading(
+    alice_user_fs, alice_workspace, running_backend, monkeypatch, bob, adam
+):
+    remote_loader = alice_workspace.remote_loader
+    await remote_loader.load_realm_current_roles()
+
+    since_params = []
+    vanilla_backend_cmds = remote_loader._backend_cmds
+
+    async def _backend_cmds(name, *args):
+        if name == "realm_get_role_certificates":
+            since_params.append(args[1])
+        return await vanilla_backend_cmds(name, *args)
+
+    monkeypatch.setattr(remote_loader, "_backend_cmds", _backend_cmds)
+
+    verified = []
+    vanilla_verify_and_load = RealmRoleCertificateContent.verify_and_load
+
+    def _verify_and_load(raw, *args, **kwargs):
+        verified.append(raw)
+        return vanilla_verify_and_load(raw, *args, **kwargs)
+
+    monkeypatch.setattr(RealmRoleCertificateContent, "verify_and_load", _verify_and_load)
+
+    wid = alice_workspace.workspace_id
+    await alice_user_fs.workspace_share(wid, bob.user_id, WorkspaceRole.READER)
+    await alice_user_fs.workspace_share(wid, adam.user_id, WorkspaceRole.CONTRIBUTOR)
+    # Sharing involves other remote loaders
+    verified.clear()
+
+    # Only the new certificates are verified
+    expected_roles = {
+        alice_workspace.device.user_id: RealmRole.OWNER,
+        bob.user_id: RealmRole.READER,
+        adam.user_id: RealmRole.CONTRIBUTOR,
+    }
+    assert await remote_loader.load_realm_current_roles() == expected_roles
+    assert len(verified) == 2
+    assert since_params[-1] is not None
+
+    verified.clear()
+    certificates = await remote_loader.load_realm_role_certificates()
+    assert len(certificates) == 3
+    assert verified == []
+
+    # Verified certificates are persisted in the local storage
+    other_remote_loader = RemoteLoader(
+        alice_workspace.device,
+        wid,
+        alice_workspace.get_workspace_entry,
+        alice_workspace.backend_cmds,
+        alice_workspace.remote_devices_manager,
+        alice_workspace.local_storage,
+    )
+    assert await other_remote_loader.load_realm_current_roles() == expected_roles
+    assert await other_remote_loader.load_realm_role_certificates() == certificates
+    assert verified == []
+
+    # New certificates are loaded on top of the stored ones
+    await alice_user_fs.workspace_share(wid, bob.user_id, None)
+    verified.clear()
+    assert await other_remote_loader.load_realm_current_roles() == {
+        alice_workspace.device.user_id: RealmRole.OWNER,
+        adam.user_id: RealmRole.CONTRIBUTOR,
+    }
+    assert len(verified) == 1
+
+
+@pytest.mark.trio
+async def test_realm_role_certificates_received_out_of_order(
+    alice_user_fs, alice_workspace, running_backend, bob, adam
+):
+    # Role certificates are accepted by the backend as long as their timestamp
+    # is in the ballpark, so a certificate can be older than the last one loaded
+    remote_loader = alice_workspace.remote_loader
+    wid = alice_workspace.workspace_id
+    now = pendulum.now()
+    with freeze_time(now.add(minutes=10)):
+        await alice_user_fs.workspace_share(wid, bob.user_id, WorkspaceRole.READER)
+        await remote_loader.load_realm_current_roles()
+    with freeze_time(now.add(minutes=5)):
+        await alice_user_fs.workspace_share(wid, adam.user_id, WorkspaceRole.READER)
+        certificates = await remote_loader.load_realm_role_certificates()
+
+    assert [(c.user_id, c.role) for c in certificates] == [
+        (alice_workspace.device.user_id, RealmRole.OWNER),
+        (adam.user_id, RealmRole.READER),
+        (bob.user_id, RealmRole.READER),
+    ]
@@ -191,3 +191,105 @@ async def test_mountpoint_path_already_in_use_concurrent_with_mountpoint(
 
         # Test is over, stop alice2 mountpoint and exit
         nursery.cancel_scope.cancel()
+
+
+@pytest.mark.linux
+@pytest.mark.trio
+@pytest.mark.mountpoint
+async def test_slow_read_does_not_block_other_operations(
+    base_mountpoint, running_backend, alice_user_fs
+):
+    wid = await alice_user_fs.workspace_create("w")
+    workspace = alice_user_fs.get_workspace(wid)
+    await workspace.write_bytes("/foo.txt", b"foo")
+    await workspace.sync()
+
+    # Remove the block from the local cache to force its download
+    entry_id = await workspace.path_id("/foo.txt")
+    manifest = await workspace.local_storage.get_manifest(entry_id)
+    for chunks in manifest.blocks:
+        for chunk in chunks:
+            await workspace.local_storage.clear_clean_block(chunk.access.id)
+
+    # Block downloads hang until released
+    block_read_started = trio.Event()
+    release_block_read = trio.Event()
+    vanilla_backend_cmds = workspace.remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        if cmd == "block_read":
+            block_read_started.set()
+            await release_block_read.wait()
+        return await vanilla_backend_cmds(cmd, *args, **kwargs)
+
+    workspace.remote_loader._backend_cmds = _backend_cmds
+
+    async with mountpoint_manager_factory(
+        alice_user_fs, alice_user_fs.event_bus, base_mountpoint
+    ) as mountpoint_manager:
+        mountpoint_path = await mountpoint_manager.mount_workspace(wid)
+        foo_path = trio.Path(mountpoint_path / "foo.txt")
+
+        result = None
+
+        async def _read_foo():
+            nonlocal result
+            result = await foo_path.read_bytes()
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(_read_foo)
+            await block_read_started.wait()
+
+            # The rest of the mountpoint is still available during the download
+            with trio.fail_after(5):
+                assert (await foo_path.stat()).st_size == 3
+                assert [p.name for p in await trio.Path(mountpoint_path).iterdir()] == ["foo.txt"]
+                await trio.Path(mountpoint_path / "bar").mkdir()
+
+            release_block_read.set()
+
+        assert result == b"foo"
+
+
+@pytest.mark.linux
+@pytest.mark.trio
+@pytest.mark.mountpoint
+async def test_entry_info_cache(monkeypatch, base_mountpoint, alice_user_fs):
+    # Disable the kernel cache to only test the one of the fuse operations
+    monkeypatch.setattr("guardata.client.mountpoint.fuse_runner.FUSE_CACHE_TIMEOUT", 0)
+
+    wid = await alice_user_fs.workspace_create("w")
+    workspace = alice_user_fs.get_workspace(wid)
+    await workspace.write_bytes("/foo.txt", b"foo")
+
+    # Count the entry info requests reaching the workspace
+    entry_info_calls = []
+    vanilla_entry_info = workspace.transactions.entry_info
+
+    async def _entry_info(path):
+        entry_info_calls.append(path)
+        return await vanilla_entry_info(path)
+
+    workspace.transactions.entry_info = _entry_info
+
+    async with mountpoint_manager_factory(
+        alice_user_fs, alice_user_fs.event_bus, base_mountpoint
+    ) as mountpoint_manager:
+        mountpoint_path = await mountpoint_manager.mount_workspace(wid)
+        foo_path = trio.Path(mountpoint_path / "foo.txt")
+        missing_path = trio.Path(mountpoint_path / "missing.txt")
+
+        # Repeated lookups are served from the cache
+        assert (await foo_path.stat()).st_size == 3
+        assert not await missing_path.exists()
+        entry_info_calls.clear()
+        for _ in range(10):
+            assert (await foo_path.stat()).st_size == 3
+            assert not await missing_path.exists()
+        assert not entry_info_calls
+
+        # Changes made outside of the mountpoint invalidate the cache
+        await workspace.write_bytes("/foo.txt", b"foobar")
+        await workspace.write_bytes("/missing.txt", b"")
+        assert (await foo_path.stat()).st_size == 6
+        assert await missing_path.exists()
@@ -3,7 +3,13 @@
 import pytest
 from pendulum import datetime
 
-from guardata.client.remote_devices_manager import RemoteDevicesManagerBackendOfflineError
+from guardata.api.data import UserCertificateContent, DeviceCertificateContent
+from guardata.client.backend_connection import backend_authenticated_cmds_factory
+from guardata.client.remote_devices_manager import (
+    RemoteDevicesManager,
+    RemoteDevicesManagerBackendOfflineError,
+)
+from guardata.client.fs.storage import CertificateStorage
 
 from tests.common import freeze_time
 
@@ -103,3 +109,29 @@ async def test_retrieve_user_and_devices(
         with pytest.raises(RemoteDevicesManagerBackendOfflineError):
             with running_backend.offline():
                 await remote_devices_manager.get_user_and_devices(alice.user_id)
+
+
+@pytest.mark.trio
+async def test_verified_certificates_persistence(running_backend, tmpdir, monkeypatch, alice, bob):
+    async with backend_authenticated_cmds_factory(
+        alice.organization_addr, alice.device_id, alice.signing_key
+    ) as cmds:
+        async with CertificateStorage.run(alice, tmpdir) as certificate_storage:
+            remote_devices_manager = RemoteDevicesManager(
+                cmds, alice.root_verify_key, certificate_storage=certificate_storage
+            )
+            device = await remote_devices_manager.get_device(bob.device_id)
+            assert await certificate_storage.get_verified_certificates()
+
+        def _verify_and_load(*args, **kwargs):
+            raise AssertionError("Signature should not be verified again")
+
+        for certif_cls in (UserCertificateContent, DeviceCertificateContent):
+            monkeypatch.setattr(certif_cls, "verify_and_load", _verify_and_load)
+
+        # Restarting the client doesn't need to verify the known certificates again
+        async with CertificateStorage.run(alice, tmpdir) as certificate_storage:
+            remote_devices_manager = RemoteDevicesManager(
+                cmds, alice.root_verify_key, certificate_storage=certificate_storage
+            )
+            assert await remote_devices_manager.get_device(bob.device_id) == device
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 import re
+import math
 import trio
 import pytest
 from unittest.mock import ANY
@@ -8,8 +9,16 @@ from unittest.mock import ANY
 from guardata.client.backend_connection import BackendConnStatus
 from backendService.backend_events import BackendEvent
 from guardata.client.client_events import ClientEvent
-from guardata.client.types import WorkspaceRole
+from guardata.client.types import EntryID, WorkspaceRole
 from guardata.client.fs.exceptions import FSReadOnlyError
+from guardata.client.sync_monitor import (
+    MIN_WAIT,
+    MAX_CONCURRENT_SYNCS,
+    REMOTE_CHANGE_PRIORITY,
+    SyncContext,
+    WorkspaceSyncContext,
+    timestamp,
+)
 
 from tests.common import create_shared_workspace
 
@@ -170,6 +179,39 @@ async def test_autosync_on_remote_modifications(
         assert path_info == path_info2
 
 
+@pytest.mark.trio
+async def test_sync_remote_changes_after_events_overflow(
+    autojump_clock, running_backend, alice, alice_client, alice2_user_fs, monkeypatch
+):
+    def _lose_event(client_ctx, event_data):
+        client_ctx.events_overflowed = True
+
+    # The backend event queue of alice_client is full
+    with monkeypatch.context() as m:
+        m.setattr("backendService.events._send_event", _lose_event)
+        wid = await alice2_user_fs.workspace_create("w")
+        await alice2_user_fs.sync()
+
+    with alice_client.event_bus.listen() as spy:
+        # Any new event comes with the overflow signal
+        running_backend.backend.event_bus.send(
+            BackendEvent.PINGED,
+            organization_id=alice.organization_id,
+            author="bob@test",
+            ping="foo",
+        )
+        await spy.wait_multiple_with_timeout(
+            [
+                ClientEvent.BACKEND_EVENTS_OVERFLOWED,
+                (ClientEvent.FS_ENTRY_REMOTE_CHANGED, {"id": alice.user_manifest_id, "path": "/"}),
+            ],
+            timeout=60,  # autojump, so not *really* 60s
+        )
+    with trio.fail_after(60):  # autojump, so not *really* 60s
+        await alice_client.wait_idle_monitors()
+    assert alice_client.user_fs.get_workspace(wid)
+
+
 @pytest.mark.trio
 async def test_reconnect_with_remote_changes(
     autojump_clock, alice2, running_backend, alice_client, alice2_user_fs
@@ -388,3 +430,88 @@ async def test_sync_monitor_while_changing_roles(
     await bob_client.wait_idle_monitors()
     info = await bob_workspace.path_info("/this-should-not-fail")
     assert not info["need_sync"]
+
+
+@pytest.mark.trio
+async def test_sync_context_schedules_by_priority(autojump_clock):
+    sizes = {EntryID(): size for size in (4096, 0, 10, 1 << 20, 512)}
+
+    class PrioritizedSyncContext(SyncContext):
+        async def _get_priority(self, entry_id):
+            return sizes[entry_id]
+
+    ctx = PrioritizedSyncContext(user_fs=None, id=EntryID())
+    ctx._changes_loaded = True
+
+    now = timestamp()
+    for entry_id in sizes:
+        ctx.set_local_change(entry_id)
+    assert ctx.due_time == now + MIN_WAIT
+    assert ctx.get_ready_priority() is None
+
+    # Modifying a known entry postpones it without growing the heap
+    await trio.sleep(MIN_WAIT / 2)
+    postponed_id = next(iter(sizes))
+    assert not ctx.set_local_change(postponed_id)
+    assert len(ctx._pending_local_changes) == len(sizes)
+
+    await trio.sleep(MIN_WAIT / 2)
+    assert await ctx.schedule() == timestamp()
+    ready_ids = []
+    while ctx.get_ready_priority() is not None:
+        entry_id, remote = ctx.pop_ready_entry()
+        assert not remote
+        ready_ids.append(entry_id)
+    assert ready_ids == sorted(
+        (entry_id for entry_id in sizes if entry_id != postponed_id), key=sizes.__getitem__
+    )
+    assert ctx.due_time == now + MIN_WAIT * 1.5
+
+    # Remote changes go first
+    ctx.set_remote_change(postponed_id)
+    assert ctx.get_ready_priority() == REMOTE_CHANGE_PRIORITY
+    assert ctx.pop_ready_entry() == (postponed_id, True)
+
+    await trio.sleep(MIN_WAIT / 2)
+    await ctx.schedule()
+    assert ctx.get_ready_priority() == sizes[postponed_id]
+    assert ctx.pop_ready_entry() == (postponed_id, False)
+    assert ctx._compute_due_time() == math.inf
+
+
+@pytest.mark.trio
+async def test_sync_entries_concurrently(
+    autojump_clock, running_backend, alice_client, monkeypatch
+):
+    in_progress = 0
+    max_in_progress = 0
+    vanilla_sync = WorkspaceSyncContext._sync
+
+    async def _slow_sync(self, entry_id):
+        nonlocal in_progress, max_in_progress
+        in_progress += 1
+        max_in_progress = max(max_in_progress, in_progress)
+        try:
+            await trio.sleep(1)
+            await vanilla_sync(self, entry_id)
+        finally:
+            in_progress -= 1
+
+    monkeypatch.setattr(WorkspaceSyncContext, "_sync", _slow_sync)
+
+    workspaces = []
+    for name in ("w1", "w2"):
+        wid = await alice_client.user_fs.workspace_create(name)
+        workspace = alice_client.user_fs.get_workspace(wid)
+        for i in range(4):
+            await workspace.write_bytes(f"/file{i}", b"a" * i)
+        workspaces.append(workspace)
+
+    with trio.fail_after(60):  # autojump, so not *really* 60s
+        await alice_client.wait_idle_monitors()
+
+    assert max_in_progress == MAX_CONCURRENT_SYNCS
+    for workspace in workspaces:
+        for i in range(4):
+            info = await workspace.path_info(f"/file{i}")
+            assert not info["need_sync"]
@@ -21,8 +21,8 @@ class TrustchainData:
         self.revoked_users_certifs = {}
         self.local_devices = {}
 
-    def run_trustchain_load_user_and_devices(self, user):
-        ctx = self.trustchain_ctx_factory()
+    def run_trustchain_load_user_and_devices(self, user, ctx=None):
+        ctx = ctx or self.trustchain_ctx_factory()
         return ctx.load_user_and_devices(
             trustchain={
                 "users": [certif for _, certif in self.users_certifs.values()],
@@ -354,3 +354,56 @@ def test_verify_user_with_broken_trustchain(trustchain_data_factory):
     assert str(exc.value) == (
         "bob@dev1 <-sign- mallory@dev1: Missing device certificate for mallory@dev1"
     )
+
+
+def test_verified_certificates_skip_signature_check(trustchain_data_factory, monkeypatch):
+    data = trustchain_data_factory(
+        todo_devices=(
+            {"id": "alice@dev1"},
+            {"id": "bob@dev1", "certifier": "alice@dev1"},
+            {"id": "bob@dev2", "certifier": "bob@dev1"},
+        ),
+        todo_users=(
+            {"id": "alice", "profile": UserProfile.ADMIN},
+            {"id": "bob", "certifier": "alice@dev1"},
+        ),
+    )
+    ctx = data.trustchain_ctx_factory()
+    expected = data.run_trustchain_load_user_and_devices("bob", ctx=ctx)
+    digests = ctx.pop_new_verified_certificates()
+    # One digest per certificate, each device being verified only once
+    assert len(digests) == 5
+    assert ctx.pop_new_verified_certificates() == []
+
+    def _verify_and_load(*args, **kwargs):
+        raise AssertionError("Signature should not be verified again")
+
+    for certif_cls in (UserCertificateContent, DeviceCertificateContent):
+        monkeypatch.setattr(certif_cls, "verify_and_load", _verify_and_load)
+
+    ctx = data.trustchain_ctx_factory()
+    ctx.add_verified_certificates(digests)
+    assert data.run_trustchain_load_user_and_devices("bob", ctx=ctx) == expected
+    assert ctx.pop_new_verified_certificates() == []
+
+
+def test_verified_certificates_still_check_trustchain(trustchain_data_factory):
+    data = trustchain_data_factory(
+        todo_devices=({"id": "alice@dev1"}, {"id": "bob@dev1"}),
+        todo_users=({"id": "alice", "certifier": "bob@dev1"}, {"id": "bob"}),
+    )
+    ctx = data.trustchain_ctx_factory()
+    with pytest.raises(TrustchainError):
+        data.run_trustchain_load_user_and_devices("alice", ctx=ctx)
+    # The signatures are valid even if the trustchain is not
+    digests = ctx.pop_new_verified_certificates()
+    assert digests
+
+    ctx = data.trustchain_ctx_factory()
+    ctx.add_verified_certificates(digests)
+    with pytest.raises(TrustchainError) as exc:
+        data.run_trustchain_load_user_and_devices("alice", ctx=ctx)
+    assert (
+        str(exc.value)
+        == "alice's creation <-sign- bob@dev1:  Invalid signature given bob is not admin"
+    )
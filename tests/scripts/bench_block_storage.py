@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the cost of inserting and reading blocks in a block cache
+already containing a large amount of blocks:
+
+    $ python tests/scripts/bench_block_storage.py --blocks 10000 50000 100000
+"""
+
+import argparse
+from time import perf_counter
+from types import SimpleNamespace
+from tempfile import TemporaryDirectory
+
+import trio
+
+from guardata.crypto import SecretKey
+from guardata.client.types import ChunkID, DEFAULT_BLOCK_SIZE
+from guardata.client.fs.storage.local_database import LocalDatabase
+from guardata.client.fs.storage.chunk_storage import BlockStorage
+
+
+BLOCK_DATA = b"\x00" * 64
+
+
+async def bench(nb_blocks, nb_ops):
+    device = SimpleNamespace(local_symkey=SecretKey.generate())
+    cache_size = nb_blocks * DEFAULT_BLOCK_SIZE
+    with TemporaryDirectory(prefix="guardata-bench-") as tmpdir:
+        async with LocalDatabase.run(f"{tmpdir}/cache.sqlite") as localdb:
+            async with BlockStorage.run(device, localdb, cache_size=cache_size) as storage:
+
+                # Fill the cache
+                chunk_ids = [ChunkID() for _ in range(nb_blocks)]
+                for chunk_id in chunk_ids:
+                    await storage.set_chunk(chunk_id, BLOCK_DATA)
+
+                # Read blocks from the full cache
+                start = perf_counter()
+                for chunk_id in chunk_ids[:nb_ops]:
+                    await storage.get_chunk(chunk_id)
+                read_time = perf_counter() - start
+
+                # Insert blocks in the full cache, triggering the garbage collection
+                start = perf_counter()
+                for _ in range(nb_ops):
+                    await storage.set_chunk(ChunkID(), BLOCK_DATA)
+                insert_time = perf_counter() - start
+
+    print(
+        f"{nb_blocks:>8} blocks: "
+        f"read {read_time / nb_ops * 1e6:8.1f} us/op, "
+        f"insert {insert_time / nb_ops * 1e6:8.1f} us/op"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--ops", type=int, default=1000)
+    args = parser.parse_args()
+    for nb_blocks in args.blocks:
+        trio.run(bench, nb_blocks, args.ops)
+
+
+if __name__ == "__main__":
+    main()
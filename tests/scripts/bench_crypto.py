@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Micro-benchmarks of the symmetric encryption used for manifests, chunks and
+blocks:
+
+- single: one buffer with a new `SecretBox` each time (previous behavior)
+  against `SecretKey.encrypt`/`decrypt`
+- batch: many buffers one by one against `SecretKey.encrypt_batch`/
+  `decrypt_batch`, with and without a thread pool
+
+    $ python tests/scripts/bench_crypto.py --workers 4
+"""
+
+import argparse
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+from guardata.crypto import SecretKey
+from guardata.crypto.secretbox2 import SecretBox
+
+
+def timeit(fn, min_duration):
+    runs = 0
+    start = perf_counter()
+    while True:
+        fn()
+        runs += 1
+        duration = perf_counter() - start
+        if duration >= min_duration:
+            return duration / runs
+
+
+def print_results(name, results):
+    reference = results[0][1]
+    line = f"{name:<34}"
+    for label, duration in results:
+        line += f" | {label} {duration * 1e6:10.1f} us (x{reference / duration:4.1f})"
+    print(line)
+
+
+def bench_single(key, min_duration):
+    for size in (64, 4 * 1024, 512 * 1024):
+        for type_name, data in (("bytes", bytes(size)), ("bytearray", bytearray(size))):
+            ciphered = key.encrypt(data)
+            print_results(
+                f"encrypt {size} B {type_name}",
+                [
+                    ("new box", timeit(lambda: SecretBox(key).encrypt(data), min_duration)),
+                    ("cached", timeit(lambda: key.encrypt(data), min_duration)),
+                ],
+            )
+            print_results(
+                f"decrypt {size} B {type_name}",
+                [
+                    ("new box", timeit(lambda: SecretBox(key).decrypt(ciphered), min_duration)),
+                    ("cached", timeit(lambda: key.decrypt(ciphered), min_duration)),
+                ],
+            )
+
+
+def bench_batch(key, executor, min_duration):
+    for name, count, size in (("manifests", 512, 4 * 1024), ("blocks", 32, 512 * 1024)):
+        items = [bytes(size)] * count
+        ciphereds = key.encrypt_batch(items)
+        for operation, items, single, batch in (
+            ("encrypt", items, lambda d: SecretBox(key).encrypt(d), key.encrypt_batch),
+            ("decrypt", ciphereds, lambda d: SecretBox(key).decrypt(d), key.decrypt_batch),
+        ):
+            print_results(
+                f"{operation} {count} {name} of {size} B",
+                [
+                    ("loop", timeit(lambda: [single(item) for item in items], min_duration)),
+                    ("batch", timeit(lambda: batch(items), min_duration)),
+                    ("pool", timeit(lambda: batch(items, executor=executor), min_duration)),
+                ],
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--min-duration", type=float, default=0.5)
+    args = parser.parse_args()
+    key = SecretKey.generate()
+    bench_single(key, args.min_duration)
+    print()
+    with ThreadPoolExecutor(args.workers) as executor:
+        bench_batch(key, executor, args.min_duration)
+
+
+if __name__ == "__main__":
+    main()
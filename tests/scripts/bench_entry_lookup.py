@@ -0,0 +1,140 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the cost of resolving paths in a workspace, with and without the
+path resolution cache:
+
+- deep trees: resolving a file at the bottom of a chain of folders
+- stat storms: many threads requesting the entry info of every file of a tree,
+  the way the FUSE mountpoint does it during a `ls -lR` or a build
+
+    $ python tests/scripts/bench_entry_lookup.py --depths 5 10 20 --threads 8
+"""
+
+import argparse
+from time import perf_counter
+from types import SimpleNamespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import trio
+from pendulum import now as pendulum_now
+
+from guardata.logging import configure_logging
+from guardata.event_bus import EventBus
+from guardata.crypto import SecretKey
+from guardata.api.protocol import DeviceID
+from guardata.client.types import FsPath, EntryID, WorkspaceEntry, LocalWorkspaceManifest
+from guardata.client.fs.storage import WorkspaceStorage
+from guardata.client.fs.workspacefs.entry_transactions import EntryTransactions
+from guardata.client.mountpoint.thread_fs_access import ThreadFSAccess
+
+
+def disable_cache(storage):
+    storage.get_cached_child = lambda parent_id, name: None
+    storage.set_cached_child = lambda parent_id, name, child_id, confined: None
+
+
+async def build_transactions(device, storage):
+    workspace_entry = WorkspaceEntry.new("w")
+    manifest = LocalWorkspaceManifest.new_placeholder(
+        device.device_id, id=workspace_entry.id, now=pendulum_now()
+    )
+    async with storage.lock_entry_id(workspace_entry.id):
+        await storage.set_manifest(workspace_entry.id, manifest)
+    return EntryTransactions(
+        workspace_entry.id, lambda: workspace_entry, device, storage, None, EventBus()
+    )
+
+
+async def bench_deep_tree(device, tmpdir, depth, nb_ops, cached):
+    async with WorkspaceStorage.run(device, Path(tmpdir) / str(EntryID()), EntryID()) as storage:
+        if not cached:
+            disable_cache(storage)
+        transactions = await build_transactions(device, storage)
+        path = FsPath("/")
+        for i in range(depth):
+            path = path / f"folder{i}"
+            await transactions.folder_create(path)
+        path = path / "file"
+        _, fd = await transactions.file_create(path)
+        await transactions.fd_close(fd)
+
+        start = perf_counter()
+        for _ in range(nb_ops):
+            await transactions.entry_info(path)
+        return (perf_counter() - start) / nb_ops
+
+
+async def bench_stat_storm(device, tmpdir, nb_threads, nb_folders, nb_files, cached):
+    async with WorkspaceStorage.run(device, Path(tmpdir) / str(EntryID()), EntryID()) as storage:
+        if not cached:
+            disable_cache(storage)
+        transactions = await build_transactions(device, storage)
+        paths = []
+        for i in range(nb_folders):
+            folder = FsPath(f"/a/b/folder{i}")
+            if i == 0:
+                await transactions.folder_create(FsPath("/a"))
+                await transactions.folder_create(FsPath("/a/b"))
+            await transactions.folder_create(folder)
+            for j in range(nb_files):
+                _, fd = await transactions.file_create(folder / f"file{j}")
+                await transactions.fd_close(fd)
+                paths.append(folder / f"file{j}")
+
+        # Each thread stats every file, as the kernel does for concurrent `ls -lR`
+        fs_access = ThreadFSAccess(
+            trio.lowlevel.current_trio_token(), SimpleNamespace(transactions=transactions)
+        )
+
+        def _stat_all():
+            for path in paths:
+                fs_access.entry_info(path)
+
+        start = perf_counter()
+        async with trio.open_nursery() as nursery:
+            for _ in range(nb_threads):
+                nursery.start_soon(trio.to_thread.run_sync, _stat_all)
+        return nb_threads * len(paths) / (perf_counter() - start)
+
+
+async def main_async(args):
+    device = SimpleNamespace(device_id=DeviceID.new(), local_symkey=SecretKey.generate())
+    with TemporaryDirectory(prefix="guardata-bench-") as tmpdir:
+        for depth in args.depths:
+            results = [
+                await bench_deep_tree(device, tmpdir, depth, args.ops, cached)
+                for cached in (False, True)
+            ]
+            print(
+                f"depth {depth:>3}: "
+                f"uncached {results[0] * 1e6:8.1f} us/op, "
+                f"cached {results[1] * 1e6:8.1f} us/op"
+            )
+
+        results = [
+            await bench_stat_storm(device, tmpdir, args.threads, args.folders, args.files, cached)
+            for cached in (False, True)
+        ]
+        print(
+            f"stat storm ({args.threads} threads, {args.folders * args.files} files): "
+            f"uncached {results[0]:8.0f} stat/s, cached {results[1]:8.0f} stat/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depths", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--folders", type=int, default=10)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    trio.run(main_async, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the cost of dispatching a realm vlobs updated event to many connected
+clients subscribed to backend events, compared with connecting a filtering
+callback per client on the event bus:
+
+    $ python tests/scripts/bench_event_routing.py --subscribers 1000 20000 --organizations 10
+"""
+
+import math
+import argparse
+from uuid import uuid4
+from time import perf_counter
+
+import trio
+import structlog
+
+from guardata.logging import configure_logging
+from guardata.event_bus import EventBus
+from guardata.api.protocol import OrganizationID, DeviceID, APIEvent
+from backendService.backend_events import BackendEvent
+from backendService.events import EventsComponent
+
+
+class FakeRealmComponent:
+    def __init__(self, realms_per_user):
+        self._realms_per_user = realms_per_user
+
+    async def get_realms_for_user(self, organization_id, user_id):
+        return self._realms_per_user[(organization_id, user_id)]
+
+
+class FakeClientContext:
+    def __init__(self, organization_id, device_id):
+        self.organization_id = organization_id
+        self.device_id = device_id
+        self.user_id = device_id.user_id
+        self.realms = set()
+        self.events_subscribed = False
+        self.send_events_channel, self.receive_events_channel = trio.open_memory_channel(math.inf)
+        self.logger = structlog.get_logger()
+
+
+def build_clients(nb_subscribers, nb_organizations, nb_realms):
+    organizations = [OrganizationID(f"Org{i}") for i in range(nb_organizations)]
+    realms = [uuid4() for _ in range(nb_realms)]
+    realms_per_user = {}
+    clients = []
+    for i in range(nb_subscribers):
+        client_ctx = FakeClientContext(organizations[i % nb_organizations], DeviceID.new())
+        realm_id = realms[(i // nb_organizations) % nb_realms]
+        realms_per_user[(client_ctx.organization_id, client_ctx.user_id)] = {realm_id: None}
+        clients.append(client_ctx)
+    return organizations[0], realms[0], realms_per_user, clients
+
+
+def connect_filtering_callbacks(event_bus, clients):
+    # Previous approach: each client filters every event sent on the bus
+    for client_ctx in clients:
+
+        def _on_realm_events(
+            event, organization_id, author, realm_id, client_ctx=client_ctx, **kwargs
+        ):
+            if (
+                organization_id != client_ctx.organization_id
+                or author == client_ctx.device_id
+                or realm_id not in client_ctx.realms
+            ):
+                return
+            client_ctx.send_events_channel.send_nowait(
+                {"event": APIEvent.REALM_VLOBS_UPDATED, "realm_id": realm_id, **kwargs}
+            )
+
+        event_bus.connect(BackendEvent.REALM_VLOBS_UPDATED, _on_realm_events)
+
+
+def drain(clients):
+    received = 0
+    for client_ctx in clients:
+        while True:
+            try:
+                client_ctx.receive_events_channel.receive_nowait()
+            except trio.WouldBlock:
+                break
+            received += 1
+    return received
+
+
+def bench_dispatch(event_bus, clients, organization_id, realm_id, nb_ops):
+    author = DeviceID.new()
+    start = perf_counter()
+    for i in range(nb_ops):
+        event_bus.send(
+            BackendEvent.REALM_VLOBS_UPDATED,
+            organization_id=organization_id,
+            author=author,
+            realm_id=realm_id,
+            checkpoint=i,
+            src_id=realm_id,
+            src_version=i,
+        )
+    duration = perf_counter() - start
+    return duration / nb_ops, drain(clients) // nb_ops
+
+
+async def bench(nb_subscribers, args):
+    organization_id, realm_id, realms_per_user, clients = build_clients(
+        nb_subscribers, args.organizations, args.realms
+    )
+
+    # Filtering callbacks
+    event_bus = EventBus()
+    for client_ctx in clients:
+        client_ctx.realms = set(realms_per_user[(client_ctx.organization_id, client_ctx.user_id)])
+    connect_filtering_callbacks(event_bus, clients)
+    filtered, nb_interested = bench_dispatch(
+        event_bus, clients, organization_id, realm_id, args.ops
+    )
+
+    # Routing index
+    event_bus = EventBus()
+    events = EventsComponent(FakeRealmComponent(realms_per_user), event_bus)
+    for client_ctx in clients:
+        await events.api_events_subscribe(client_ctx, {"cmd": "events_subscribe"})
+    routed, routed_interested = bench_dispatch(
+        event_bus, clients, organization_id, realm_id, args.ops
+    )
+    assert routed_interested == nb_interested
+
+    print(
+        f"{nb_subscribers:>6} subscribers ({nb_interested} interested): "
+        f"filtering {filtered * 1e6:9.1f} us/event, routed {routed * 1e6:7.1f} us/event"
+    )
+
+
+async def main_async(args):
+    for nb_subscribers in args.subscribers:
+        await bench(nb_subscribers, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--organizations", type=int, default=10)
+    parser.add_argument("--realms", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=100)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    trio.run(main_async, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPLv3 2019 Scille SAS
 
 
+import os
 import signal
+import threading
 from pathlib import Path
-from time import sleep
+from time import sleep, perf_counter
 from tempfile import mkdtemp
 from subprocess import run, Popen, PIPE
 from contextlib import contextmanager
@@ -20,6 +22,9 @@ PASSWORD = "P2ssxdor!s3."
 GUARDATA_CLI = "python3 -m guardata.cli"
 GUARDATA_PROFILE_CLI = "python3 -m cProfile -o bench.prof -m guardata.cli"
 
+PARALLEL_READERS = (1, 2, 4, 8)
+READ_SIZE = 128 * 1024
+
 
 def run_cmd(cmd):
     print(f"---> {cmd}")
@@ -31,6 +36,51 @@ def run_cmd(cmd):
     return out
 
 
+def bench_parallel_readers(w1dir, nb_readers):
+    """Read a file from several threads while measuring the latency of `stat`
+    on the mountpoint, which shouldn't be blocked by the reads."""
+    path = w1dir / "sample"
+    read_bytes = [0] * nb_readers
+    readers_done = threading.Event()
+
+    def _read(index):
+        with open(path, "rb", buffering=0) as f:
+            # Start each reader at a different place to avoid sharing blocks
+            f.seek(index * path.stat().st_size // nb_readers)
+            while True:
+                data = f.read(READ_SIZE)
+                if not data:
+                    break
+                read_bytes[index] += len(data)
+
+    readers = [threading.Thread(target=_read, args=(i,)) for i in range(nb_readers)]
+    start = perf_counter()
+    for reader in readers:
+        reader.start()
+
+    def _join_readers():
+        for reader in readers:
+            reader.join()
+        readers_done.set()
+
+    threading.Thread(target=_join_readers).start()
+    stat_latencies = []
+    while not readers_done.is_set():
+        stat_start = perf_counter()
+        os.stat(w1dir)
+        os.listdir(w1dir)
+        stat_latencies.append(perf_counter() - stat_start)
+        sleep(0.01)
+    duration = perf_counter() - start
+
+    throughput = sum(read_bytes) / duration / 1024 ** 2
+    max_latency = max(stat_latencies, default=0) * 1e3
+    print(
+        f"{nb_readers} reader(s): {throughput:.1f} MB/s, "
+        f"stat+listdir latency max {max_latency:.1f} ms over {len(stat_latencies)} calls"
+    )
+
+
 @contextmanager
 def keep_running_cmd(cmd):
     print(f"===> {cmd}")
@@ -105,6 +155,12 @@ def main():
                 print("********** starting bench ***********")
                 run(f"time pv {file} > {mountdir}/w1/sample", shell=True)
                 print("********** bench done ***********")
+
+                # Read it back from concurrent readers
+                print("********** starting parallel readers bench ***********")
+                for nb_readers in PARALLEL_READERS:
+                    bench_parallel_readers(w1dir, nb_readers)
+                print("********** parallel readers bench done ***********")
             finally:
                 file.unlink()
 
@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the throughput and the end-to-end latency of the backend events sent
+through PostgreSQL notifications, with several backend processes listening
+and several numbers of events sent per transaction (`--coalesce` sends the
+events of a transaction as a single notification):
+
+    $ python tests/scripts/bench_pg_notify.py --db postgresql://localhost/guardata \\
+        --listeners 4 --events 20000 --batches 1 10 100 --coalesce
+"""
+
+import argparse
+import multiprocessing
+from time import time
+from statistics import median
+
+import trio
+import triopg
+
+from guardata.utils import trio_run
+from guardata.logging import configure_logging
+from guardata.event_bus import EventBus
+from backendService.backend_events import BackendEvent
+from backendService.postgresql import handler
+from backendService.postgresql.handler import PGHandler, batch_signals, send_signal
+
+
+async def listen(url, nb_events, ready, results):
+    event_bus = EventBus()
+    # Only used to decode the notifications as the backend does
+    dbh = PGHandler(url, 1, 1, 1, 1, event_bus)
+    latencies = []
+    done = trio.Event()
+
+    def _on_pinged(event, organization_id, author, ping):
+        latencies.append(time() - float(ping))
+        if len(latencies) == nb_events:
+            done.set()
+
+    event_bus.connect(BackendEvent.PINGED, _on_pinged)
+    async with triopg.connect(url) as conn:
+        await conn.add_listener("app_notification", dbh._on_notification)
+        ready.set()
+        await done.wait()
+    results.put((time(), latencies))
+
+
+def run_listener(url, nb_events, ready, results):
+    configure_logging("WARNING")
+    trio_run(listen, url, nb_events, ready, results, use_asyncio=True)
+
+
+async def send_events(conn, nb_events, batch_size):
+    for i in range(0, nb_events, batch_size):
+        async with conn.transaction():
+            async with batch_signals(conn):
+                for _ in range(min(batch_size, nb_events - i)):
+                    await send_signal(
+                        conn,
+                        BackendEvent.PINGED,
+                        organization_id="BenchOrg",
+                        author="bench@dev1",
+                        ping=repr(time()),
+                    )
+
+
+async def bench(args, batch_size):
+    results = multiprocessing.Queue()
+    listeners = []
+    for _ in range(args.listeners):
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=run_listener, args=(args.db, args.events, ready, results)
+        )
+        process.start()
+        listeners.append((process, ready))
+    for _, ready in listeners:
+        await trio.to_thread.run_sync(ready.wait)
+
+    async with triopg.connect(args.db) as conn:
+        start = time()
+        await send_events(conn, args.events, batch_size)
+        sent = time()
+
+    ends = []
+    latencies = []
+    for _ in listeners:
+        end, listener_latencies = await trio.to_thread.run_sync(results.get)
+        ends.append(end)
+        latencies += listener_latencies
+    for process, _ in listeners:
+        await trio.to_thread.run_sync(process.join)
+
+    latencies.sort()
+    print(
+        f"{batch_size:>4} events/transaction: "
+        f"sent {args.events / (sent - start):8.0f} events/s, "
+        f"received {args.events / (max(ends) - start):8.0f} events/s per listener, "
+        f"latency median {median(latencies) * 1000:7.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms"
+    )
+
+
+async def main_async(args):
+    for batch_size in args.batches:
+        await bench(args, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--listeners", type=int, default=4)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--coalesce", action="store_true")
+    args = parser.parse_args()
+    # Same as `--db-coalesce-notifications` on the backend
+    handler._coalesce_notifications = args.coalesce
+    configure_logging("WARNING")
+    # The PostgreSQL driver runs on top of asyncio
+    trio_run(main_async, args, use_asyncio=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the vlob_create/vlob_update throughput of concurrent writers sharing a
+single realm, which all need a new checkpoint of this realm for each write.
+
+The backend components are called directly to leave the network out of the
+measure. Run it against a migrated PostgreSQL database to measure the
+checkpoint allocation (the default in-memory database gives a reference):
+
+    $ guardata backend migrate --db postgresql://localhost/guardata
+    $ python tests/scripts/bench_realm_checkpoint.py --db postgresql://localhost/guardata
+"""
+
+import argparse
+from uuid import uuid4
+from time import perf_counter
+
+import trio
+import pendulum
+
+from backendService.app import backend_app_factory
+from backendService.config import BackendConfig, MockedBlockStoreConfig
+from backendService.realm import RealmGrantedRole
+from guardata.utils import trio_run
+from guardata.logging import configure_logging
+from guardata.api.protocol import OrganizationID, RealmRole
+from guardata.client.types import BackendAddr, BackendOrganizationBootstrapAddr
+from guardata.client.backend_connection import (
+    apiv1_backend_administration_cmds_factory,
+    apiv1_backend_anonymous_cmds_factory,
+)
+from guardata.client.invite import bootstrap_organization
+
+
+ADMINISTRATION_TOKEN = "s3cr3t"
+BLOB = b"\x00" * 512
+
+
+async def bootstrap_device(backend_addr, organization_id):
+    async with apiv1_backend_administration_cmds_factory(
+        backend_addr, ADMINISTRATION_TOKEN
+    ) as administration_cmds:
+        rep = await administration_cmds.organization_create(organization_id)
+        assert rep["status"] == "ok"
+    bootstrap_addr = BackendOrganizationBootstrapAddr.build(
+        backend_addr, organization_id, rep["bootstrap_token"]
+    )
+    async with apiv1_backend_anonymous_cmds_factory(bootstrap_addr) as anonymous_cmds:
+        return await bootstrap_organization(
+            cmds=anonymous_cmds, human_handle=None, device_label="bench"
+        )
+
+
+async def bench_realm_checkpoint(backend, device, nb_writers, nb_ops):
+    realm_id = uuid4()
+    await backend.realm.create(
+        device.organization_id,
+        RealmGrantedRole(
+            certificate=b"<dummy>",
+            realm_id=realm_id,
+            user_id=device.user_id,
+            role=RealmRole.OWNER,
+            granted_by=device.device_id,
+        ),
+    )
+
+    async def _writer(nb_vlobs):
+        # Each vlob is created, then updated once
+        for _ in range(nb_vlobs):
+            vlob_id = uuid4()
+            await backend.vlob.create(
+                device.organization_id,
+                device.device_id,
+                realm_id,
+                1,
+                vlob_id,
+                pendulum.now(),
+                BLOB,
+            )
+            await backend.vlob.update(
+                device.organization_id, device.device_id, 1, vlob_id, 2, pendulum.now(), BLOB
+            )
+
+    nb_vlobs = nb_ops // (2 * nb_writers)
+    start = perf_counter()
+    async with trio.open_nursery() as nursery:
+        for _ in range(nb_writers):
+            nursery.start_soon(_writer, nb_vlobs)
+    duration = perf_counter() - start
+
+    checkpoint, changes = await backend.vlob.poll_changes(
+        device.organization_id, device.device_id, realm_id, 0
+    )
+    nb_writes = 2 * nb_vlobs * nb_writers
+    assert checkpoint == nb_writes
+    assert len(changes) == nb_vlobs * nb_writers
+
+    print(f"{nb_writers:>3} writer(s): {nb_writes / duration:8.0f} writes/s ({nb_writes} writes)")
+
+
+async def main_async(args):
+    listeners = await trio.open_tcp_listeners(0, host="127.0.0.1")
+    port = listeners[0].socket.getsockname()[1]
+    backend_addr = BackendAddr.from_url(f"parsec://127.0.0.1:{port}?no_ssl=true")
+    config = BackendConfig(
+        administration_token=ADMINISTRATION_TOKEN,
+        db_url=args.db,
+        db_min_connections=args.db_connections,
+        db_max_connections=args.db_connections,
+        db_first_tries_number=1,
+        db_first_tries_sleep=1,
+        blockstore_config=MockedBlockStoreConfig(),
+        email_config=None,
+        backend_addr=backend_addr,
+        spontaneous_organization_bootstrap=False,
+        organization_bootstrap_webhook_url=None,
+        debug=False,
+    )
+    async with backend_app_factory(config) as backend:
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(trio.serve_listeners, backend.handle_client, listeners)
+
+            organization_id = OrganizationID(f"BenchOrg{uuid4().hex[:8]}")
+            device = await bootstrap_device(backend_addr, organization_id)
+            for nb_writers in args.writers:
+                await bench_realm_checkpoint(backend, device, nb_writers, args.ops)
+
+            nursery.cancel_scope.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="MOCKED")
+    parser.add_argument("--db-connections", type=int, default=32)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--ops", type=int, default=4096)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    # The PostgreSQL driver runs on top of asyncio
+    trio_run(main_async, args, use_asyncio=args.db != "MOCKED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Compare the marshmallow path with the generated (de)serialization code of
+`guardata.serde.compiled` on the hot data types, the manifests being built
+with the given number of blocks or children:
+
+    $ python tests/scripts/bench_serde.py --entries 2000
+"""
+
+import argparse
+from uuid import uuid4
+from time import perf_counter
+
+from pendulum import now as pendulum_now
+
+from guardata.crypto import SecretKey, HashDigest
+from guardata.serde import packb, unpackb
+from guardata.api.protocol import DeviceID, vlob_read_serializer, block_read_serializer
+from guardata.api.data import (
+    EntryID,
+    BlockAccess,
+    FileManifest,
+    FolderManifest,
+    WorkspaceManifest,
+)
+from guardata.api.data.manifest import BlockID
+
+
+def build_block_access(index, blocksize):
+    return BlockAccess(
+        id=BlockID(),
+        key=SecretKey.generate(),
+        offset=index * blocksize,
+        size=blocksize,
+        digest=HashDigest.from_data(str(index).encode()),
+        segment_size=None,
+    )
+
+
+def build_cases(nb_entries):
+    now = pendulum_now()
+    author = DeviceID("alice@dev1")
+    blocksize = 512 * 1024
+    children = {f"child{i}": EntryID() for i in range(nb_entries)}
+    file_manifest = FileManifest(
+        author=author,
+        timestamp=now,
+        id=EntryID(),
+        parent=EntryID(),
+        version=1,
+        created=now,
+        updated=now,
+        size=nb_entries * blocksize,
+        blocksize=blocksize,
+        blocks=tuple(build_block_access(i, blocksize) for i in range(nb_entries)),
+    )
+    folder_manifest = FolderManifest(
+        author=author,
+        timestamp=now,
+        id=EntryID(),
+        parent=EntryID(),
+        version=1,
+        created=now,
+        updated=now,
+        children=children,
+    )
+    workspace_manifest = WorkspaceManifest(
+        author=author,
+        timestamp=now,
+        id=EntryID(),
+        version=1,
+        created=now,
+        updated=now,
+        children=children,
+    )
+    vlob_read_rep = {
+        "status": "ok",
+        "version": 1,
+        "blob": b"x" * 1024,
+        "author": author,
+        "timestamp": now,
+    }
+    block_read_rep = {"status": "ok", "block": b"x" * blocksize}
+    vlob_id = uuid4()
+    return [
+        (f"FileManifest ({nb_entries} blocks)", FileManifest.SERIALIZER, file_manifest),
+        (f"FolderManifest ({nb_entries} children)", FolderManifest.SERIALIZER, folder_manifest),
+        (
+            f"WorkspaceManifest ({nb_entries} children)",
+            WorkspaceManifest.SERIALIZER,
+            workspace_manifest,
+        ),
+        ("BlockAccess", BlockAccess.SERIALIZER, file_manifest.blocks[0]),
+        ("vlob_read rep", vlob_read_serializer._rep_serializer, vlob_read_rep),
+        ("block_read rep", block_read_serializer._rep_serializer, block_read_rep),
+        (
+            "vlob_read req",
+            vlob_read_serializer._req_serializer,
+            {"cmd": "vlob_read", "encryption_revision": 1, "vlob_id": vlob_id, "version": 1},
+        ),
+    ]
+
+
+def timeit(fn, arg, min_duration):
+    runs = 0
+    start = perf_counter()
+    while True:
+        fn(arg)
+        runs += 1
+        duration = perf_counter() - start
+        if duration >= min_duration:
+            return duration / runs
+
+
+def bench_case(name, serializer, obj, min_duration):
+    # Go through msgpack to load the same data than the one received
+    data = unpackb(packb(serializer.dump(obj)))
+    assert serializer.load(data) == serializer.schema.load(data).data
+    assert serializer.dump(obj) == serializer.schema.dump(obj).data
+
+    for operation, marshmallow_fn, compiled_fn, arg in (
+        ("load", lambda d: serializer.schema.load(d).data, serializer.load, data),
+        ("dump", lambda o: serializer.schema.dump(o).data, serializer.dump, obj),
+    ):
+        marshmallow_time = timeit(marshmallow_fn, arg, min_duration)
+        compiled_time = timeit(compiled_fn, arg, min_duration)
+        print(
+            f"{name:<34} {operation}: marshmallow {marshmallow_time * 1e6:10.1f} us, "
+            f"compiled {compiled_time * 1e6:10.1f} us "
+            f"(x{marshmallow_time / compiled_time:.1f})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--min-duration", type=float, default=0.5)
+    args = parser.parse_args()
+    for name, serializer, obj in build_cases(args.entries):
+        bench_case(name, serializer, obj, args.min_duration)
+
+
+if __name__ == "__main__":
+    main()
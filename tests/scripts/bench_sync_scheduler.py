@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the cost of tracking a local change in the sync monitor while a large
+number of entries are already waiting to be synchronized, the way it happens
+when a big folder tree is copied into a workspace:
+
+    $ python tests/scripts/bench_sync_scheduler.py --pending 1000 100000 300000
+"""
+
+import argparse
+from time import perf_counter
+
+import trio
+import trio.testing
+
+from guardata.logging import configure_logging
+from guardata.client.types import EntryID
+from guardata.client.sync_monitor import MIN_WAIT, SyncContext
+
+
+async def bench_scheduler(nb_pending, nb_ops):
+    ctx = SyncContext(user_fs=None, id=EntryID())
+    ctx._changes_loaded = True
+    for _ in range(nb_pending):
+        ctx.set_local_change(EntryID())
+
+    # Let the pending entries become due, then schedule them
+    await trio.sleep(MIN_WAIT)
+    start = perf_counter()
+    await ctx.schedule()
+    schedule_duration = perf_counter() - start
+
+    # Each operation is a modification followed by a scheduling round
+    entry_ids = [EntryID() for _ in range(nb_ops)]
+    start = perf_counter()
+    for entry_id in entry_ids:
+        ctx.set_local_change(entry_id)
+        await ctx.schedule()
+    change_duration = (perf_counter() - start) / nb_ops
+
+    start = perf_counter()
+    while ctx.get_ready_priority() is not None:
+        ctx.pop_ready_entry()
+    pop_duration = (perf_counter() - start) / nb_pending
+
+    print(
+        f"{nb_pending:>8} pending: schedule all {schedule_duration * 1e3:8.1f} ms, "
+        f"change {change_duration * 1e6:6.2f} us/op, pop {pop_duration * 1e6:6.2f} us/op"
+    )
+
+
+async def main_async(args):
+    for nb_pending in args.pending:
+        await bench_scheduler(nb_pending, args.ops)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pending", type=int, nargs="+", default=[1000, 10000, 100000, 300000])
+    parser.add_argument("--ops", type=int, default=10000)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    trio.run(main_async, args, clock=trio.testing.MockClock(autojump_threshold=0))
+
+
+if __name__ == "__main__":
+    main()
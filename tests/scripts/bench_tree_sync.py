@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the first synchronization of a folder tree full of new files against
+an in-process memory backend, for several numbers of concurrent sync workers.
+
+A latency can be added to each backend request to emulate a remote backend:
+
+    $ python tests/scripts/bench_tree_sync.py --folders 10 --files 100 --latency 0.02
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter
+from tempfile import TemporaryDirectory
+
+import trio
+
+from backendService.app import backend_app_factory
+from backendService.config import BackendConfig, MockedBlockStoreConfig
+from guardata.logging import configure_logging
+from guardata.event_bus import EventBus
+from guardata.api.protocol import OrganizationID
+from guardata.client.types import BackendAddr, BackendOrganizationBootstrapAddr
+from guardata.client.backend_connection import (
+    BackendAuthenticatedConn,
+    apiv1_backend_administration_cmds_factory,
+    apiv1_backend_anonymous_cmds_factory,
+)
+from guardata.client.invite import bootstrap_organization
+from guardata.client.logged_client import get_pattern_filter
+from guardata.client.remote_devices_manager import RemoteDevicesManager
+from guardata.client.fs.userfs import UserFS
+
+
+ADMINISTRATION_TOKEN = "s3cr3t"
+
+
+def add_latency(workspace, latency):
+    vanilla_backend_cmds = workspace.remote_loader._backend_cmds
+
+    async def _backend_cmds(cmd, *args, **kwargs):
+        await trio.sleep(latency)
+        return await vanilla_backend_cmds(cmd, *args, **kwargs)
+
+    workspace.remote_loader._backend_cmds = _backend_cmds
+
+
+async def bootstrap_device(backend_addr):
+    organization_id = OrganizationID("BenchOrg")
+    async with apiv1_backend_administration_cmds_factory(
+        backend_addr, ADMINISTRATION_TOKEN
+    ) as administration_cmds:
+        rep = await administration_cmds.organization_create(organization_id)
+        assert rep["status"] == "ok"
+    bootstrap_addr = BackendOrganizationBootstrapAddr.build(
+        backend_addr, organization_id, rep["bootstrap_token"]
+    )
+    async with apiv1_backend_anonymous_cmds_factory(bootstrap_addr) as anonymous_cmds:
+        return await bootstrap_organization(
+            cmds=anonymous_cmds, human_handle=None, device_label="bench"
+        )
+
+
+async def bench_tree_sync(user_fs, nb_folders, nb_files, nb_workers, latency):
+    workspace_id = await user_fs.workspace_create(f"w{nb_workers}")
+    workspace = user_fs.get_workspace(workspace_id)
+    for i in range(nb_folders):
+        await workspace.mkdir(f"/folder{i}")
+        for j in range(nb_files):
+            await workspace.write_bytes(f"/folder{i}/file{j}", b"x" * 1024)
+
+    workspace.remote_loader.max_block_transfers = nb_workers
+    add_latency(workspace, latency)
+
+    nb_synced = 0
+
+    def _progress(synced, total):
+        nonlocal nb_synced
+        nb_synced = synced
+
+    start = perf_counter()
+    await workspace.sync(progress=_progress)
+    duration = perf_counter() - start
+
+    print(
+        f"{nb_workers:>3} worker(s): {duration:7.2f} s, "
+        f"{nb_synced / duration:8.1f} entries/s ({nb_synced} entries)"
+    )
+
+
+async def main_async(args):
+    listeners = await trio.open_tcp_listeners(0, host="127.0.0.1")
+    port = listeners[0].socket.getsockname()[1]
+    backend_addr = BackendAddr.from_url(f"parsec://127.0.0.1:{port}?no_ssl=true")
+    config = BackendConfig(
+        administration_token=ADMINISTRATION_TOKEN,
+        db_url="MOCKED",
+        db_min_connections=1,
+        db_max_connections=5,
+        db_first_tries_number=1,
+        db_first_tries_sleep=1,
+        blockstore_config=MockedBlockStoreConfig(),
+        email_config=None,
+        backend_addr=backend_addr,
+        spontaneous_organization_bootstrap=False,
+        organization_bootstrap_webhook_url=None,
+        debug=False,
+    )
+    with TemporaryDirectory(prefix="guardata-bench-") as tmpdir:
+        async with backend_app_factory(config) as backend:
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(trio.serve_listeners, backend.handle_client, listeners)
+
+                device = await bootstrap_device(backend_addr)
+                event_bus = EventBus()
+                backend_conn = BackendAuthenticatedConn(
+                    device.organization_addr, device.device_id, device.signing_key, event_bus
+                )
+                remote_devices_manager = RemoteDevicesManager(
+                    backend_conn.cmds, device.root_verify_key
+                )
+                async with backend_conn.run():
+                    async with UserFS.run(
+                        device,
+                        Path(tmpdir) / "data",
+                        backend_conn.cmds,
+                        remote_devices_manager,
+                        event_bus,
+                        get_pattern_filter(),
+                    ) as user_fs:
+                        for nb_workers in args.workers:
+                            await bench_tree_sync(
+                                user_fs, args.folders, args.files, nb_workers, args.latency
+                            )
+
+                nursery.cancel_scope.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--folders", type=int, default=10)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    trio.run(main_async, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Measure the retrieval of every device of a large organization through the
+remote devices manager, the way a client does it when loading manifests
+authored by many users:
+
+- cold: the client never verified any certificate
+- warm: the client restarted with the certificates verified in a previous run
+
+    $ python tests/scripts/bench_trustchain.py --users 5000
+"""
+
+import argparse
+from time import perf_counter
+from types import SimpleNamespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import trio
+from pendulum import now as pendulum_now
+
+from guardata.logging import configure_logging
+from guardata.crypto import SigningKey, PrivateKey, SecretKey
+from guardata.api.protocol import DeviceID
+from guardata.api.data import UserCertificateContent, DeviceCertificateContent, UserProfile
+from guardata.client.fs.storage import CertificateStorage
+from guardata.client.remote_devices_manager import RemoteDevicesManager
+
+
+def certify(author_id, author_signing_key, device_id, profile):
+    now = pendulum_now()
+    signing_key = SigningKey.generate()
+    user_certificate = UserCertificateContent(
+        author=author_id,
+        timestamp=now,
+        user_id=device_id.user_id,
+        human_handle=None,
+        public_key=PrivateKey.generate().public_key,
+        profile=profile,
+    ).dump_and_sign(author_signing_key)
+    device_certificate = DeviceCertificateContent(
+        author=author_id,
+        timestamp=now,
+        device_id=device_id,
+        device_label=None,
+        verify_key=signing_key.verify_key,
+    ).dump_and_sign(author_signing_key)
+    return signing_key, user_certificate, device_certificate
+
+
+class FakeBackendCmds:
+    """Reply to `user_get` the way the backend does for an organization whose
+    users have all been created by the same admin."""
+
+    def __init__(self, nb_users):
+        self.root_signing_key = SigningKey.generate()
+        admin_id = DeviceID("admin@dev1")
+        admin_signing_key, admin_user, admin_device = certify(
+            None, self.root_signing_key, admin_id, UserProfile.ADMIN
+        )
+        self.trustchain = {"users": [admin_user], "revoked_users": [], "devices": [admin_device]}
+        self.users = {}
+        for i in range(nb_users):
+            device_id = DeviceID(f"user{i}@dev1")
+            _, user_certificate, device_certificate = certify(
+                admin_id, admin_signing_key, device_id, UserProfile.STANDARD
+            )
+            self.users[device_id.user_id] = (device_id, user_certificate, device_certificate)
+
+    @property
+    def devices_ids(self):
+        return [device_id for device_id, _, _ in self.users.values()]
+
+    async def user_get(self, user_id):
+        _, user_certificate, device_certificate = self.users[user_id]
+        return {
+            "status": "ok",
+            "user_certificate": user_certificate,
+            "revoked_user_certificate": None,
+            "device_certificates": [device_certificate],
+            "trustchain": self.trustchain,
+        }
+
+
+async def bench_get_devices(cmds, device, tmpdir):
+    async with CertificateStorage.run(device, tmpdir) as certificate_storage:
+        remote_devices_manager = RemoteDevicesManager(
+            cmds, cmds.root_signing_key.verify_key, certificate_storage=certificate_storage
+        )
+        devices_ids = cmds.devices_ids
+        start = perf_counter()
+        for device_id in devices_ids:
+            await remote_devices_manager.get_device(device_id)
+        return perf_counter() - start, len(devices_ids)
+
+
+async def main_async(args):
+    print(f"Generating an organization of {args.users} users...")
+    cmds = FakeBackendCmds(args.users)
+    device = SimpleNamespace(local_symkey=SecretKey.generate())
+    with TemporaryDirectory(prefix="guardata-bench-") as tmpdir:
+        for name in ("cold", "warm"):
+            duration, nb_devices = await bench_get_devices(cmds, device, Path(tmpdir))
+            print(
+                f"{name}: {duration:6.2f} s, "
+                f"{duration / nb_devices * 1e6:8.1f} us/device ({nb_devices} devices)"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    trio.run(main_async, args)
+
+
+if __name__ == "__main__":
+    main()
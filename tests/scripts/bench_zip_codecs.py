@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Compare the compression strategies of `ZipMsgpackSerializer` on manifests of
+various sizes: CPU time spent compressing and decompressing against the size
+of the payload, which is what is sent on the wire and stored by the backend
+(encryption adds a constant overhead):
+
+- legacy: zlib at the default level whatever the payload
+- adaptive: codec selected by `ZipMsgpackSerializer.select_codec`
+
+    $ python tests/scripts/bench_zip_codecs.py --entries 1 10 100 1000 5000
+"""
+
+import zlib
+import argparse
+from time import perf_counter
+
+from guardata.serde import packb
+from guardata.serde.compression import decompress
+
+from bench_serde import build_cases
+
+
+def timeit(fn, arg, min_duration):
+    runs = 0
+    start = perf_counter()
+    while True:
+        fn(arg)
+        runs += 1
+        duration = perf_counter() - start
+        if duration >= min_duration:
+            return duration / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    parser.add_argument("--min-duration", type=float, default=0.2)
+    args = parser.parse_args()
+
+    totals = {"legacy": [0, 0.0], "adaptive": [0, 0.0]}
+    for nb_entries in args.entries:
+        for name, serializer, obj in build_cases(nb_entries)[:3]:
+            raw = packb(serializer.dump(obj))
+            line = f"{name:<34} raw {len(raw):>8} B"
+            # Only measure the compression, not the marshmallow and msgpack steps
+            for strategy, compress_fn, decompress_fn in (
+                ("legacy", zlib.compress, zlib.decompress),
+                ("adaptive", serializer.zip, decompress),
+            ):
+                zipped = compress_fn(raw)
+                assert decompress_fn(zipped) == raw
+                duration = timeit(compress_fn, raw, args.min_duration) + timeit(
+                    decompress_fn, zipped, args.min_duration
+                )
+                totals[strategy][0] += len(zipped)
+                totals[strategy][1] += duration
+                line += f" | {strategy} {len(zipped):>8} B {duration * 1e6:8.1f} us"
+            print(line)
+
+    print()
+    for strategy, (size, duration) in totals.items():
+        print(f"{strategy:<8} total: {size:>10} B, {duration * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
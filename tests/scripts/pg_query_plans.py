@@ -0,0 +1,371 @@
+#! /usr/bin/env python3
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+"""
+Seed a migrated PostgreSQL database with a large organization, then report the
+query plan and the execution time of the hot backend queries:
+
+    $ guardata backend migrate --db postgresql://localhost/guardata
+    $ python tests/scripts/pg_query_plans.py --db postgresql://localhost/guardata
+
+With `--compare`, the queries are run a second time after dropping the
+secondary indexes (in a transaction rolled back afterward) to show what they
+are good for.
+"""
+
+import argparse
+from uuid import uuid4
+
+import triopg
+import pendulum
+
+from guardata.utils import trio_run
+from guardata.logging import configure_logging
+from backendService.postgresql.utils import Q
+from backendService.postgresql.vlob_queries.read import (
+    _q_read_data_without_timestamp,
+    _q_get_realm_ids_from_vlob_ids,
+    _q_poll_changes,
+    _q_list_versions,
+)
+from backendService.postgresql.vlob_queries.utils import (
+    _q_check_realm_access,
+    _q_get_realm_id_from_vlob_id,
+)
+from backendService.postgresql.vlob_queries.write import _q_get_vlob_version
+from backendService.postgresql.realm_queries.get import (
+    _q_get_realm_status,
+    _q_get_blocks_size_from_realm,
+    _q_get_vlob_size_from_realm,
+    _q_get_current_roles,
+    _q_get_realms_for_user,
+)
+from backendService.postgresql.block import _q_get_block_meta
+from backendService.postgresql.message import _q_get_messages
+from backendService.postgresql.user_queries.get import _q_get_user_devices
+from backendService.postgresql.user_queries.create import _q_get_not_revoked_users_for_human
+
+
+SECONDARY_INDEXES = (
+    "vlob_atom_organization_vlob_id_version_idx",
+    "realm_user_role_realm_user_certified_on_idx",
+    "realm_user_role_user_realm_certified_on_idx",
+    "message_recipient_id_idx",
+    "block_realm_idx",
+    "user_human_idx",
+)
+
+
+_q_seed_organization = Q(
+    """
+INSERT INTO organization (organization_id, bootstrap_token)
+VALUES ($organization_id, '')
+RETURNING _id
+"""
+)
+
+
+_q_seed_users = Q(
+    """
+WITH new_humans AS (
+    INSERT INTO human (organization, email, label)
+    SELECT $organization, 'user' || i || '@example.com', 'User ' || i
+    FROM generate_series(1, $users) i
+    RETURNING _id, email
+),
+new_users AS (
+    INSERT INTO user_ (
+        organization,
+        user_id,
+        user_certificate,
+        redacted_user_certificate,
+        created_on,
+        human,
+        profile
+    )
+    SELECT
+        $organization,
+        split_part(email, '@', 1),
+        ''::bytea,
+        ''::bytea,
+        now(),
+        _id,
+        'STANDARD'::user_profile
+    FROM new_humans
+    RETURNING _id, user_id
+)
+INSERT INTO device (
+    organization, user_, device_id, device_certificate, redacted_device_certificate, created_on
+)
+SELECT $organization, _id, user_id || '@dev1', ''::bytea, ''::bytea, now()
+FROM new_users
+"""
+)
+
+
+# Each realm is shared with `roles` users, each of them having been given a
+# previous role before the current one
+_q_seed_realms = Q(
+    """
+WITH new_realms AS (
+    INSERT INTO realm (organization, realm_id, encryption_revision, checkpoint)
+    SELECT $organization, md5(random()::text)::uuid, 1, $vlobs::INTEGER * $versions::INTEGER
+    FROM generate_series(1, $realms)
+    RETURNING _id
+),
+new_revisions AS (
+    INSERT INTO vlob_encryption_revision (realm, encryption_revision)
+    SELECT _id, 1
+    FROM new_realms
+),
+users AS (
+    SELECT _id, row_number() OVER (ORDER BY _id) - 1 AS rank
+    FROM user_
+    WHERE organization = $organization
+)
+INSERT INTO realm_user_role (realm, user_, role, certificate, certified_by, certified_on)
+SELECT
+    new_realms._id,
+    users._id,
+    (CASE WHEN history = 1 THEN 'CONTRIBUTOR' ELSE 'READER' END)::realm_role,
+    ''::bytea,
+    $author,
+    now() - history * INTERVAL '1 hour'
+FROM new_realms
+CROSS JOIN generate_series(0, $roles - 1) k
+CROSS JOIN generate_series(1, 2) history
+INNER JOIN users ON users.rank = (new_realms._id * 7 + k) % $users
+"""
+)
+
+
+_q_seed_vlobs = Q(
+    """
+WITH new_vlob_atoms AS (
+    INSERT INTO vlob_atom (
+        organization, vlob_encryption_revision, vlob_id, version, blob, size, author, created_on
+    )
+    SELECT
+        $organization,
+        vlob_encryption_revision._id,
+        md5(vlob_encryption_revision._id || '-vlob-' || i)::uuid,
+        version,
+        ''::bytea,
+        0,
+        $author,
+        now()
+    FROM vlob_encryption_revision
+    INNER JOIN realm ON vlob_encryption_revision.realm = realm._id
+    CROSS JOIN generate_series(1, $vlobs) i
+    CROSS JOIN generate_series(1, $versions) version
+    WHERE realm.organization = $organization
+    RETURNING _id, vlob_encryption_revision
+)
+INSERT INTO realm_vlob_update (realm, index, vlob_atom)
+SELECT
+    vlob_encryption_revision.realm,
+    row_number() OVER (PARTITION BY vlob_encryption_revision.realm ORDER BY new_vlob_atoms._id),
+    new_vlob_atoms._id
+FROM new_vlob_atoms
+INNER JOIN vlob_encryption_revision
+ON new_vlob_atoms.vlob_encryption_revision = vlob_encryption_revision._id
+"""
+)
+
+
+_q_seed_blocks = Q(
+    """
+INSERT INTO block (organization, block_id, realm, author, size, created_on)
+SELECT $organization, md5(realm._id || '-block-' || i)::uuid, realm._id, $author, 512, now()
+FROM realm
+CROSS JOIN generate_series(1, $blocks) i
+WHERE realm.organization = $organization
+"""
+)
+
+
+_q_seed_messages = Q(
+    """
+INSERT INTO message (organization, recipient, timestamp, index, sender, body)
+SELECT $organization, user_._id, now(), i, $author, ''::bytea
+FROM user_
+CROSS JOIN generate_series(1, $messages) i
+WHERE user_.organization = $organization
+"""
+)
+
+
+_q_pick_vlob = Q(
+    """
+SELECT realm.realm_id, vlob_atom.vlob_id, block.block_id
+FROM vlob_atom
+INNER JOIN vlob_encryption_revision
+ON vlob_atom.vlob_encryption_revision = vlob_encryption_revision._id
+INNER JOIN realm ON vlob_encryption_revision.realm = realm._id
+INNER JOIN block ON block.realm = realm._id
+WHERE realm.organization = $organization
+LIMIT 1
+"""
+)
+
+
+async def seed(conn, organization_id, args):
+    organization = await conn.fetchval(*_q_seed_organization(organization_id=organization_id))
+    await conn.execute(*_q_seed_users(organization=organization, users=args.users))
+    author = await conn.fetchval(
+        "SELECT MIN(_id) FROM device WHERE organization = $1", organization
+    )
+    await conn.execute(
+        *_q_seed_realms(
+            organization=organization,
+            author=author,
+            users=args.users,
+            realms=args.realms,
+            roles=args.roles,
+            vlobs=args.vlobs,
+            versions=args.versions,
+        )
+    )
+    await conn.execute(
+        *_q_seed_vlobs(
+            organization=organization, author=author, vlobs=args.vlobs, versions=args.versions
+        )
+    )
+    await conn.execute(
+        *_q_seed_blocks(organization=organization, author=author, blocks=args.blocks)
+    )
+    await conn.execute(
+        *_q_seed_messages(organization=organization, author=author, messages=args.messages)
+    )
+    await conn.execute("ANALYZE")
+    return await conn.fetchrow(*_q_pick_vlob(organization=organization))
+
+
+def hot_queries(organization_id, realm_id, vlob_id, block_id):
+    user_id = "user1"
+    return (
+        (
+            "vlob read",
+            _q_read_data_without_timestamp(
+                organization_id=organization_id,
+                realm_id=realm_id,
+                encryption_revision=1,
+                vlob_id=vlob_id,
+            ),
+        ),
+        (
+            "vlob realm from id",
+            _q_get_realm_id_from_vlob_id(organization_id=organization_id, vlob_id=vlob_id),
+        ),
+        (
+            "vlob realms from ids",
+            _q_get_realm_ids_from_vlob_ids(organization_id=organization_id, vlob_ids=[vlob_id]),
+        ),
+        ("vlob version", _q_get_vlob_version(organization_id=organization_id, vlob_id=vlob_id)),
+        ("vlob versions list", _q_list_versions(organization_id=organization_id, vlob_id=vlob_id)),
+        (
+            "vlob poll changes",
+            _q_poll_changes(organization_id=organization_id, realm_id=realm_id, checkpoint=0),
+        ),
+        (
+            "realm access check",
+            _q_check_realm_access(
+                organization_id=organization_id, realm_id=realm_id, user_id=user_id
+            ),
+        ),
+        (
+            "realm status",
+            _q_get_realm_status(
+                organization_id=organization_id, realm_id=realm_id, user_id=user_id
+            ),
+        ),
+        (
+            "realm current roles",
+            _q_get_current_roles(organization_id=organization_id, realm_id=realm_id),
+        ),
+        (
+            "realms for user",
+            _q_get_realms_for_user(organization_id=organization_id, user_id=user_id),
+        ),
+        (
+            "realm vlobs size",
+            _q_get_vlob_size_from_realm(organization_id=organization_id, realm_id=realm_id),
+        ),
+        (
+            "realm blocks size",
+            _q_get_blocks_size_from_realm(organization_id=organization_id, realm_id=realm_id),
+        ),
+        (
+            "block meta",
+            _q_get_block_meta(organization_id=organization_id, user_id=user_id, block_id=block_id),
+        ),
+        ("messages", _q_get_messages(organization_id=organization_id, recipient=user_id, offset=0)),
+        ("user devices", _q_get_user_devices(organization_id=organization_id, user_id=user_id)),
+        (
+            "human users",
+            _q_get_not_revoked_users_for_human(
+                organization_id=organization_id, email="user1@example.com", now=pendulum.now()
+            ),
+        ),
+    )
+
+
+class RollbackIndexesDrop(Exception):
+    pass
+
+
+async def explain(conn, queries, verbose):
+    for name, (sql, *params) in queries:
+        rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *params)
+        plan = [row[0] for row in rows]
+        execution_time = next(line for line in plan if line.lower().startswith("execution time"))
+        print(f"{name:<24} {execution_time}")
+        if verbose:
+            for line in plan:
+                print(f"    {line}")
+
+
+async def main_async(args):
+    organization_id = f"PlanOrg{uuid4().hex[:8]}"
+    async with triopg.connect(args.db) as conn:
+        print(f"Seeding organization {organization_id}...")
+        async with conn.transaction():
+            realm_id, vlob_id, block_id = await seed(conn, organization_id, args)
+
+        queries = hot_queries(organization_id, realm_id, vlob_id, block_id)
+
+        print("\nWith secondary indexes:")
+        await explain(conn, queries, args.verbose)
+
+        if args.compare:
+            print("\nWithout secondary indexes:")
+            try:
+                async with conn.transaction():
+                    for index in SECONDARY_INDEXES:
+                        await conn.execute(f"DROP INDEX {index}")
+                    await explain(conn, queries, args.verbose)
+                    raise RollbackIndexesDrop()
+            except RollbackIndexesDrop:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--realms", type=int, default=200)
+    parser.add_argument("--roles", type=int, default=50)
+    parser.add_argument("--vlobs", type=int, default=1000)
+    parser.add_argument("--versions", type=int, default=3)
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+    configure_logging("WARNING")
+    # The PostgreSQL driver runs on top of asyncio
+    trio_run(main_async, args, use_asyncio=True)
+
+
+if __name__ == "__main__":
+    main()
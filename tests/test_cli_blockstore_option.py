@@ -58,6 +58,18 @@ def test_parse_s3_with_custom_url_scheme():
     )
 
 
+def test_parse_s3_with_max_concurrency():
+    config = _parse_blockstore_params(["s3:s3.example.com:region1:bucketA:key123:S3cr3t:64"])
+    assert config == S3BlockStoreConfig(
+        s3_endpoint_url="https://s3.example.com",
+        s3_region="region1",
+        s3_bucket="bucketA",
+        s3_key="key123",
+        s3_secret="S3cr3t",
+        s3_max_concurrency=64,
+    )
+
+
 def test_parse_swift():
     config = _parse_blockstore_params(["swift:swift.example.com:tenant2:containerB:user123:S3cr3t"])
     assert config == SWIFTBlockStoreConfig(
@@ -118,7 +130,9 @@ def test_parse_simple_raid():
     [
         "foo",  # Unknown type
         "s3:",  # Too few parts
-        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy",  # Too much parts
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy",  # Invalid max concurrency
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:0",  # Invalid max concurrency
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:8:dummy",  # Too much parts
     ],
 )
 def test_bad_single_param(param):
@@ -131,7 +145,9 @@ def test_bad_single_param(param):
     [
         "foo",  # Unknown type
         "s3:",  # Too few parts
-        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy",  # Too much parts
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy",  # Invalid max concurrency
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:0",  # Invalid max concurrency
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:8:dummy",  # Too much parts
     ],
 )
 def test_invalid_mix_raid_params(param):
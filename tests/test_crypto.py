@@ -0,0 +1,67 @@
+# Copyright 2020 BitLogiK for guardata (https://guardata.app) - AGPLv3
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import guardata.crypto
+from guardata.crypto import SecretKey, CryptoError
+from guardata.crypto.secretbox2 import SecretBox
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"foo", bytearray(b"foo"), memoryview(b"--foo--")[2:5], b"x" * 1024 * 1024],
+    ids=["empty", "bytes", "bytearray", "memoryview", "large"],
+)
+def test_secret_key_encrypt_decrypt(data):
+    key = SecretKey.generate()
+    ciphered = key.encrypt(data)
+    assert isinstance(ciphered, bytes)
+    assert key.decrypt(ciphered) == data
+    assert key.decrypt(memoryview(ciphered)) == data
+    # Same format than the regular SecretBox
+    box = SecretBox(key)
+    assert box.decrypt(ciphered) == data
+    assert key.decrypt(box.encrypt(bytes(data))) == data
+
+
+def test_secret_box_buffer_aad():
+    box = SecretBox(SecretKey.generate())
+    ciphered = box.encrypt_buffer(b"foo", aad=b"bar")
+    assert box.decrypt(ciphered, aad=b"bar") == b"foo"
+    assert box.decrypt_buffer(box.encrypt(b"foo", aad=b"bar"), aad=b"bar") == b"foo"
+    for aad in (None, b"spam"):
+        with pytest.raises(CryptoError):
+            box.decrypt_buffer(ciphered, aad=aad)
+
+
+def test_secret_key_bad_data():
+    key = SecretKey.generate()
+    ciphered = key.encrypt(b"foo")
+    tampered = ciphered[:-1] + bytes([ciphered[-1] ^ 1])
+    for bad in (b"", ciphered[:-1], tampered, SecretKey.generate().encrypt(b"foo")):
+        with pytest.raises(CryptoError):
+            key.decrypt(bad)
+    with pytest.raises(CryptoError):
+        key.encrypt("foo")
+    with pytest.raises(CryptoError):
+        SecretKey(b"too short").encrypt(b"foo")
+
+
+@pytest.mark.parametrize("with_executor", (False, True))
+def test_secret_key_batch(monkeypatch, with_executor):
+    # Make sure the items are dispatched in several groups
+    monkeypatch.setattr(guardata.crypto, "BATCH_GROUP_SIZE", 1000)
+    key = SecretKey.generate()
+    items = [bytes([i]) * (i * 50) for i in range(100)]
+
+    with ThreadPoolExecutor(4) as executor:
+        executor = executor if with_executor else None
+        ciphereds = key.encrypt_batch(items, executor=executor)
+        assert [key.decrypt(ciphered) for ciphered in ciphereds] == items
+        assert key.decrypt_batch(ciphereds, executor=executor) == items
+        assert key.decrypt_batch(map(memoryview, ciphereds), executor=executor) == items
+
+        ciphereds[42] = ciphereds[42][:-1]
+        with pytest.raises(CryptoError):
+            key.decrypt_batch(ciphereds, executor=executor)
@@ -3,7 +3,12 @@
 import pytest
 import pendulum
 import uuid
+import random
+import zlib
+import lzma
+from copy import deepcopy
 from collections import namedtuple
+from marshmallow import ValidationError, validates_schema
 
 from guardata.serde import (
     packb,
@@ -11,11 +16,18 @@ from guardata.serde import (
     BaseSchema,
     OneOfSchema,
     MsgpackSerializer,
+    ZipMsgpackSerializer,
     fields,
+    validate,
+    pre_load,
+    post_load,
     SerdeError,
+    SerdeValidationError,
 )
 
 from guardata.serde.schema import OneOfSchemaLegacy
+from guardata.serde.compiled import compile_loader, compile_dumper
+from guardata.serde.compression import CODECS, register_codec, compress, decompress
 
 from enum import Enum
 
@@ -54,6 +66,79 @@ def test_serializer_loads_bad_data():
             serializer.loads(raw)
 
 
+class BlobSchema(BaseSchema):
+    blob = fields.Bytes(required=True)
+
+
+@pytest.mark.parametrize(
+    "blob, header",
+    [
+        # Tiny payload, still compressed for older readers
+        (b"x" * 10, b"\x78\x9c"),
+        # Incompressible payload, still compressed for older readers
+        (random.Random(42).getrandbits(8 * 1024).to_bytes(1024, "little"), b"\x78\x9c"),
+        # Default zlib level
+        (b"x" * 1024, b"\x78\x9c"),
+        # Large payload, fast zlib level
+        (b"x" * ZipMsgpackSerializer.FAST_COMPRESSION_THRESHOLD, b"\x78\x01"),
+    ],
+    ids=["tiny", "incompressible", "default_level", "fast_level"],
+)
+def test_zip_serializer_codecs(blob, header):
+    serializer = ZipMsgpackSerializer(BlobSchema)
+    raw = serializer.dumps({"blob": blob})
+    assert raw[:2] == header
+    assert serializer.loads(raw) == {"blob": blob}
+    # Readable by the versions without codec header support
+    assert unpackb(zlib.decompress(raw)) == {"blob": blob}
+
+
+def test_zip_serializer_loads_legacy_zlib():
+    serializer = ZipMsgpackSerializer(BlobSchema)
+    assert serializer.loads(zlib.compress(packb({"blob": b"foo"}))) == {"blob": b"foo"}
+
+
+def test_zip_serializer_loads_bad_data():
+    serializer = ZipMsgpackSerializer(BlobSchema)
+    for raw in (
+        b"",
+        b"\x01",
+        b"\x01\xff" + packb({"blob": b"foo"}),
+        b"\x02\x00" + packb({"blob": b"foo"}),
+        b"\x01\x01dummy",
+        b"\x78\x9cdummy",
+        b"\x01\x00dummy",
+        compress(packb({"blob": "foo"}), CODECS[0]),
+    ):
+        with pytest.raises(SerdeError):
+            serializer.loads(raw)
+
+
+@pytest.fixture
+def lzma_codec():
+    codec = register_codec(
+        42, "lzma", lambda data, level: lzma.compress(data, preset=level), lzma.decompress
+    )
+    yield codec
+    del CODECS[codec.id]
+
+
+def test_custom_codec(lzma_codec):
+    with pytest.raises(ValueError):
+        register_codec(lzma_codec.id, "dummy", None, None)
+
+    class LzmaSerializer(ZipMsgpackSerializer):
+        def select_codec(self, raw):
+            return lzma_codec, 1
+
+    serializer = LzmaSerializer(BlobSchema)
+    raw = serializer.dumps({"blob": b"x" * 1024})
+    assert raw[:2] == b"\x01\x2a"
+    assert decompress(raw) == packb({"blob": b"x" * 1024})
+    # Any serializer knows about the registered codecs
+    assert ZipMsgpackSerializer(BlobSchema).loads(raw) == {"blob": b"x" * 1024}
+
+
 class AnimalsEnum(Enum):
     BIRD = "bird"
     FISH = "fish"
@@ -133,3 +218,108 @@ def test_oneof_schema(oneof_schema_cls, animals_cls, bird, fish, fields_constant
         {"animal_type": "fish", "swimming": True},
     ]
     assert not errors
+
+
+class PetSchema(BaseSchema):
+    name = fields.String(required=True, validate=validate.Length(min=1))
+    age = fields.Integer(validate=validate.Range(min=0), missing=0)
+    owner = fields.String(allow_none=True, missing=None)
+
+
+class KennelSchema(BaseSchema):
+    pets = fields.FrozenList(fields.Nested(PetSchema), required=True)
+    tags = fields.FrozenMap(fields.String(), fields.Integer(), required=True)
+    legacy = fields.String(allow_none=True)
+
+    @pre_load
+    def fix_legacy(self, data):
+        data.setdefault("legacy", None)
+        return data
+
+    @post_load
+    def make_obj(self, data):
+        return namedtuple("Kennel", sorted(data))(**data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"pets": [{"name": "Rex"}, {"name": "Pif", "age": 3, "owner": "Bob"}], "tags": {"a": 1}},
+        {"pets": (), "tags": {}, "legacy": "foo", "ignored": 42},
+        {"pets": [{"name": ""}], "tags": {}},
+        {"pets": [{"name": "Rex", "age": -1}], "tags": {}},
+        {"pets": [{"name": None}], "tags": {}},
+        {"pets": [None], "tags": {}},
+        {"pets": "Rex", "tags": {}},
+        {"pets": [], "tags": {"a": "not an int"}},
+        {"pets": []},
+        {"tags": {}, "legacy": 42},
+    ],
+)
+def test_compiled_schema(data):
+    serializer = MsgpackSerializer(KennelSchema)
+    assert compile_loader(serializer.schema) is not None
+    assert compile_dumper(serializer.schema) is not None
+
+    try:
+        expected = serializer.schema.load(deepcopy(data)).data
+    except ValidationError as exc:
+        with pytest.raises(SerdeValidationError) as ctx:
+            serializer.load(deepcopy(data))
+        assert ctx.value.args == (exc.messages,)
+        with pytest.raises(Exception):
+            compile_loader(serializer.schema)(deepcopy(data))
+    else:
+        assert compile_loader(serializer.schema)(deepcopy(data)) == expected
+        loaded = serializer.load(deepcopy(data))
+        assert loaded == expected
+        assert compile_dumper(serializer.schema)(loaded) == serializer.schema.dump(loaded).data
+        assert serializer.dump(loaded) == serializer.schema.dump(loaded).data
+
+
+def test_compiled_oneof_schema():
+    class BirdSchema(BaseSchema):
+        animal_type = fields.EnumCheckedConstant(AnimalsEnum.BIRD, required=True)
+        flying = fields.Boolean()
+
+    class AnimalSchema(OneOfSchema):
+        type_field = "animal_type"
+        type_schemas = {AnimalsEnum.BIRD: BirdSchema}
+
+        def get_obj_type(self, obj):
+            return obj["animal_type"]
+
+    serializer = MsgpackSerializer(AnimalSchema)
+    assert serializer.load({"animal_type": "bird", "flying": True}) == {
+        "animal_type": AnimalsEnum.BIRD,
+        "flying": True,
+    }
+    assert serializer.dump({"animal_type": "bird", "flying": True}) == {
+        "animal_type": "bird",
+        "flying": True,
+    }
+    for data, messages in [
+        ({"animal_type": "fish"}, {"animal_type": ["Unsupported value: fish"]}),
+        ({"animal_type": ["bird"]}, {"animal_type": ["Invalid value: ['bird']"]}),
+        ({}, {"animal_type": ["Missing data for required field."]}),
+    ]:
+        with pytest.raises(SerdeValidationError) as exc:
+            serializer.load(data)
+        assert exc.value.args == (messages,)
+
+
+def test_compiled_schema_unsupported():
+    class AliasSchema(BaseSchema):
+        name = fields.String(load_from="alias")
+
+    class ValidatedSchema(BaseSchema):
+        name = fields.String()
+
+        @validates_schema
+        def check(self, data):
+            pass
+
+    for schema_cls in (AliasSchema, ValidatedSchema):
+        assert compile_loader(schema_cls()) is None
+        serializer = MsgpackSerializer(schema_cls)
+        assert serializer.load({"name": "foo"}) == {"name": "foo"}